@@ -0,0 +1,42 @@
+"""比較逐一呼叫 extract_value 與依 schema 編譯的整列解碼函數
+
+    python -m benchmarks.bench_extractors --rows 100000
+"""
+import argparse
+import time
+from notion.endpoints import NotionEndpoints
+from notion.extractors import PropertyValueExtractor
+from benchmarks.data import SCHEMA, make_pages
+
+
+def bench(name: str, func, pages: list) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        func(page)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed:8.3f}s  {len(pages) / elapsed:12,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    pages = list(make_pages(args.rows))
+    as_dict = PropertyValueExtractor.compile_row_extractor(SCHEMA)
+    as_tuple = PropertyValueExtractor.compile_row_extractor(SCHEMA, as_tuple=True)
+
+    # 確認輸出與 get_formatted_page_properties 的格式一致
+    sample = pages[0]
+    assert as_dict(sample) == NotionEndpoints.format_properties(sample["properties"])
+
+    baseline = bench("format_properties (extract_value)",
+                     lambda page: NotionEndpoints.format_properties(page["properties"]), pages)
+    compiled = bench("compile_row_extractor (dict)", as_dict, pages)
+    bench("compile_row_extractor (tuple)", as_tuple, pages)
+    print(f"加速倍數（dict）: {baseline / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
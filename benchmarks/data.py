@@ -0,0 +1,92 @@
+import random
+from datetime import datetime, timedelta, timezone
+from notion.config import NotionConfig
+
+
+PropertyType = NotionConfig.PropertyType
+
+# 涵蓋所有 PropertyType 的測試 schema
+SCHEMA = {
+    "Name": PropertyType.TITLE,
+    "Description": PropertyType.RICH_TEXT,
+    "Score": PropertyType.NUMBER,
+    "Priority": PropertyType.SELECT,
+    "Tags": PropertyType.MULTI_SELECT,
+    "Due Date": PropertyType.DATE,
+    "Complete": PropertyType.CHECKBOX,
+    "Website": PropertyType.URL,
+    "Contact": PropertyType.EMAIL,
+    "Phone": PropertyType.PHONE,
+    "Related Tasks": PropertyType.RELATION,
+    "Total Score": PropertyType.ROLLUP,
+}
+
+SELECT_OPTIONS = {
+    "Priority": ["High", "Medium", "Low"],
+    "Tags": ["Work", "Personal", "Urgent", "Later", "Idea"],
+}
+
+
+def rich_text(content: str) -> list:
+    return [{"type": "text", "text": {"content": content}, "plain_text": content}]
+
+
+def option(name: str) -> dict:
+    return {"id": f"opt-{name.lower()}", "name": name, "color": "default"}
+
+
+def database_schema(database_id: str = "bench-db") -> dict:
+    """GET /databases/{id} 格式的數據庫物件"""
+    properties = {}
+    for name, prop_type in SCHEMA.items():
+        config = {}
+        if name in SELECT_OPTIONS:
+            config = {"options": [option(value) for value in SELECT_OPTIONS[name]]}
+        properties[name] = {"id": name[:4].lower(), "name": name, "type": prop_type, prop_type: config}
+    return {"object": "database", "id": database_id, "properties": properties}
+
+
+def make_page(index: int, rng: random.Random, database_id: str = "bench-db") -> dict:
+    """產生一筆涵蓋所有屬性類型的頁面"""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    created = base + timedelta(minutes=index)
+    due = (base + timedelta(days=rng.randint(0, 365))).date()
+    score = rng.randint(0, 100) if rng.random() > 0.1 else None
+    related = [{"id": f"page-{rng.randrange(max(index, 1)):08d}"} for _ in range(rng.randint(0, 2))]
+
+    properties = {
+        "Name": {"id": "title", "type": "title", "title": rich_text(f"Task {index}")},
+        "Description": {"id": "desc", "type": "rich_text", "rich_text": rich_text("x" * rng.randint(0, 40))},
+        "Score": {"id": "scor", "type": "number", "number": score},
+        "Priority": {"id": "prio", "type": "select",
+                     "select": option(rng.choice(SELECT_OPTIONS["Priority"])) if rng.random() > 0.2 else None},
+        "Tags": {"id": "tags", "type": "multi_select",
+                 "multi_select": [option(tag) for tag in rng.sample(SELECT_OPTIONS["Tags"], rng.randint(0, 3))]},
+        "Due Date": {"id": "due", "type": "date",
+                     "date": {"start": due.isoformat(),
+                              "end": (due + timedelta(days=rng.randint(1, 40))).isoformat() if rng.random() > 0.5 else None}},
+        "Complete": {"id": "comp", "type": "checkbox", "checkbox": rng.random() > 0.5},
+        "Website": {"id": "web", "type": "url", "url": f"https://example.com/{index}"},
+        "Contact": {"id": "mail", "type": "email", "email": f"user{index}@example.com"},
+        "Phone": {"id": "tel", "type": "phone_number", "phone_number": f"+1-555-{index:07d}"},
+        "Related Tasks": {"id": "rel", "type": "relation", "relation": related, "has_more": False},
+        "Total Score": {"id": "tot", "type": "rollup",
+                        "rollup": {"type": "number", "number": (score or 0) * len(related), "function": "sum"}},
+    }
+    timestamp = created.isoformat().replace("+00:00", ".000Z")
+    return {
+        "object": "page",
+        "id": f"page-{index:08d}",
+        "created_time": timestamp,
+        "last_edited_time": timestamp,
+        "archived": False,
+        "parent": {"type": "database_id", "database_id": database_id},
+        "properties": properties,
+    }
+
+
+def make_pages(count: int, seed: int = 0, database_id: str = "bench-db"):
+    """可重現的頁面產生器（相同 seed 產生相同資料）"""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield make_page(index, rng, database_id)
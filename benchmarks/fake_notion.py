@@ -0,0 +1,430 @@
+"""本地的 Notion API 替身伺服器，用於離線的壓力與延遲測試
+
+實作 NotionAPI 用到的端點：數據庫查詢（含游標）、頁面、區塊子元素與數據庫。
+資料依 seed 與索引即時產生（見 benchmarks/data.py），百萬筆也不佔記憶體；
+寫入的內容保存在記憶體中的覆寫層。
+
+    with FakeNotionServer(rows=10_000, latency=0.05) as server:
+        notion = NotionAPI("fake-token", base_url=server.base_url)
+        notion.query_database_all(server.database_id)
+
+命令列：
+    python -m benchmarks.fake_notion --rows 100000 --port 8765 --latency 0.05
+    NOTION_BASE_URL=http://127.0.0.1:8765/v1 python example.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from notion.query import LocalQuery
+from benchmarks.data import database_schema, make_page, rich_text
+
+
+PAGE_ID = re.compile(r"^page-(\d+)$")
+
+
+def now_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def notion_error(status: int, code: str, message: str) -> dict:
+    return {"object": "error", "status": status, "code": code, "message": message}
+
+
+class FakeNotionServer:
+    """可在同一行程內啟動的假 Notion 伺服器"""
+
+    def __init__(self, rows: int = 1000,
+                 seed: int = 0,
+                 database_id: str = "bench-db",
+                 blocks_per_page: int = 10,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 rate_limit_every: int = 0,
+                 rate_limit_probability: float = 0.0,
+                 retry_after: float = 1.0,
+                 max_page_size: int = 100,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        """
+        Args:
+            rows: 數據庫的頁面數
+            seed: 資料產生的種子（相同 seed 產生相同資料）
+            database_id: 數據庫 ID
+            blocks_per_page: 每個頁面預設的段落區塊數
+            latency: 每個請求的固定延遲秒數
+            jitter: 額外的隨機延遲上限（秒）
+            rate_limit_every: 每 N 個請求回應一次 429（0 為停用）
+            rate_limit_probability: 以此機率回應 429
+            retry_after: 429 回應的 Retry-After 秒數
+            max_page_size: page_size 上限，超過時回應 400（與 Notion 相同為 100）
+            host / port: 監聽位址（port 為 0 時自動選擇）
+        """
+        self.rows = rows
+        self.seed = seed
+        self.database_id = database_id
+        self.blocks_per_page = blocks_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.max_page_size = max_page_size
+        self.host = host
+        self.port = port
+
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.pages = {}        # 新建或修改過的頁面（覆寫產生的資料）
+        self.blocks = {}       # 父區塊 ID -> 新增的子區塊
+        self.databases = {}    # 新建或修改過的數據庫
+        self.created = 0       # 新建的頁面數（接在產生的頁面之後）
+        self.request_count = 0
+        self.rate_limited = 0
+        self.counts = {}       # "METHOD /template" -> 次數
+        self.httpd = None
+        self.thread = None
+
+    # ---- 資料 ----
+
+    def generated_page(self, index: int) -> dict:
+        """第 index 筆頁面（每筆使用獨立的亂數，可隨機存取）"""
+        return make_page(index, random.Random(self.seed * 1_000_003 + index), self.database_id)
+
+    def get_page(self, page_id: str) -> dict:
+        with self.lock:
+            page = self.pages.get(page_id)
+        if page is not None:
+            return page
+        match = PAGE_ID.match(page_id)
+        if match and int(match.group(1)) < self.rows:
+            return self.generated_page(int(match.group(1)))
+        return None
+
+    def page_at(self, index: int) -> dict:
+        page_id = f"page-{index:08d}"
+        with self.lock:
+            page = self.pages.get(page_id)
+        return page if page is not None else self.generated_page(index)
+
+    def child_blocks(self, block_id: str) -> list:
+        if PAGE_ID.match(block_id):
+            blocks = [
+                {
+                    "object": "block",
+                    "id": f"{block_id}-b{i}",
+                    "type": "paragraph",
+                    "has_children": False,
+                    "paragraph": {"rich_text": rich_text(f"Paragraph {i} of {block_id}")},
+                }
+                for i in range(self.blocks_per_page)
+            ]
+        else:
+            blocks = []
+        with self.lock:
+            return blocks + self.blocks.get(block_id, [])
+
+    # ---- 端點 ----
+
+    def query_database(self, database_id: str, body: dict):
+        page_size = body.get("page_size", 100)
+        if page_size > self.max_page_size:
+            return 400, notion_error(400, "validation_error", f"page_size should be ≤ {self.max_page_size}")
+
+        start = int(body.get("start_cursor") or 0)
+        query = LocalQuery(body.get("filter"), body.get("sorts"))
+        total = self.rows + self.created
+
+        if body.get("sorts"):
+            # 有排序時需要取得全部資料，只適合小型數據庫
+            results = query.apply(self.page_at(i) for i in range(total))
+            window = results[start:start + page_size]
+            next_index = start + page_size if start + page_size < len(results) else None
+        else:
+            window = []
+            index = start
+            while index < total and len(window) < page_size:
+                page = self.page_at(index)
+                if query.matches(page):
+                    window.append(page)
+                index += 1
+            next_index = index if index < total else None
+
+        return 200, {
+            "object": "list",
+            "results": window,
+            "next_cursor": str(next_index) if next_index is not None else None,
+            "has_more": next_index is not None,
+        }
+
+    def create_page(self, body: dict):
+        with self.lock:
+            index = self.rows + self.created
+            self.created += 1
+            page_id = f"page-{index:08d}"
+            timestamp = now_timestamp()
+            page = {
+                "object": "page",
+                "id": page_id,
+                "created_time": timestamp,
+                "last_edited_time": timestamp,
+                "archived": False,
+                "parent": body.get("parent"),
+                "properties": self.normalize_properties(body.get("properties", {})),
+            }
+            self.pages[page_id] = page
+        if body.get("children"):
+            self.append_children(page_id, body["children"])
+        return 200, page
+
+    def update_page(self, page_id: str, body: dict):
+        page = self.get_page(page_id)
+        if page is None:
+            return 404, notion_error(404, "object_not_found", f"Could not find page with ID: {page_id}")
+        page = json.loads(json.dumps(page))
+        page["properties"].update(self.normalize_properties(body.get("properties", {})))
+        if "archived" in body:
+            page["archived"] = body["archived"]
+        page["last_edited_time"] = now_timestamp()
+        with self.lock:
+            self.pages[page_id] = page
+        return 200, page
+
+    @staticmethod
+    def normalize_properties(properties: dict) -> dict:
+        """補上屬性的 type 欄位（請求中可省略）"""
+        normalized = {}
+        for name, value in properties.items():
+            if not isinstance(value, dict):
+                raise ValueError(f"body.properties.{name} should be an object")
+            value = dict(value)
+            if "type" not in value:
+                value["type"] = next((key for key in value if key != "id"), None)
+            normalized[name] = value
+        return normalized
+
+    def append_children(self, block_id: str, children: list):
+        if len(children) > 100:
+            return 400, notion_error(400, "validation_error", "body.children.length should be ≤ 100")
+        created = []
+        for child in children:
+            block = dict(child)
+            block.setdefault("object", "block")
+            block["id"] = str(uuid.UUID(int=self.rng.getrandbits(128)))
+            block["has_children"] = False
+            created.append(block)
+        with self.lock:
+            self.blocks.setdefault(block_id, []).extend(created)
+        return 200, {"object": "list", "results": self.child_blocks(block_id),
+                     "next_cursor": None, "has_more": False}
+
+    def list_children(self, block_id: str, params: dict):
+        page_size = int(params.get("page_size", ["100"])[0])
+        if page_size > self.max_page_size:
+            return 400, notion_error(400, "validation_error", f"page_size should be ≤ {self.max_page_size}")
+        start = int(params.get("start_cursor", ["0"])[0])
+        blocks = self.child_blocks(block_id)
+        end = start + page_size
+        return 200, {
+            "object": "list",
+            "results": blocks[start:end],
+            "next_cursor": str(end) if end < len(blocks) else None,
+            "has_more": end < len(blocks),
+        }
+
+    def get_database(self, database_id: str):
+        with self.lock:
+            database = self.databases.get(database_id)
+        return 200, database if database is not None else database_schema(database_id)
+
+    def create_database(self, body: dict):
+        database_id = str(uuid.UUID(int=self.rng.getrandbits(128)))
+        database = {"object": "database", "id": database_id, "title": body.get("title", []),
+                    "properties": {name: dict(prop, name=name, type=prop.get("type") or next(iter(prop)))
+                                   for name, prop in body.get("properties", {}).items()}}
+        with self.lock:
+            self.databases[database_id] = database
+        return 200, database
+
+    def update_database(self, database_id: str, body: dict):
+        status, database = self.get_database(database_id)
+        database = json.loads(json.dumps(database))
+        for name, prop in (body.get("properties") or {}).items():
+            database["properties"][name] = dict(prop, name=name, type=prop.get("type") or next(iter(prop)))
+        if body.get("title"):
+            database["title"] = body["title"]
+        with self.lock:
+            self.databases[database_id] = database
+        return 200, database
+
+    def route(self, method: str, path: str, params: dict, body: dict):
+        """回傳 (狀態碼, 回應內容, 端點模板)"""
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0] == "v1":
+            parts = parts[1:]
+
+        if parts[:1] == ["databases"]:
+            if len(parts) == 1 and method == "POST":
+                return self.create_database(body) + ("/databases",)
+            if len(parts) == 3 and parts[2] == "query" and method == "POST":
+                return self.query_database(parts[1], body) + ("/databases/{id}/query",)
+            if len(parts) == 2 and method == "GET":
+                return self.get_database(parts[1]) + ("/databases/{id}",)
+            if len(parts) == 2 and method == "PATCH":
+                return self.update_database(parts[1], body) + ("/databases/{id}",)
+        elif parts[:1] == ["pages"]:
+            if len(parts) == 1 and method == "POST":
+                return self.create_page(body) + ("/pages",)
+            if len(parts) == 2 and method == "GET":
+                page = self.get_page(parts[1])
+                if page is None:
+                    return 404, notion_error(404, "object_not_found", f"Could not find page with ID: {parts[1]}"), "/pages/{id}"
+                return 200, page, "/pages/{id}"
+            if len(parts) == 2 and method == "PATCH":
+                return self.update_page(parts[1], body) + ("/pages/{id}",)
+        elif parts[:1] == ["blocks"]:
+            if len(parts) == 3 and parts[2] == "children" and method == "GET":
+                return self.list_children(parts[1], params) + ("/blocks/{id}/children",)
+            if len(parts) == 3 and parts[2] == "children" and method == "PATCH":
+                return self.append_children(parts[1], body.get("children", [])) + ("/blocks/{id}/children",)
+            if len(parts) == 2 and method == "PATCH":
+                return 200, dict(body, object="block", id=parts[1]), "/blocks/{id}"
+
+        return 400, notion_error(400, "invalid_request_url", "Invalid request URL."), path
+
+    def should_rate_limit(self) -> bool:
+        with self.lock:
+            self.request_count += 1
+            limited = (self.rate_limit_every and self.request_count % self.rate_limit_every == 0) or \
+                      (self.rate_limit_probability and self.rng.random() < self.rate_limit_probability)
+            if limited:
+                self.rate_limited += 1
+            return bool(limited)
+
+    def count(self, method: str, template: str) -> None:
+        key = f"{method} {template}"
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    # ---- 生命週期 ----
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> str:
+        """在背景執行緒啟動伺服器，回傳 base_url"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), make_handler(self))
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def make_handler(server: FakeNotionServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 標頭與內容分兩次寫出，關閉 Nagle 以免 keep-alive 連線遇到 40ms 的 delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status: int, payload: dict, headers: dict = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def handle_request(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+
+            delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+            if delay:
+                time.sleep(delay)
+
+            if server.should_rate_limit():
+                self.reply(429, notion_error(429, "rate_limited", "You have been rate limited."),
+                           {"Retry-After": str(server.retry_after)})
+                return
+
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                self.reply(400, notion_error(400, "invalid_json", "Error parsing JSON body."))
+                return
+
+            url = urlsplit(self.path)
+            try:
+                status, payload, template = server.route(method, url.path, parse_qs(url.query), body)
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                status, payload, template = 400, notion_error(400, "validation_error", str(e)), url.path
+            server.count(method, template)
+            self.reply(status, payload)
+
+        def do_GET(self):
+            self.handle_request("GET")
+
+        def do_POST(self):
+            self.handle_request("POST")
+
+        def do_PATCH(self):
+            self.handle_request("PATCH")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地的 Notion API 替身伺服器")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--max-page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    server = FakeNotionServer(
+        rows=args.rows, seed=args.seed, host=args.host, port=args.port,
+        latency=args.latency, jitter=args.jitter,
+        rate_limit_every=args.rate_limit_every,
+        rate_limit_probability=args.rate_limit_probability,
+        max_page_size=args.max_page_size
+    )
+    print(f"Fake Notion API: {server.start()}（數據庫 ID: {server.database_id}，{args.rows} 筆）")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
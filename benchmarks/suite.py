@@ -0,0 +1,268 @@
+"""熱點路徑的基準測試，可保存 JSON 基準並在效能退步時以非零狀態結束
+
+    python -m benchmarks.suite --size 100k
+    python -m benchmarks.suite --size 1k --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --size 1k --baseline benchmarks/baseline.json --threshold 0.2 --repeats 5
+
+每個工作負載在獨立的子行程中執行，峰值 RSS 只反映該工作負載本身。重複執行 --repeats 次後
+取 rows/s 與延遲的中位數；與基準比較時只看 rows/s，且所有重複中最好的一次也退步才算退步，
+單次的排程雜訊不會造成誤報。p99 延遲僅供參考。
+CPU 類工作負載重複使用最多 POOL_SIZE 筆不同的頁面，百萬筆也不需要先產生全部資料；
+請求類工作負載透過 benchmarks/fake_notion.py 的本地替身伺服器執行。
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from notion.api import NotionAPI
+from notion.extractors import PropertyValueExtractor
+from notion.metrics import RequestMetrics
+from benchmarks.data import make_pages
+from benchmarks.fake_notion import FakeNotionServer
+
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+POOL_SIZE = 10_000
+
+
+def page_pool(rows: int, seed: int) -> list:
+    return list(make_pages(min(rows, POOL_SIZE), seed))
+
+
+def cycle(pool: list, rows: int):
+    for index in range(rows):
+        yield pool[index % len(pool)]
+
+
+def timed(latencies: list, rows: int, seconds: float = None) -> dict:
+    """工作負載的結果；seconds 省略時以延遲總和計算（只計入被測函數的時間）"""
+    return {"rows": rows, "seconds": sum(latencies) if seconds is None else seconds, "latencies": latencies}
+
+
+def timed_items(func, items) -> array:
+    """逐筆計時，回傳每個項目的延遲（秒），p50/p99 才能反映單筆的分布
+
+    perf_counter 本身的開銷約數十奈秒，會計入每筆延遲；延遲存在 array 中，百萬筆只佔 8 MB。
+    """
+    latencies = array("d")
+    clock = time.perf_counter
+    for item in items:
+        start = clock()
+        func(item)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def fake_client(server: FakeNotionServer, metrics: RequestMetrics = None) -> NotionAPI:
+    # 不限速，只量測客戶端與本地往返的成本
+    return NotionAPI("benchmark-token", base_url=server.base_url, rate_limit=100_000, burst=1_000,
+                     upload_cache_path=None, instrumentation=metrics)
+
+
+def bench_extract_value(rows: int, seed: int, options: dict) -> dict:
+    pool = page_pool(rows, seed)
+
+    def extract(page):
+        for prop_data in page["properties"].values():
+            PropertyValueExtractor.extract_value(prop_data)
+
+    return timed(timed_items(extract, cycle(pool, rows)), rows)
+
+
+def bench_format_date_range(rows: int, seed: int, options: dict) -> dict:
+    dates = [page["properties"]["Due Date"]["date"] for page in page_pool(rows, seed)]
+    return timed(timed_items(PropertyValueExtractor.format_date_range, cycle(dates, rows)), rows)
+
+
+def bench_formatted_properties(rows: int, seed: int, options: dict) -> dict:
+    pool = page_pool(rows, seed)
+    notion = NotionAPI("benchmark-token", upload_cache_path=None)
+    return timed(timed_items(
+        lambda page: notion.get_formatted_page_properties(page["id"], raw_page_data=page),
+        cycle(pool, rows)
+    ), rows)
+
+
+def bench_get_page(rows: int, seed: int, options: dict) -> dict:
+    requests = min(rows, options["max_requests"])
+    with FakeNotionServer(rows=rows, seed=seed, latency=options["latency"]) as server:
+        with fake_client(server) as notion:
+            latencies = []
+            for index in range(requests):
+                start = time.perf_counter()
+                notion.get_formatted_page_properties(f"page-{index % rows:08d}")
+                latencies.append(time.perf_counter() - start)
+    return timed(latencies, requests)
+
+
+def bench_query_database_all(rows: int, seed: int, options: dict) -> dict:
+    latencies = []
+    metrics = RequestMetrics(callback=lambda record: latencies.append(record.latency))
+    with FakeNotionServer(rows=rows, seed=seed, latency=options["latency"]) as server:
+        with fake_client(server, metrics) as notion:
+            start = time.perf_counter()
+            count = sum(1 for _ in notion.iter_database(server.database_id, prefetch=True))
+            seconds = time.perf_counter() - start
+    return timed(latencies, count, seconds)
+
+
+def bench_create_pages_bulk(rows: int, seed: int, options: dict) -> dict:
+    count = min(rows, options["max_requests"])
+    latencies = []
+    metrics = RequestMetrics(callback=lambda record: latencies.append(record.latency))
+    new_rows = (
+        {"Name": {"title": [{"text": {"content": f"Bulk {index}"}}]},
+         "Score": {"number": index}}
+        for index in range(count)
+    )
+    with FakeNotionServer(rows=0, seed=seed, latency=options["latency"]) as server:
+        with fake_client(server, metrics) as notion:
+            start = time.perf_counter()
+            result = notion.create_pages_bulk(server.database_id, new_rows)
+            seconds = time.perf_counter() - start
+    return timed(latencies, len(result.succeeded), seconds)
+
+
+WORKLOADS = {
+    "extract_value": bench_extract_value,
+    "format_date_range": bench_format_date_range,
+    "get_formatted_page_properties": bench_formatted_properties,
+    "get_page_roundtrip": bench_get_page,
+    "query_database_all": bench_query_database_all,
+    "create_pages_bulk": bench_create_pages_bulk,
+}
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_workload(name: str, rows: int, seed: int, options: dict) -> dict:
+    """在子行程中執行單一工作負載並彙總結果（產生資料與啟動伺服器的時間不計入）"""
+    outcome = WORKLOADS[name](rows, seed, options)
+    elapsed = outcome["seconds"]
+    latencies = outcome["latencies"]
+    return {
+        "rows": outcome["rows"],
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(outcome["rows"] / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 6) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 6) if latencies else None,
+        # Linux 的 ru_maxrss 單位為 KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def median(values: list):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+def summarize(runs: list) -> dict:
+    """彙總同一工作負載的多次執行：rows/s 與延遲取中位數，另記錄最好的 rows/s"""
+    return {
+        "rows": runs[0]["rows"],
+        "repeats": len(runs),
+        "seconds": median([run["seconds"] for run in runs]),
+        "rows_per_sec": median([run["rows_per_sec"] for run in runs]),
+        "rows_per_sec_max": max((run["rows_per_sec"] or 0 for run in runs), default=None),
+        "p50_ms": median([run["p50_ms"] for run in runs]),
+        "p99_ms": median([run["p99_ms"] for run in runs]),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """與基準的 rows/s 中位數比較，回傳退步項目的說明
+
+    本次的中位數與最好的一次都低於基準的 (1 - threshold) 倍才算退步。
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("rows_per_sec") or not current["rows_per_sec"]:
+            continue
+        floor = previous["rows_per_sec"] * (1 - threshold)
+        best = current.get("rows_per_sec_max") or current["rows_per_sec"]
+        if current["rows_per_sec"] < floor and best < floor:
+            regressions.append(
+                f"{name}: rows/s {previous['rows_per_sec']:,.0f} -> {current['rows_per_sec']:,.0f}"
+                f"（最好 {best:,.0f}）"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NotionAPI 熱點路徑基準測試")
+    parser.add_argument("--size", choices=SIZES, default="1k", help="合成數據庫的筆數")
+    parser.add_argument("--rows", type=int, help="自訂筆數（優先於 --size）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=WORKLOADS, help="只執行指定的工作負載")
+    parser.add_argument("--latency", type=float, default=0.0, help="替身伺服器的每請求延遲（秒）")
+    parser.add_argument("--max-requests", type=int, default=2_000, help="逐筆請求類工作負載的請求數上限")
+    parser.add_argument("--save-baseline", help="將結果寫入 JSON 基準檔")
+    parser.add_argument("--baseline", help="與此 JSON 基準比較")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允許的 rows/s 退步比例")
+    parser.add_argument("--repeats", type=int, default=3, help="每個工作負載的重複次數（取中位數）")
+    args = parser.parse_args()
+
+    rows = args.rows or SIZES[args.size]
+    options = {"latency": args.latency, "max_requests": args.max_requests}
+    context = multiprocessing.get_context("spawn")
+
+    results = {}
+    print(f"{'workload':<32}{'rows':>10}{'rows/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>9}")
+    for name in args.only or WORKLOADS:
+        runs = []
+        for _ in range(max(1, args.repeats)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(run_workload, name, rows, args.seed, options).result())
+        result = summarize(runs)
+        results[name] = result
+        print(f"{name:<32}{result['rows']:>10,}{result['rows_per_sec']:>14,.0f}"
+              f"{result['p50_ms'] or 0:>10.4f}{result['p99_ms'] or 0:>10.4f}{result['peak_rss_mb']:>9.1f}")
+
+    report = {
+        "meta": {
+            "rows": rows,
+            "seed": args.seed,
+            "latency": args.latency,
+            "repeats": args.repeats,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"已保存基準: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("rows") != rows:
+            print(f"注意：基準的筆數為 {baseline.get('meta', {}).get('rows')}，本次為 {rows}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"效能退步超過 {args.threshold:.0%}：")
+            for line in regressions:
+                print(f"- {line}")
+            return 1
+        print(f"與基準相比沒有超過 {args.threshold:.0%} 的退步")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -139,15 +139,11 @@ def create_example_pages(notion: NotionAPI, database_id: str) -> list:
         }
     ]
 
-    created_pages = []
-    for page_properties in example_pages:
-        result = notion.create_page(
-            database_id=database_id,
-            properties=page_properties
-        )
-        if result:
-            created_pages.append(result["id"])
-            print(f"創建頁面成功: {page_properties['Name']['title'][0]['text']['content']}")
+    # 批次創建，依輸入順序取回頁面 ID
+    result = notion.create_pages_bulk(database_id, example_pages)
+    created_pages = [page_id for _, page_id in sorted(result.succeeded)]
+    for index, page_id in sorted(result.succeeded):
+        print(f"創建頁面成功: {example_pages[index]['Name']['title'][0]['text']['content']}")
     
     # 等待一下確保頁面創建完成
     if created_pages:
@@ -16,12 +16,13 @@ blocks = [
     )
 ]
 
-# 批量處理多個圖片
+# 批量處理多個圖片（並行上傳，結果依原順序排列）
 def create_image_blocks(image_paths: list) -> list:
-    return [
-        builder.image_block(
-            image_path,
-            caption=f"圖片 {i+1}"
-        )
-        for i, image_path in enumerate(image_paths)
-    ] 
\ No newline at end of file
+    result = builder.image_blocks(
+        image_paths,
+        captions=[f"圖片 {i+1}" for i in range(len(image_paths))]
+    )
+    return [block for _, block in result.succeeded]
+
+# 直接添加到頁面：上傳與添加區塊重疊進行
+# notion.append_image_blocks(page_id, image_paths)
@@ -2,17 +2,91 @@ from .handlers import NotionRequestHandler
 from .builders import BlockBuilder
 from .config import NotionConfig
 from .extractors import PropertyValueExtractor
-import requests
-from base64 import b64encode
+from .endpoints import NotionEndpoints
+from .sync import DatabaseSnapshot
+from .mirror import DatabaseMirror
+from .bulk import BulkResult, run_bulk
+from .columnar import ColumnarTable, ColumnarTableBuilder
+from .options import OptionDictionary
+from .page import Page
+from .upload_cache import UploadCache
+from .images import ImagePreprocessor
+from .coalesce import UpdateCoalescer
+from .client import NotionClientMixin
 import os
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 
-class NotionAPI(NotionRequestHandler):
-    def __init__(self, token: str):
-        super().__init__(token)
+class NotionAPI(NotionClientMixin, NotionRequestHandler):
+    def __init__(self, token: str,
+                 session=None,
+                 pool_connections: int = NotionConfig.POOL_CONNECTIONS,
+                 pool_maxsize: int = NotionConfig.POOL_MAXSIZE,
+                 http2: bool = False,
+                 timeout: float = NotionConfig.REQUEST_TIMEOUT,
+                 rate_limit: float = None,
+                 burst: int = None,
+                 max_in_flight: int = NotionConfig.MAX_IN_FLIGHT,
+                 max_retries: int = NotionConfig.MAX_RETRIES,
+                 upload_cache_path: str = NotionConfig.UPLOAD_CACHE_PATH,
+                 image_max_dimension: int = None,
+                 page_cache: bool = False,
+                 instrumentation=None,
+                 base_url: str = None):
+        """
+        Args:
+            token: Notion API token
+            session: 共用的 HTTP session（可選）
+            pool_connections / pool_maxsize: 連線池大小
+            http2: 是否使用 HTTP/2
+            timeout: 單一請求逾時秒數
+            rate_limit: 每秒平均請求數（token bucket 補充速率；None 時沿用同一 token 既有的設定，否則為 NotionConfig.RATE_LIMIT）
+            burst: token bucket 容量（允許的突發請求數；None 時同上）
+            max_in_flight: 同時進行中的請求上限
+            max_retries: 429/5xx 的最大重試次數
+            upload_cache_path: 圖片上傳快取檔路徑（None 時只在記憶體中快取）
+            image_max_dimension: 設定時上傳前先將圖片最長邊縮小到此像素並重新壓縮（需要 Pillow）
+            page_cache: 是否快取頁面（查詢確認過的頁面在有效期內不再 GET，可能讀到查詢之後其他人修改前的內容）
+            instrumentation: 請求量測物件（例如 notion.metrics.RequestMetrics），None 時不量測
+            base_url: API 網址（預設為 NotionConfig.BASE_URL 或環境變數 NOTION_BASE_URL）
+        """
+        super().__init__(
+            token,
+            session=session,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            http2=http2,
+            timeout=timeout,
+            rate_limit=rate_limit,
+            burst=burst,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries,
+            instrumentation=instrumentation,
+            base_url=base_url
+        )
         self.imgur_client_id = NotionConfig.IMGUR_CLIENT_ID
-        self.block_builder = BlockBuilder()
+        # 數據庫 schema 快取與頁面快取（可選）
+        self._init_caches(page_cache)
+        # 已上傳圖片的快取，upload_to_imgur / update_page_file / BlockBuilder.image_block 共用
+        self.upload_cache = UploadCache(upload_cache_path)
+        self.image_preprocessor = ImagePreprocessor(
+            image_max_dimension, upload_cache=self.upload_cache
+        ) if image_max_dimension else None
+        # 與 Notion 請求共用同一個 session，批次作業可重用連線
+        self.block_builder = BlockBuilder(
+            self.imgur_client_id or None,
+            session=self.session,
+            upload_cache=self.upload_cache,
+            timeout=self.timeout,
+            preprocessor=self.image_preprocessor
+        )
+
+    def close(self) -> None:
+        """釋放連線池，並關閉圖片預處理的行程池"""
+        if self.image_preprocessor is not None:
+            self.image_preprocessor.close()
+        super().close()
 
     def query_database(self, database_id: str, 
                       filter_params: dict = None,
@@ -28,31 +102,9 @@ class NotionAPI(NotionRequestHandler):
             page_size: 每頁數量
             start_cursor: 分頁游標
         """
-        url = f"{NotionConfig.BASE_URL}/databases/{database_id}/query"
-        query_data = {}
-        
-        # 驗證和格式化 filter_params
-        if filter_params:
-            if isinstance(filter_params, dict):
-                if "property" in filter_params and len(filter_params) > 1:
-                    query_data["filter"] = filter_params
-                else:
-                    for prop_name, value in filter_params.items():
-                        query_data["filter"] = {
-                            "property": prop_name,
-                            "select": {
-                                "equals": value
-                            }
-                        }
-        
-        if sort_params:
-            query_data["sorts"] = sort_params
-        if page_size:
-            query_data["page_size"] = page_size
-        if start_cursor:
-            query_data["start_cursor"] = start_cursor
-
-        return self._make_request("POST", url, query_data)
+        return self._make_request(*NotionEndpoints.query_database(
+            database_id, filter_params, sort_params, page_size, start_cursor
+        ))
 
     def query_database_all(self, database_id: str,
                           filter_params: dict = None,
@@ -69,146 +121,447 @@ class NotionAPI(NotionRequestHandler):
         Returns:
             list: 所有查詢結果的列表
         """
-        all_results = []
-        has_more = True
-        next_cursor = None
+        all_results = list(self.iter_database(
+            database_id,
+            filter_params=filter_params,
+            sort_params=sort_params,
+            page_size=page_size
+        ))
         
-        while has_more:
-            response = self.query_database(
-                database_id=database_id,
-                filter_params=filter_params,
-                sort_params=sort_params,
-                page_size=page_size,
-                start_cursor=next_cursor
+        print(f"總共獲取 {len(all_results)} 條記錄")
+        return all_results
+
+    def iter_database(self, database_id: str,
+                      filter_params: dict = None,
+                      sort_params: list = None,
+                      page_size: int = 100,
+                      start_cursor: str = None,
+                      pages: bool = False,
+                      prefetch: bool = False,
+                      raise_errors: bool = False):
+        """逐頁查詢數據庫的 generator，每取得一頁就立即產出，記憶體用量不隨總筆數增加
+        
+        Args:
+            database_id: 數據庫ID
+            filter_params: 過濾參數
+            sort_params: 排序參數
+            page_size: 每頁數量
+            start_cursor: 從先前保存的 next_cursor 繼續查詢（中斷後恢復用）
+            pages: True 時產出整頁回應（含 results / has_more / next_cursor），方便保存游標
+            prefetch: True 時在呼叫端處理目前這頁的同時，於背景執行緒先抓下一頁
+            raise_errors: True 時請求失敗會拋出 NotionRequestError，而不是直接結束
+            
+        Yields:
+            dict: 單筆記錄；pages=True 時為整頁回應
+        """
+        def fetch(cursor):
+            request = NotionEndpoints.query_database(
+                database_id, filter_params, sort_params, page_size, cursor
             )
+            return self._request(*request) if raise_errors else self._make_request(*request)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            response = fetch(start_cursor)
+            while response:
+                has_more = response.get('has_more', False)
+                next_cursor = response.get('next_cursor')
+
+                # 先送出下一頁的請求，再把目前這頁交給呼叫端
+                pending = None
+                if has_more and executor:
+                    pending = executor.submit(fetch, next_cursor)
+
+                self._observe_pages(response.get('results', []))
+
+                if pages:
+                    yield response
+                else:
+                    yield from response.get('results', [])
+
+                if not has_more:
+                    break
+                response = pending.result() if pending else fetch(next_cursor)
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+    def iter_pages(self, database_id: str,
+                   filter_params: dict = None,
+                   sort_params: list = None,
+                   page_size: int = 100,
+                   prefetch: bool = False):
+        """逐筆產出 Page 物件，屬性在讀取時才解碼（參數同 iter_database）"""
+        for result in self.iter_database(database_id, filter_params, sort_params, page_size,
+                                         prefetch=prefetch):
+            yield Page.from_json(result)
+
+    def query_database_columnar(self, database_id: str,
+                                filter_params: dict = None,
+                                sort_params: list = None,
+                                property_list: list = None,
+                                page_size: int = 100) -> ColumnarTable:
+        """查詢數據庫並直接寫入欄式結果（每頁解碼後即丟棄原始 JSON）
+        
+        Args:
+            database_id: 數據庫ID
+            filter_params: 過濾參數
+            sort_params: 排序參數
+            property_list: 只保留這些屬性（可選）
+            page_size: 每頁數量
             
-            if not response:
-                break
+        Returns:
+            ColumnarTable: 可用 to_arrow() 交給 Parquet / Arrow 寫入器
+        """
+        builder = ColumnarTableBuilder(
+            self.get_database_properties(database_id),
+            property_list=property_list,
+            select_options=self.get_database_select_options(database_id)
+        )
+        builder.extend(self.iter_database(
+            database_id,
+            filter_params=filter_params,
+            sort_params=sort_params,
+            page_size=page_size,
+            prefetch=True
+        ))
+        return builder.build()
+
+    def scan_database_parallel(self, database_id: str,
+                               partition_by: str = "created_time",
+                               partitions: int = 4,
+                               filter_params: dict = None,
+                               sort_params: list = None,
+                               page_size: int = 100,
+                               max_workers: int = None) -> list:
+        """將查詢切成多個互不重疊的分區並行分頁，合併後依頁面 ID 去重
+        
+        Args:
+            database_id: 數據庫ID
+            partition_by: "created_time" / "last_edited_time" 依時間區間切分，
+                          或 select / multi_select 屬性名稱，依選項切分（另含一個空值分區）
+            partitions: 時間切分時的分區數量
+            filter_params: 額外的過濾參數，會與每個分區條件以 and 合併
+            sort_params: 排序參數（只在各分區內有效，合併結果不保證全域排序）
+            page_size: 每頁數量
+            max_workers: 並行執行緒數（預設為分區數，實際請求仍受速率限制）
             
-            results = response.get('results', [])
-            all_results.extend(results)
+        Returns:
+            list: 去重後的所有記錄
             
-            has_more = response.get('has_more', False)
-            next_cursor = response.get('next_cursor')
+        Raises:
+            NotionRequestError: 任一分區查詢失敗時（不回傳缺少部分分區的結果）
+        """
+        base_filter = NotionEndpoints.build_filter(filter_params)
+        if partition_by in ("created_time", "last_edited_time"):
+            partition_filters = self._timestamp_partitions(database_id, partition_by, partitions, base_filter)
+        else:
+            partition_filters = self._option_partitions(database_id, partition_by)
+
+        if not partition_filters:
+            return []
+
+        def scan(partition_filter):
+            return list(self.iter_database(
+                database_id,
+                filter_params=NotionEndpoints.combine_filters(base_filter, partition_filter),
+                sort_params=sort_params,
+                page_size=page_size,
+                raise_errors=True
+            ))
+
+        all_results = []
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max_workers or len(partition_filters)) as executor:
+            for results in executor.map(scan, partition_filters):
+                for result in results:
+                    if result["id"] not in seen:
+                        seen.add(result["id"])
+                        all_results.append(result)
+
+        print(f"總共獲取 {len(all_results)} 條記錄（{len(partition_filters)} 個分區）")
+        return all_results
+
+    def _timestamp_partitions(self, database_id: str, timestamp: str,
+                              partitions: int, base_filter: dict = None) -> list:
+        """依時間戳的最小/最大值切成等寬的時間區間過濾條件"""
+        def boundary(direction):
+            # 邊界查詢失敗時同樣拋出錯誤，避免誤判為空數據庫
+            response = self._request(*NotionEndpoints.query_database(
+                database_id, base_filter, [{"timestamp": timestamp, "direction": direction}], 1
+            ))
+            results = response.get("results", [])
+            return datetime.fromisoformat(results[0][timestamp].replace("Z", "+00:00")) if results else None
+
+        start = boundary("ascending")
+        end = boundary("descending")
+        if start is None or end is None:
+            return []
+        if start == end or partitions <= 1:
+            return [None]
+
+        step = (end - start) / partitions
+        edges = [
+            (start + step * i).astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+            for i in range(1, partitions)
+        ]
+
+        # 第一與最後一個分區不設下限/上限，確保掃描期間新增或邊界上的頁面也會被涵蓋
+        partition_filters = []
+        for i in range(partitions):
+            conditions = []
+            if i > 0:
+                conditions.append({"timestamp": timestamp, timestamp: {"on_or_after": edges[i - 1]}})
+            if i < partitions - 1:
+                conditions.append({"timestamp": timestamp, timestamp: {"before": edges[i]}})
+            partition_filters.append(NotionEndpoints.combine_filters(*conditions))
+        return partition_filters
+
+    def _option_partitions(self, database_id: str, prop_name: str) -> list:
+        """依 select / multi_select 屬性的選項切分過濾條件"""
+        select_options = self.get_database_select_options(database_id)
+        if prop_name not in select_options:
+            raise ValueError(f"屬性 '{prop_name}' 不是 select 或 multi_select 類型，無法用來切分")
+
+        prop_type = select_options[prop_name]["type"]
+        operator = "equals" if prop_type == "select" else "contains"
+        partition_filters = [
+            {"property": prop_name, prop_type: {operator: option["name"]}}
+            for option in select_options[prop_name]["options"]
+        ]
+        partition_filters.append({"property": prop_name, prop_type: {"is_empty": True}})
+        return partition_filters
+
+    def sync_database(self, database_id: str,
+                      state_dir: str = NotionConfig.SYNC_STATE_DIR,
+                      overlap_seconds: float = NotionConfig.SYNC_OVERLAP_SECONDS,
+                      filter_params: dict = None,
+                      reconcile: bool = False) -> dict:
+        """以 last_edited_time 水位線增量同步數據庫到本地快照
+        
+        第一次同步會完整下載，之後只查詢水位線（往前重疊 overlap_seconds）之後編輯過的頁面。
+        Notion 的查詢不會回傳已刪除的頁面，需要偵測刪除時可偶爾使用 reconcile=True 做完整比對。
+        
+        Args:
+            database_id: 數據庫ID
+            state_dir: 快照與水位線的保存目錄（每個數據庫一個 JSON 檔）
+            overlap_seconds: 增量查詢往前重疊的秒數
+            filter_params: 額外的過濾參數
+            reconcile: 是否完整比對頁面 ID，找出已刪除的頁面
             
-            if has_more:
-                print(f"已獲取 {len(all_results)} 條記錄，繼續查詢...")
+        Returns:
+            dict: {"added": [...], "updated": [...], "archived": [...], "watermark": "..."}
+            
+        Raises:
+            NotionRequestError: 查詢失敗時（此時快照與水位線不會更新）
+        """
+        snapshot = DatabaseSnapshot.load(os.path.join(state_dir, f"{database_id}.json"))
+        changes = {"added": [], "updated": [], "archived": []}
+        base_filter = NotionEndpoints.build_filter(filter_params)
+
+        since = None if reconcile else snapshot.since(overlap_seconds)
+        query_filter = base_filter
+        if since:
+            query_filter = NotionEndpoints.combine_filters(base_filter, {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": since}
+            })
+
+        seen = set()
+        for page in self.iter_database(database_id, filter_params=query_filter, raise_errors=True):
+            seen.add(page["id"])
+            snapshot.merge(page, changes)
+
+        if since is None:
+            # 完整查詢：快照中沒有出現的頁面已被刪除或移出過濾範圍
+            snapshot.remove_missing(seen, changes)
+
+        snapshot.save()
+        changes["watermark"] = snapshot.watermark
+        print(f"同步完成：新增 {len(changes['added'])}，更新 {len(changes['updated'])}，"
+              f"封存 {len(changes['archived'])}")
+        return changes
+
+    def mirror(self, database_id: str, path: str = None, refresh: bool = True) -> DatabaseMirror:
+        """建立數據庫的本地 SQLite 鏡像，之後可用 mirror.query() 在本地查詢
         
-        print(f"總共獲取 {len(all_results)} 條記錄")
-        return all_results
+        Args:
+            database_id: 數據庫ID
+            path: SQLite 檔案路徑（可選）
+            refresh: 是否立即從 Notion 更新鏡像
+        """
+        database_mirror = DatabaseMirror(self, database_id, path)
+        if refresh:
+            database_mirror.refresh()
+        return database_mirror
 
-    def get_page_properties(self, page_id: str, property_list: list = None) -> dict:
-        """獲取頁面屬性，支持選擇性獲取"""
-        url = f"{NotionConfig.BASE_URL}/pages/{page_id}"
-        response = self._make_request("GET", url)
+    def _page_entry(self, page_id: str, refresh: bool = False):
+        """從頁面快取取得查詢確認過的頁面，沒有（或 refresh、未啟用快取）時才發送 GET"""
+        return self._run_plan(self._page_entry_plan(page_id, refresh))
+
+    def get_page_properties(self, page_id: str, property_list: list = None, refresh: bool = False) -> dict:
+        """獲取頁面屬性，支持選擇性獲取
         
-        if not response:
+        Args:
+            page_id: 頁面ID
+            property_list: 指定要獲取的屬性列表
+            refresh: 略過頁面快取重新獲取
+        """
+        entry = self._page_entry(page_id, refresh)
+        
+        if not entry:
             return {}
             
-        if not property_list:
-            return response.get("properties", {})
-            
-        return {
-            prop: response.get("properties", {}).get(prop)
-            for prop in property_list
-            if prop in response.get("properties", {})
-        }
+        return NotionEndpoints.select_properties(entry.page, property_list)
+
+    def get_page(self, page_id: str, refresh: bool = False) -> Page:
+        """獲取單一頁面並包裝為 Page，失敗時回傳 None"""
+        entry = self._page_entry(page_id, refresh)
+        return Page.from_json(entry.page) if entry else None
 
     def get_block_children(self, block_id: str, 
                           start_cursor: str = None,
-                          page_size: int = 100) -> list:
-        """改進的獲取區塊內容方法"""
-        url = f"{NotionConfig.BASE_URL}/blocks/{block_id}/children"
-        params = {"page_size": page_size}
+                          page_size: int = 100) -> dict:
+        """獲取區塊的一頁子區塊（回應含 has_more / next_cursor）"""
+        return self._make_request(*NotionEndpoints.get_block_children(
+            block_id, start_cursor, page_size
+        ))
+
+    def _list_block_children(self, block_id: str) -> list:
+        """獲取區塊的所有直接子區塊（依 has_more 游標取完所有分頁）
+        
+        Raises:
+            NotionRequestError: 請求失敗時
+        """
+        children = []
+        cursor = None
+        while True:
+            response = self._request(*NotionEndpoints.get_block_children(block_id, cursor))
+            children.extend(response.get("results", []))
+            if not response.get("has_more"):
+                return children
+            cursor = response.get("next_cursor")
+
+    def _block_tree_entries(self, block_id: str, max_depth: int, executor: ThreadPoolExecutor) -> list:
+        """獲取子區塊，並立即把每個 has_children 子區塊的請求送進執行緒池
+        
+        每一層取得後就排程下一層，所以整棵樹約只需「深度」次循序往返。
+        
+        Returns:
+            list: [(block, future 或 None)]，future 的結果同樣是這個格式
+        """
+        def fetch(parent_id, depth):
+            entries = []
+            for block in self._list_block_children(parent_id):
+                future = None
+                if block.get("has_children") and (max_depth is None or depth < max_depth):
+                    future = executor.submit(fetch, block["id"], depth + 1)
+                entries.append((block, future))
+            return entries
+
+        return fetch(block_id, 1)
+
+    def iter_block_tree(self, block_id: str, max_depth: int = None,
+                        max_workers: int = NotionConfig.BLOCK_TREE_WORKERS):
+        """依文件順序逐一產出區塊樹中的區塊，子區塊在背景並行預先獲取
+        
+        Args:
+            block_id: 頁面或區塊 ID
+            max_depth: 最大深度（1 表示只有直接子區塊，None 表示不限）
+            max_workers: 並行執行緒數
+            
+        Yields:
+            tuple: (depth, block)，depth 從 1 開始
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        def walk(entries, depth):
+            for block, future in entries:
+                yield depth, block
+                if future:
+                    yield from walk(future.result(), depth + 1)
+
+        try:
+            yield from walk(self._block_tree_entries(block_id, max_depth, executor), 1)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_block_tree(self, block_id: str, max_depth: int = None,
+                       max_workers: int = NotionConfig.BLOCK_TREE_WORKERS,
+                       compact: bool = True) -> list:
+        """遞迴獲取區塊樹
         
-        if start_cursor:
-            params["start_cursor"] = start_cursor
+        Args:
+            block_id: 頁面或區塊 ID
+            max_depth: 最大深度（1 表示只有直接子區塊，None 表示不限）
+            max_workers: 並行執行緒數
+            compact: 是否只保留 id / type / 內容（去除 created_by、parent 等中繼資料）
             
-        return self._make_request("GET", url)
+        Returns:
+            list: 區塊列表，有子區塊者帶有 "children" 欄位
+        """
+        def build(entries):
+            nodes = []
+            for block, future in entries:
+                node = NotionEndpoints.compact_block(block) if compact else dict(block)
+                if future:
+                    node["children"] = build(future.result())
+                nodes.append(node)
+            return nodes
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return build(self._block_tree_entries(block_id, max_depth, executor))
 
     def create_page(self, database_id: str,
                    properties: dict,
                    children: list = None) -> dict:
         """創建新頁面的改進方法"""
-        url = f"{NotionConfig.BASE_URL}/pages"
-        data = {
-            "parent": {"database_id": database_id},
-            "properties": properties
-        }
-        
-        if children:
-            data["children"] = children
-            
-        return self._make_request("POST", url, data)
+        return self._make_request(*NotionEndpoints.create_page(database_id, properties, children))
 
     def update_block(self, block_id: str, block_data: dict) -> dict:
         """更新區塊內容"""
-        url = f"{NotionConfig.BASE_URL}/blocks/{block_id}"
-        return self._make_request("PATCH", url, block_data)
+        return self._make_request(*NotionEndpoints.update_block(block_id, block_data))
 
     def create_database(self, parent_page_id: str, title: str, properties: dict) -> dict:
         """創建新數據庫"""
-        url = f"{NotionConfig.BASE_URL}/databases"
-        data = {
-            "parent": {"page_id": parent_page_id},
-            "title": [{"type": "text", "text": {"content": title}}],
-            "properties": properties
-        }
-        return self._make_request("POST", url, data)
+        return self._run_plan(self._create_database_plan(parent_page_id, title, properties))
 
-    def get_formatted_page_properties(self, page_id: str, property_list: list = None, raw_page_data: dict = None) -> dict:
+    def get_formatted_page_properties(self, page_id: str, property_list: list = None, raw_page_data: dict = None,
+                                      refresh: bool = False) -> dict:
         """獲取格式化後的頁面屬性值
         
         Args:
             page_id: 頁面ID
             property_list: 指定要獲取的屬性列表
             raw_page_data: 頁面完整數據（如果有的話，避免重複請求）
-        """
-        if raw_page_data:
-            raw_properties = raw_page_data.get("properties", {})
-            if property_list:
-                raw_properties = {
-                    prop: raw_properties.get(prop)
-                    for prop in property_list
-                    if prop in raw_properties
-                }
-        else:
-            raw_properties = self.get_page_properties(page_id, property_list)
-        
-        formatted_properties = {}
-        
-        for prop_name, prop_data in raw_properties.items():
-            value = PropertyValueExtractor.extract_value(prop_data)
-            
-            # 特殊處理 relation 類型，只保留第一個關聯的 ID
-            if isinstance(value, list) and prop_data.get('type') == 'relation':
-                value = value[0] if value else None
+            refresh: 略過頁面快取重新獲取
             
-            formatted_properties[prop_name] = value
-        
-        return formatted_properties
+        啟用頁面快取時，內容相同的頁面直接使用快取中的格式化結果，不重複解析。
+        """
+        return self._run_plan(self._formatted_page_properties_plan(
+            page_id, property_list, raw_page_data, refresh
+        ))
 
     def update_database(self, database_id: str, properties: dict = None, title: str = None) -> dict:
         """更新數據庫屬性或標題"""
-        url = f"{NotionConfig.BASE_URL}/databases/{database_id}"
-        data = {}
+        return self._run_plan(self._update_database_plan(database_id, properties, title))
+
+    def append_blocks(self, page_id: str, blocks) -> list:
+        """向頁面添加多個區塊
+        
+        依 Notion 的限制（每次 100 個、約 500KB）分批依序送出，巢狀子區塊在父區塊建立後
+        以後續請求添加。blocks 可以是 generator，會逐批讀取。
         
-        if properties:
-            data["properties"] = properties
-        if title:
-            data["title"] = [{"type": "text", "text": {"content": title}}]
+        Args:
+            page_id: 頁面或區塊 ID
+            blocks: 區塊的 iterable
             
-        return self._make_request("PATCH", url, data)
-
-    def append_blocks(self, page_id: str, blocks: list) -> dict:
-        """向頁面添加多個區塊"""
-        url = f"{NotionConfig.BASE_URL}/blocks/{page_id}/children"
-        data = {
-            "children": blocks
-        }
-        return self._make_request("PATCH", url, data)
+        Returns:
+            list: 直接添加在 page_id 下的新區塊 ID（依輸入順序），失敗時為 None
+        """
+        return self._run_plan(self._append_blocks_plan(page_id, blocks))
 
-    def add_image_to_page(self, page_id: str, image_url: str, caption: str = None, local_image_path: str = None) -> dict:
+    def add_image_to_page(self, page_id: str, image_url: str, caption: str = None, local_image_path: str = None) -> list:
         """向頁面添加圖片
         
         Args:
@@ -216,53 +569,73 @@ class NotionAPI(NotionRequestHandler):
             image_url: 圖片URL
             caption: 圖片說明文字（可選）
             local_image_path: 本地圖片路徑（可選）
+            
+        Returns:
+            list: 新圖片區塊的 ID（只有一個元素），失敗時為 None
         """
         if local_image_path:
             image_url = self.upload_to_imgur(local_image_path)
 
-        image_block = {
-            "type": "image",
-            "image": {
-                "type": "external",
-                "external": {
-                    "url": image_url
-                }
-            }
-        }
-        
-        if caption:
-            image_block["image"]["caption"] = [
-                {
-                    "type": "text",
-                    "text": {
-                        "content": caption
-                    }
-                }
-            ]
-            
+        image_block = NotionEndpoints.image_block(image_url, caption)
         return self.append_blocks(page_id, [image_block])
 
+    def append_image_blocks(self, page_id: str, images: list, captions: list = None,
+                            max_workers: int = NotionConfig.UPLOAD_MAX_WORKERS) -> BulkResult:
+        """並行上傳多張圖片並依原順序添加到頁面
+
+        每當下一張圖片上傳完成，就把它與其後已完成的圖片一起添加到頁面，其餘圖片同時繼續上傳；
+        上傳越慢、請求數越多（最多每張圖片一個請求）。上傳失敗的圖片會略過並記錄在 failed 中。
+
+        Args:
+            page_id: 頁面ID
+            images: 圖片 URL 或本地圖片路徑列表
+            captions: 對應的說明文字列表（可選）
+            max_workers: 同時上傳的數量
+
+        Returns:
+            BulkResult: succeeded 為 [(index, 新區塊ID)]，failed 為 [(index, 圖片, 錯誤)]；
+                        添加區塊失敗時回傳 None
+        """
+        images = list(images)
+        result = BulkResult()
+
+        for batch in self.block_builder.iter_image_block_batches(images, captions, max_workers):
+            appended = []
+            for index, block, error in batch:
+                if error is None:
+                    appended.append((index, block))
+                else:
+                    print(f"圖片 {images[index]} 上傳失敗: {error}")
+                    result.add_failure(index, images[index], error)
+            if not appended:
+                continue
+
+            created_ids = self.append_blocks(page_id, [block for _, block in appended])
+            if created_ids is None:
+                return None
+            for (index, _), block_id in zip(appended, created_ids):
+                result.add_success(index, block_id)
+
+        print(f"添加圖片：{result.summary()}")
+        return result
+
     def upload_to_imgur(self, image_path):
-        """上传图片到 Imgur 并返回链接"""
-        headers = {
-            'Authorization': f'Client-ID {self.imgur_client_id}'
-        }
-        
-        with open(image_path, 'rb') as image_file:
-            image_data = b64encode(image_file.read())
-        
-        response = requests.post(
-            'https://api.imgur.com/3/image',
-            headers=headers,
-            data={
-                'image': image_data
-            }
-        )
+        """上传图片到 Imgur 并返回链接（内容相同的图片直接使用快取中的链接）"""
+        if not self.block_builder.imgur_uploader:
+            raise Exception("要上傳本地圖片需要提供 Imgur client ID")
+        return self.block_builder.imgur_uploader.upload(image_path)
+
+    def get_database_schema(self, database_id: str, refresh: bool = False) -> dict:
+        """獲取數據庫物件（含完整的屬性定義），結果會快取
         
-        if response.status_code == 200:
-            return response.json()['data']['link']
-        else:
-            raise Exception(f"Imgur 上传失败: {response.text}")
+        Args:
+            database_id: 數據庫 ID
+            refresh: 是否略過快取重新獲取
+            
+        Returns:
+            dict: GET /databases/{id} 的回應，失敗時為 None
+        """
+        return self._run_plan(self._database_schema_plan(database_id, refresh))
 
     def get_database_properties(self, database_id: str) -> dict:
         """獲取數據庫所有可過濾的屬性信息
@@ -280,18 +653,28 @@ class NotionAPI(NotionRequestHandler):
                 ...
             }
         """
-        url = f"{NotionConfig.BASE_URL}/databases/{database_id}"
-        response = self._make_request("GET", url)
-        
-        if not response or 'properties' not in response:
-            return {}
-        
-        properties = {}
-        for prop_name, prop_info in response['properties'].items():
-            prop_type = prop_info.get('type')
-            properties[prop_name] = prop_type
+        return NotionEndpoints.parse_database_properties(self.get_database_schema(database_id))
+
+    def get_option_dictionary(self, database_id: str) -> OptionDictionary:
+        """依數據庫的 select / multi_select 選項建立代碼對照表"""
+        return OptionDictionary(self.get_database_select_options(database_id))
+
+    def get_row_extractor(self, database_id: str, property_list: list = None, as_tuple: bool = False,
+                          options: OptionDictionary = None):
+        """依數據庫 schema 編譯整列解碼函數，大量頁面格式化時取代逐一呼叫 extract_value
         
-        return properties
+        Args:
+            database_id: 數據庫 ID
+            property_list: 只解碼這些屬性（可選）
+            as_tuple: 是否回傳 tuple（欄位順序見回傳函數的 columns 屬性）
+            options: OptionDictionary（可選），select / multi_select 改為輸出整數代碼，
+                     以 options.decode() 取回名稱
+            
+        Returns:
+            function: page -> dict 或 tuple，輸出與 get_formatted_page_properties 相同
+        """
+        schema = self.get_database_properties(database_id)
+        return PropertyValueExtractor.compile_row_extractor(schema, property_list, as_tuple, options=options)
 
     def get_database_select_options(self, database_id: str) -> dict:
         """獲取數據庫中所有 select 和 multi_select 類型屬性的選項信息
@@ -324,32 +707,7 @@ class NotionAPI(NotionRequestHandler):
                 }
             }
         """
-        url = f"{NotionConfig.BASE_URL}/databases/{database_id}"
-        response = self._make_request("GET", url)
-        
-        if not response or 'properties' not in response:
-            return {}
-        
-        select_options = {}
-        for prop_name, prop_info in response['properties'].items():
-            prop_type = prop_info.get('type')
-            
-            if prop_type in ['select', 'multi_select']:
-                options = prop_info.get(prop_type, {}).get('options', [])
-                if options:
-                    select_options[prop_name] = {
-                        "type": prop_type,
-                        "options": [
-                            {
-                                "name": option['name'],
-                                "color": option['color'],
-                                "id": option['id']
-                            }
-                            for option in options
-                        ]
-                    }
-        
-        return select_options
+        return NotionEndpoints.parse_select_options(self.get_database_schema(database_id))
 
     def validate_file_property(self, prop_name: str, file_data: dict) -> None:
         """驗證文件屬性的格式是否正確
@@ -430,17 +788,7 @@ class NotionAPI(NotionRequestHandler):
         Returns:
             dict: 文件屬性的數據結構
         """
-        return {
-            "files": [
-                {
-                    "name": file_name,
-                    "type": "external",
-                    "external": {
-                        "url": file_url
-                    }
-                }
-            ]
-        }
+        return NotionEndpoints.create_file_property(file_name, file_url)
 
     def create_page_properties(self, properties: dict) -> dict:
         """創建頁面屬性的數據結構
@@ -455,25 +803,7 @@ class NotionAPI(NotionRequestHandler):
         Returns:
             dict: 格式化後的屬性數據結構
         """
-        formatted_properties = {}
-        
-        for prop_name, prop_value in properties.items():
-            if isinstance(prop_value, dict) and "url" in prop_value:
-                # 處理文件類型
-                formatted_properties[prop_name] = self.create_file_property(
-                    prop_value["name"],
-                    prop_value["url"]
-                )
-            elif prop_name == "Name":
-                # 處理標題
-                formatted_properties[prop_name] = {
-                    "title": [{"text": {"content": prop_value}}]
-                }
-            else:
-                # 其他類型直接使用
-                formatted_properties[prop_name] = prop_value
-        
-        return {"properties": formatted_properties}
+        return NotionEndpoints.create_page_properties(properties)
 
     def update_page_file(self, page_id: str, image_path: str, property_name: str = "File") -> bool:
         """更新頁面的文件屬性
@@ -510,13 +840,8 @@ class NotionAPI(NotionRequestHandler):
                     }
                 }
                 
-                # 使用完整的 URL
-                url = f"{NotionConfig.BASE_URL}/pages/{page_id}"
-                result = self._make_request(
-                    "PATCH", 
-                    url,
-                    update_properties
-                )
+                result = self._make_request(*NotionEndpoints.update_page(page_id, update_properties))
+                self._record_page_update(page_id, result)
                 
                 if result:
                     print(f"成功更新頁面圖片: {new_image_url}")
@@ -548,21 +873,75 @@ class NotionAPI(NotionRequestHandler):
             update_properties = self.create_page_properties(properties)
             
             # 發送請求
-            url = f"{NotionConfig.BASE_URL}/pages/{page_id}"
-            result = self._make_request("PATCH", url, update_properties)
+            result = self._make_request(*NotionEndpoints.update_page(page_id, update_properties))
+            self._record_page_update(page_id, result)
             
             if result:
-                print(f"成功更新頁面 {page_id}")
-                for prop_name, prop_value in properties.items():
-                    if isinstance(prop_value, dict) and "url" in prop_value:
-                        print(f"- 更新屬性 '{prop_name}':")
-                        print(f"  - 文件名稱: {prop_value['name']}")
-                        print(f"  - 文件 URL: {prop_value['url']}")
-                    else:
-                        print(f"- 更新屬性 '{prop_name}': {prop_value}")
+                NotionEndpoints.print_page_update(page_id, properties)
             
             return result
             
         except Exception as e:
             print(f"更新頁面失敗: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def coalesce_updates(self, max_pages: int = NotionConfig.COALESCE_MAX_PAGES,
+                         max_delay: float = NotionConfig.COALESCE_MAX_DELAY,
+                         max_workers: int = NotionConfig.BULK_MAX_WORKERS) -> UpdateCoalescer:
+        """建立寫入緩衝區，同一頁面的多次 update 合併為一次 PATCH（見 UpdateCoalescer）
+        
+        Args:
+            max_pages: 待送出的頁面數達到此值時立即送出
+            max_delay: 更新最多等待的秒數
+            max_workers: 送出 PATCH 的執行緒數
+        """
+        return UpdateCoalescer(self, max_pages=max_pages, max_delay=max_delay, max_workers=max_workers)
+
+    def create_pages_bulk(self, database_id: str, rows,
+                          max_workers: int = NotionConfig.BULK_MAX_WORKERS,
+                          on_result=None) -> BulkResult:
+        """批次創建頁面
+        
+        Args:
+            database_id: 數據庫 ID
+            rows: 頁面屬性（與 create_page 的 properties 相同格式）的 iterable，可為 generator
+            max_workers: 並行執行緒數
+            on_result: 每筆完成時的回呼 on_result(index, row, result, error)
+            
+        Returns:
+            BulkResult: succeeded 中的結果為新頁面 ID
+        """
+        def create(properties):
+            return self._request(*NotionEndpoints.create_page(database_id, properties))["id"]
+
+        result = run_bulk(create, rows, max_workers=max_workers, on_result=on_result)
+        print(f"批次創建頁面完成，{result.summary()}")
+        return result
+
+    def update_pages_bulk(self, updates,
+                          max_workers: int = NotionConfig.BULK_MAX_WORKERS,
+                          on_result=None) -> BulkResult:
+        """批次更新頁面屬性
+        
+        Args:
+            updates: (page_id, properties) 的 iterable，properties 格式同 update_page
+            max_workers: 並行執行緒數
+            on_result: 每筆完成時的回呼 on_result(index, update, result, error)
+            
+        Returns:
+            BulkResult: succeeded 中的結果為頁面 ID
+        """
+        def update(item):
+            page_id, properties = item
+            update_properties = NotionEndpoints.create_page_properties(properties)
+            try:
+                result = self._request(*NotionEndpoints.update_page(page_id, update_properties))
+            except Exception:
+                self._record_page_update(page_id, None)
+                raise
+            self._record_page_update(page_id, result)
+            return page_id
+
+        result = run_bulk(update, updates, max_workers=max_workers, on_result=on_result)
+        print(f"批次更新頁面完成，{result.summary()}")
+        return result
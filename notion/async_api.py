@@ -0,0 +1,209 @@
+import asyncio
+from .handlers import AsyncNotionRequestHandler
+from .builders import BlockBuilder
+from .config import NotionConfig
+from .endpoints import NotionEndpoints
+from .upload_cache import UploadCache
+from .client import NotionClientMixin
+
+
+class AsyncNotionAPI(NotionClientMixin, AsyncNotionRequestHandler):
+    """NotionAPI 的 asyncio 版本
+
+    方法與 NotionAPI 相同但皆為 coroutine，請求建構與屬性解析共用 NotionEndpoints，
+    快取處理與多步驟流程（例如巢狀區塊的添加）共用 NotionClientMixin。
+    並行數量受 max_in_flight 限制，且與同步版本共用同一個 token 的速率限制，
+    可以直接用 asyncio.gather 大量並行呼叫：
+
+        async with AsyncNotionAPI(token) as notion:
+            pages = await asyncio.gather(*(notion.get_page_properties(i) for i in page_ids))
+    """
+
+    def __init__(self, token: str,
+                 client=None,
+                 pool_maxsize: int = NotionConfig.POOL_MAXSIZE,
+                 http2: bool = False,
+                 timeout: float = NotionConfig.REQUEST_TIMEOUT,
+                 rate_limit: float = None,
+                 burst: int = None,
+                 max_in_flight: int = NotionConfig.MAX_IN_FLIGHT,
+                 max_retries: int = NotionConfig.MAX_RETRIES,
+                 upload_cache_path: str = NotionConfig.UPLOAD_CACHE_PATH,
+                 page_cache: bool = False,
+                 instrumentation=None,
+                 base_url: str = None):
+        super().__init__(
+            token,
+            client=client,
+            pool_maxsize=pool_maxsize,
+            http2=http2,
+            timeout=timeout,
+            rate_limit=rate_limit,
+            burst=burst,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries,
+            instrumentation=instrumentation,
+            base_url=base_url
+        )
+        self.imgur_client_id = NotionConfig.IMGUR_CLIENT_ID
+        self._init_caches(page_cache)
+        self.upload_cache = UploadCache(upload_cache_path)
+        # 上傳圖片使用同步的 requests session（在執行緒中執行），aclose() 時一併關閉
+        self.block_builder = BlockBuilder(
+            self.imgur_client_id or None, upload_cache=self.upload_cache, timeout=timeout
+        )
+
+    async def aclose(self) -> None:
+        """關閉 httpx client 與圖片上傳的 session"""
+        self.block_builder.close()
+        await super().aclose()
+
+    async def query_database(self, database_id: str,
+                             filter_params: dict = None,
+                             sort_params: list = None,
+                             page_size: int = 100,
+                             start_cursor: str = None) -> dict:
+        """數據庫查詢（參數同 NotionAPI.query_database）"""
+        return await self._make_request(*NotionEndpoints.query_database(
+            database_id, filter_params, sort_params, page_size, start_cursor
+        ))
+
+    async def query_database_all(self, database_id: str,
+                                 filter_params: dict = None,
+                                 sort_params: list = None,
+                                 page_size: int = 100) -> list:
+        """獲取數據庫中的所有記錄"""
+        all_results = []
+        async for result in self.iter_database(database_id, filter_params, sort_params, page_size):
+            all_results.append(result)
+
+        return all_results
+
+    async def iter_database(self, database_id: str,
+                            filter_params: dict = None,
+                            sort_params: list = None,
+                            page_size: int = 100,
+                            start_cursor: str = None,
+                            pages: bool = False,
+                            prefetch: bool = False):
+        """逐頁查詢數據庫的 async generator（參數同 NotionAPI.iter_database）"""
+        def fetch(cursor):
+            return self.query_database(
+                database_id=database_id,
+                filter_params=filter_params,
+                sort_params=sort_params,
+                page_size=page_size,
+                start_cursor=cursor
+            )
+
+        response = await fetch(start_cursor)
+        while response:
+            has_more = response.get('has_more', False)
+            next_cursor = response.get('next_cursor')
+
+            # 先排程下一頁的請求，再把目前這頁交給呼叫端
+            pending = asyncio.ensure_future(fetch(next_cursor)) if has_more and prefetch else None
+            self._observe_pages(response.get('results', []))
+            try:
+                if pages:
+                    yield response
+                else:
+                    for result in response.get('results', []):
+                        yield result
+            except GeneratorExit:
+                if pending:
+                    pending.cancel()
+                raise
+
+            if not has_more:
+                break
+            response = await pending if pending else await fetch(next_cursor)
+
+    async def _page_entry(self, page_id: str, refresh: bool = False):
+        """從頁面快取取得查詢確認過的頁面，沒有（或 refresh、未啟用快取）時才發送 GET"""
+        return await self._run_plan(self._page_entry_plan(page_id, refresh))
+
+    async def get_page_properties(self, page_id: str, property_list: list = None,
+                                  refresh: bool = False) -> dict:
+        """獲取頁面屬性，支持選擇性獲取（參數同 NotionAPI.get_page_properties）"""
+        entry = await self._page_entry(page_id, refresh)
+
+        if not entry:
+            return {}
+
+        return NotionEndpoints.select_properties(entry.page, property_list)
+
+    async def get_formatted_page_properties(self, page_id: str, property_list: list = None,
+                                            raw_page_data: dict = None, refresh: bool = False) -> dict:
+        """獲取格式化後的頁面屬性值（參數同 NotionAPI.get_formatted_page_properties）"""
+        return await self._run_plan(self._formatted_page_properties_plan(
+            page_id, property_list, raw_page_data, refresh
+        ))
+
+    async def get_block_children(self, block_id: str,
+                                 start_cursor: str = None,
+                                 page_size: int = 100) -> dict:
+        """獲取區塊內容"""
+        return await self._make_request(*NotionEndpoints.get_block_children(
+            block_id, start_cursor, page_size
+        ))
+
+    async def create_page(self, database_id: str,
+                          properties: dict,
+                          children: list = None) -> dict:
+        """創建新頁面"""
+        return await self._make_request(*NotionEndpoints.create_page(database_id, properties, children))
+
+    async def update_page(self, page_id: str, properties: dict) -> dict:
+        """更新頁面屬性（properties 格式同 NotionAPI.update_page）"""
+        try:
+            update_properties = NotionEndpoints.create_page_properties(properties)
+            result = await self._make_request(*NotionEndpoints.update_page(page_id, update_properties))
+            self._record_page_update(page_id, result)
+
+            if result:
+                NotionEndpoints.print_page_update(page_id, properties)
+
+            return result
+
+        except Exception as e:
+            print(f"更新頁面失敗: {e}")
+            return None
+
+    async def update_block(self, block_id: str, block_data: dict) -> dict:
+        """更新區塊內容"""
+        return await self._make_request(*NotionEndpoints.update_block(block_id, block_data))
+
+    async def append_blocks(self, page_id: str, blocks) -> list:
+        """向頁面分批添加區塊，回傳新區塊 ID（同 NotionAPI.append_blocks）"""
+        return await self._run_plan(self._append_blocks_plan(page_id, blocks))
+
+    async def add_image_to_page(self, page_id: str, image_url: str, caption: str = None,
+                                local_image_path: str = None) -> list:
+        """向頁面添加圖片，本地圖片會在背景執行緒上傳到 Imgur，回傳新區塊 ID（同 NotionAPI.add_image_to_page）"""
+        if local_image_path:
+            if not self.block_builder.imgur_uploader:
+                raise Exception("要上傳本地圖片需要提供 Imgur client ID")
+            image_url = await asyncio.to_thread(self.block_builder.imgur_uploader.upload, local_image_path)
+
+        return await self.append_blocks(page_id, [NotionEndpoints.image_block(image_url, caption)])
+
+    async def create_database(self, parent_page_id: str, title: str, properties: dict) -> dict:
+        """創建新數據庫"""
+        return await self._run_plan(self._create_database_plan(parent_page_id, title, properties))
+
+    async def update_database(self, database_id: str, properties: dict = None, title: str = None) -> dict:
+        """更新數據庫屬性或標題"""
+        return await self._run_plan(self._update_database_plan(database_id, properties, title))
+
+    async def get_database_schema(self, database_id: str, refresh: bool = False) -> dict:
+        """獲取數據庫物件（含完整的屬性定義），結果會快取"""
+        return await self._run_plan(self._database_schema_plan(database_id, refresh))
+
+    async def get_database_properties(self, database_id: str) -> dict:
+        """獲取數據庫所有屬性名稱及其類型"""
+        return NotionEndpoints.parse_database_properties(await self.get_database_schema(database_id))
+
+    async def get_database_select_options(self, database_id: str) -> dict:
+        """獲取數據庫中 select 和 multi_select 屬性的選項信息"""
+        return NotionEndpoints.parse_select_options(await self.get_database_schema(database_id))
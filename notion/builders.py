@@ -1,29 +1,75 @@
-import base64
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 from pathlib import Path
 from .config import NotionConfig
+from .upload_cache import UploadCache
+from .bulk import BulkResult
+from .multipart import MultipartFileStream
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 class ImgurUploader:
     """處理圖片上傳到 Imgur 的類"""
     API_URL = "https://api.imgur.com/3/image"
     
-    def __init__(self, client_id: str):
+    def __init__(self, client_id: str, session=None, cache: UploadCache = None, timeout: float = None,
+                 preprocessor=None):
+        """
+        Args:
+            client_id: Imgur API 的 client ID
+            session: 共用的 HTTP session（可選，通常由 NotionAPI 傳入以重用連線，提供時不會在 close() 時關閉）
+            cache: 上傳快取（可選），內容相同的圖片直接回傳先前的連結
+            timeout: 上傳逾時秒數（可選）
+            preprocessor: ImagePreprocessor（可選），上傳前先縮小並重新壓縮圖片
+        """
         self.headers = {'Authorization': f'Client-ID {client_id}'}
+        self._owns_session = session is None
+        self.session = session if session is not None else requests.Session()
+        self.cache = cache
+        self.timeout = timeout
+        self.preprocessor = preprocessor
+
+    def close(self) -> None:
+        """關閉自行建立的 session"""
+        if self._owns_session:
+            self.session.close()
     
     def upload(self, image_path: Union[str, Path]) -> str:
-        """上傳圖片到 Imgur 並返回 URL"""
+        """上傳圖片到 Imgur 並返回 URL（有快取時相同內容的圖片不會重複上傳）"""
+        if self.preprocessor is not None:
+            image_path = self.preprocessor.process(image_path)
+
+        if self.cache is not None:
+            link = self.cache.get(image_path)
+            if link:
+                return link
+
+        link = self._upload(image_path)
+        if self.cache is not None:
+            self.cache.set(image_path, link)
+        return link
+
+    def _upload(self, image_path: Union[str, Path]) -> str:
         try:
-            # 讀取圖片文件
-            with open(image_path, 'rb') as image_file:
-                image_data = base64.b64encode(image_file.read())
-            
-            # 上傳到 Imgur
-            response = requests.post(
-                self.API_URL,
-                headers=self.headers,
-                data={'image': image_data}
-            )
+            # 以 multipart 從磁碟串流上傳，不把整個檔案讀進記憶體
+            with MultipartFileStream(str(image_path), 'image') as body:
+                headers = dict(self.headers)
+                headers['Content-Type'] = body.content_type
+                headers['Content-Length'] = str(len(body))
+
+                if httpx is not None and isinstance(self.session, httpx.Client):
+                    # httpx.Client（HTTP/2）以 content 接收可迭代的內容
+                    response = self.session.post(
+                        self.API_URL, headers=headers, content=body, timeout=self.timeout
+                    )
+                else:
+                    response = self.session.post(
+                        self.API_URL, headers=headers, data=body, timeout=self.timeout
+                    )
             
             if response.status_code == 200:
                 return response.json()['data']['link']
@@ -34,14 +80,27 @@ class ImgurUploader:
             raise Exception(f"圖片上傳失敗: {str(e)}")
 
 class BlockBuilder:
-    def __init__(self, imgur_client_id: str = None):
+    def __init__(self, imgur_client_id: str = None, session=None, upload_cache: UploadCache = None,
+                 timeout: float = None, preprocessor=None):
         """
         初始化 BlockBuilder
         
         Args:
             imgur_client_id: Imgur API 的 client ID，用於上傳本地圖片
+            session: 共用的 HTTP session（可選）
+            upload_cache: 上傳快取（可選），通常由 NotionAPI 傳入以共用
+            timeout: 上傳逾時秒數（可選）
+            preprocessor: ImagePreprocessor（可選），上傳前先縮小並重新壓縮圖片
         """
-        self.imgur_uploader = ImgurUploader(imgur_client_id) if imgur_client_id else None
+        self.imgur_uploader = ImgurUploader(
+            imgur_client_id, session=session, cache=upload_cache, timeout=timeout,
+            preprocessor=preprocessor
+        ) if imgur_client_id else None
+
+    def close(self) -> None:
+        """關閉上傳用的 session（由外部提供的 session 不會關閉）"""
+        if self.imgur_uploader is not None:
+            self.imgur_uploader.close()
 
     @staticmethod
     def text_block(content: str) -> dict:
@@ -97,3 +156,62 @@ class BlockBuilder:
             ]
 
         return block
+
+    def iter_image_blocks(self, images: list, captions: list = None,
+                          max_workers: int = NotionConfig.UPLOAD_MAX_WORKERS):
+        """並行上傳多張圖片，依原順序逐一產出結果（前面的圖片完成即可先使用）
+
+        Args:
+            images: 圖片 URL 或本地圖片路徑列表
+            captions: 對應的說明文字列表（可選）
+            max_workers: 同時上傳的數量
+
+        Yields:
+            tuple: (index, 圖片區塊或 None, 例外或 None)
+        """
+        for batch in self.iter_image_block_batches(images, captions, max_workers):
+            yield from batch
+
+    def iter_image_block_batches(self, images: list, captions: list = None,
+                                 max_workers: int = NotionConfig.UPLOAD_MAX_WORKERS):
+        """並行上傳多張圖片，依原順序分批產出結果
+
+        等待下一張圖片完成後，連同其後已經完成的圖片一起產出，
+        呼叫端處理這一批時其餘圖片仍在上傳。
+
+        Yields:
+            list: [(index, 圖片區塊或 None, 例外或 None)]
+        """
+        images = list(images)
+        captions = list(captions) if captions else [None] * len(images)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.image_block, image, caption)
+                for image, caption in zip(images, captions)
+            ]
+            index = 0
+            while index < len(futures):
+                batch = []
+                while index < len(futures) and (not batch or futures[index].done()):
+                    error = futures[index].exception()
+                    batch.append((index, None if error else futures[index].result(), error))
+                    index += 1
+                yield batch
+
+    def image_blocks(self, images: list, captions: list = None,
+                     max_workers: int = NotionConfig.UPLOAD_MAX_WORKERS) -> BulkResult:
+        """並行建立多個圖片區塊
+
+        Returns:
+            BulkResult: succeeded 為 [(index, 區塊)]（依原順序），failed 為 [(index, 圖片, 錯誤)]
+        """
+        images = list(images)
+        result = BulkResult()
+        for index, block, error in self.iter_image_blocks(images, captions, max_workers):
+            if error is None:
+                result.add_success(index, block)
+            else:
+                print(f"圖片 {images[index]} 處理失敗: {error}")
+                result.add_failure(index, images[index], error)
+        return result
@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .handlers import NotionRequestError
+
+
+class BulkResult:
+    """批次作業的逐筆結果
+
+    succeeded: [(index, result)]
+    failed: [(index, item, error)]  不可重試的錯誤（例如 400 驗證失敗）
+    retriable: [(index, item, error)]  重試用盡仍失敗的暫時性錯誤（429 / 5xx / 網路），可重新提交
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.retriable = []
+        self.lock = threading.Lock()
+
+    def add_success(self, index: int, result) -> None:
+        with self.lock:
+            self.succeeded.append((index, result))
+
+    def add_failure(self, index: int, item, error: Exception) -> None:
+        with self.lock:
+            if isinstance(error, NotionRequestError) and error.retriable:
+                self.retriable.append((index, item, error))
+            else:
+                self.failed.append((index, item, error))
+
+    @property
+    def total(self) -> int:
+        return len(self.succeeded) + len(self.failed) + len(self.retriable)
+
+    def retry_items(self) -> list:
+        """可重新提交的項目"""
+        return [item for _, item, _ in self.retriable]
+
+    def summary(self) -> str:
+        return (f"共 {self.total} 筆：成功 {len(self.succeeded)}，"
+                f"失敗 {len(self.failed)}，可重試 {len(self.retriable)}")
+
+    def __repr__(self) -> str:
+        return f"<BulkResult {self.summary()}>"
+
+
+def run_bulk(func, items, max_workers: int = 4, max_pending: int = None,
+             on_result=None) -> BulkResult:
+    """以執行緒池逐筆執行 func(item)，單筆失敗不會中斷整個作業
+
+    items 可以是任意 iterator，只會預先讀取 max_pending 筆，大於記憶體的輸入也能串流處理。
+
+    Args:
+        func: 處理單筆項目的函數，失敗時拋出例外
+        items: 項目的 iterable
+        max_workers: 執行緒數（實際請求速率仍受 handler 的速率限制）
+        max_pending: 同時排隊中的最大項目數（預設為 max_workers 的兩倍）
+        on_result: 每筆完成時的回呼 on_result(index, item, result, error)
+
+    Returns:
+        BulkResult: 逐筆結果
+    """
+    max_pending = max_pending or max_workers * 2
+    result = BulkResult()
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            index, item = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                result.add_success(index, future.result())
+            else:
+                result.add_failure(index, item, error)
+            if on_result:
+                on_result(index, item, None if error else future.result(), error)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, item in enumerate(items):
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[executor.submit(func, item)] = (index, item)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    return result
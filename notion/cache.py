@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """執行緒安全、有容量上限的 LRU + TTL 快取，並記錄命中/未命中次數"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300):
+        """
+        Args:
+            maxsize: 最多保留的項目數，超過時淘汰最久未使用的項目
+            ttl: 每個項目的存活秒數
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """取得快取值，過期或不存在時回傳 default"""
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at > time.monotonic():
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        """寫入快取值"""
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + self.ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def invalidate(self, key) -> None:
+        """移除單一項目"""
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self.lock:
+            self.data.clear()
+
+    def stats(self) -> dict:
+        """快取統計：{"hits", "misses", "size", "hit_rate"}"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.data),
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self.data)
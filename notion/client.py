@@ -0,0 +1,114 @@
+from .cache import TTLCache
+from .config import NotionConfig
+from .endpoints import NotionEndpoints
+from .page_cache import PageCache, PageEntry
+
+
+class NotionClientMixin:
+    """NotionAPI 與 AsyncNotionAPI 共用的快取處理與多步驟請求流程
+
+    需要多個請求的流程寫成 generator：每次 yield 一個請求 tuple（同 NotionEndpoints），
+    由 handler 的 _run_plan 送出並把回應 send 回來，最後以 return 回傳結果。
+    同步與非同步版本只差在 _run_plan，流程本身只有一份。
+    """
+
+    def _init_caches(self, page_cache: bool = False) -> None:
+        # 數據庫 schema 快取，get_database_properties / get_database_select_options 共用
+        self.schema_cache = TTLCache(NotionConfig.SCHEMA_CACHE_SIZE, NotionConfig.SCHEMA_CACHE_TTL)
+        # 頁面快取（可選），查詢、GET 與 PATCH 的結果會更新它，查詢確認後的有效期內不需要再單獨 GET
+        self.page_cache = PageCache(
+            NotionConfig.PAGE_CACHE_SIZE, NotionConfig.PAGE_CACHE_TTL
+        ) if page_cache else None
+
+    def _observe_pages(self, pages: list) -> None:
+        """查詢結果即是最新的頁面內容，啟用頁面快取時順便更新"""
+        if self.page_cache is not None:
+            self.page_cache.observe_many(pages)
+
+    def _record_page_update(self, page_id: str, result) -> None:
+        """PATCH 回傳更新後的頁面，用來更新頁面快取（失敗時 result 為 None，移除該頁面）"""
+        if self.page_cache is not None:
+            self.page_cache.record_update(page_id, result)
+
+    def _database_schema_plan(self, database_id: str, refresh: bool = False):
+        """獲取數據庫物件，優先使用 schema 快取"""
+        if not refresh:
+            database = self.schema_cache.get(database_id)
+            if database is not None:
+                return database
+
+        database = yield NotionEndpoints.get_database(database_id)
+        if database:
+            self.schema_cache.set(database_id, database)
+        return database
+
+    def _create_database_plan(self, parent_page_id: str, title: str, properties: dict):
+        result = yield NotionEndpoints.create_database(parent_page_id, title, properties)
+        if result and "id" in result:
+            self.schema_cache.set(result["id"], result)
+        return result
+
+    def _update_database_plan(self, database_id: str, properties: dict = None, title: str = None):
+        self.schema_cache.invalidate(database_id)
+        result = yield NotionEndpoints.update_database(database_id, properties, title)
+        # 更新後 schema 可能改變（例如雙向關聯會影響其他數據庫），再次清除避免並行讀取留下舊值
+        self.schema_cache.invalidate(database_id)
+        return result
+
+    def _page_entry_plan(self, page_id: str, refresh: bool = False):
+        """從頁面快取取得查詢確認過的頁面，沒有（或 refresh、未啟用快取）時才發送 GET"""
+        if self.page_cache is not None and not refresh:
+            entry = self.page_cache.lookup(page_id)
+            if entry is not None:
+                return entry
+
+        response = yield NotionEndpoints.get_page(page_id)
+        if not response:
+            return None
+        entry = self.page_cache.observe(response, replace=True) if self.page_cache is not None else None
+        # 未啟用快取或已封存的頁面不寫入快取
+        return entry or PageEntry(response)
+
+    def _formatted_page_properties_plan(self, page_id: str, property_list: list = None,
+                                        raw_page_data: dict = None, refresh: bool = False):
+        if raw_page_data:
+            if self.page_cache is not None:
+                return self.page_cache.format(raw_page_data, property_list)
+            return NotionEndpoints.format_properties(
+                NotionEndpoints.select_properties(raw_page_data, property_list)
+            )
+
+        entry = yield from self._page_entry_plan(page_id, refresh)
+        if entry is None:
+            return {}
+        return entry.format(property_list)
+
+    def _append_blocks_plan(self, page_id: str, blocks):
+        """分批添加區塊，超出巢狀限制的子區塊在父區塊建立後以後續請求添加"""
+        created_ids = []
+        for chunk in NotionEndpoints.chunk_blocks(blocks):
+            response = yield NotionEndpoints.append_blocks(page_id, [block for block, _ in chunk])
+            if not response:
+                print(f"添加區塊失敗，已添加 {len(created_ids)} 個區塊")
+                return None
+
+            created = response.get("results", [])[-len(chunk):]
+            for (_, deferred), block in zip(chunk, created):
+                created_ids.append(block["id"])
+                for path, children in deferred:
+                    parent_id = yield from self._child_block_id_plan(block["id"], path)
+                    if parent_id is None or (yield from self._append_blocks_plan(parent_id, children)) is None:
+                        return None
+
+        return created_ids
+
+    def _child_block_id_plan(self, block_id: str, path: tuple):
+        """依子區塊索引路徑找出巢狀子區塊的 ID（添加區塊的回應只包含最上層的區塊）"""
+        for index in path:
+            response = yield NotionEndpoints.get_block_children(block_id, page_size=index + 1)
+            results = (response or {}).get("results", [])
+            if len(results) <= index:
+                print(f"找不到區塊 {block_id} 的第 {index + 1} 個子區塊")
+                return None
+            block_id = results[index]["id"]
+        return block_id
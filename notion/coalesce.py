@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from .config import NotionConfig
+from .endpoints import NotionEndpoints
+
+
+class UpdateCoalescer:
+    """頁面更新的寫入緩衝區：同一頁面在送出前的多次更新合併為一次 PATCH
+
+    同一屬性以最後一次寫入為準。待送出的頁面數達到 max_pages、最早的更新等待超過
+    max_delay 秒，或呼叫 flush() 時送出。每次 update() 回傳 Future，結果為該頁面的
+    更新回應（合併在同一次 PATCH 的呼叫會得到相同的回應）。同一頁面的 PATCH 依序送出。
+
+        with notion.coalesce_updates(max_delay=2.0) as writer:
+            writer.update(page_id, {"Name": "新標題"})
+            writer.update(page_id, {"Status": {"select": {"name": "Done"}}})
+        # 離開 with 時 flush，上面兩次更新只送出一個請求
+    """
+
+    def __init__(self, notion,
+                 max_pages: int = NotionConfig.COALESCE_MAX_PAGES,
+                 max_delay: float = NotionConfig.COALESCE_MAX_DELAY,
+                 max_workers: int = NotionConfig.BULK_MAX_WORKERS):
+        """
+        Args:
+            notion: NotionAPI 實例
+            max_pages: 待送出的頁面數達到此值時立即送出
+            max_delay: 更新最多等待的秒數
+            max_workers: 送出 PATCH 的執行緒數
+        """
+        self.notion = notion
+        self.max_pages = max_pages
+        self.max_delay = max_delay
+        self.lock = threading.Condition()
+        self.pending = {}     # page_id -> {"properties", "futures", "queued"}
+        self.in_flight = {}   # page_id -> 最後一個送出中的 Future
+        self.requested = 0
+        self.sent = 0
+        self.closed = False
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.timer = threading.Thread(target=self._run_timer, daemon=True)
+        self.timer.start()
+
+    def update(self, page_id: str, properties: dict) -> Future:
+        """加入一次更新（properties 格式同 NotionAPI.update_page）"""
+        future = Future()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("寫入緩衝區已關閉")
+            entry = self.pending.get(page_id)
+            if entry is None:
+                entry = self.pending[page_id] = {"properties": {}, "futures": [], "queued": time.monotonic()}
+            entry["properties"].update(properties)
+            entry["futures"].append(future)
+            self.requested += 1
+
+            if len(self.pending) >= self.max_pages:
+                self._submit_all()
+            else:
+                self.lock.notify()
+        return future
+
+    def flush(self, wait_for_results: bool = True) -> None:
+        """立即送出所有待送出的更新"""
+        with self.lock:
+            sends = self._submit_all()
+        if wait_for_results and sends:
+            wait(sends)
+
+    def _submit_all(self) -> list:
+        batch, self.pending = self.pending, {}
+        return [self._submit(page_id, entry) for page_id, entry in batch.items()]
+
+    def _submit(self, page_id: str, entry: dict) -> Future:
+        # 呼叫時必須持有 lock；同一頁面前一次的 PATCH 完成後才會送出
+        previous = self.in_flight.get(page_id)
+        send = self.executor.submit(self._send, page_id, entry, previous)
+        self.in_flight[page_id] = send
+        self.sent += 1
+        send.add_done_callback(lambda future: self._done(page_id, future))
+        return send
+
+    def _done(self, page_id: str, future: Future) -> None:
+        with self.lock:
+            if self.in_flight.get(page_id) is future:
+                del self.in_flight[page_id]
+
+    def _send(self, page_id: str, entry: dict, previous: Future) -> None:
+        if previous is not None:
+            wait([previous])
+
+        properties = entry["properties"]
+        try:
+            result = self.notion._request(*NotionEndpoints.update_page(
+                page_id, NotionEndpoints.create_page_properties(properties)
+            ))
+        except Exception as e:
+            self.notion._record_page_update(page_id, None)
+            print(f"更新頁面 {page_id} 失敗: {e}")
+            for future in entry["futures"]:
+                future.set_exception(e)
+            return
+
+        self.notion._record_page_update(page_id, result)
+        NotionEndpoints.print_page_update(page_id, properties)
+        for future in entry["futures"]:
+            future.set_result(result)
+
+    def _run_timer(self) -> None:
+        """背景執行緒：送出等待超過 max_delay 的更新"""
+        with self.lock:
+            while not self.closed:
+                if not self.pending:
+                    self.lock.wait()
+                    continue
+
+                now = time.monotonic()
+                deadline = min(entry["queued"] for entry in self.pending.values()) + self.max_delay
+                if deadline > now:
+                    self.lock.wait(deadline - now)
+                    continue
+
+                for page_id in [page_id for page_id, entry in self.pending.items()
+                                if entry["queued"] + self.max_delay <= now]:
+                    self._submit(page_id, self.pending.pop(page_id))
+
+    def stats(self) -> dict:
+        """update() 的呼叫次數與實際送出的 PATCH 數"""
+        with self.lock:
+            return {"requested": self.requested, "sent": self.sent, "pending": len(self.pending)}
+
+    def close(self) -> None:
+        """送出剩餘的更新並停止背景執行緒"""
+        # 標記關閉與取出待送出的更新在同一個臨界區內，之後的 update() 一定會收到錯誤而不會被遺漏
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            sends = self._submit_all()
+            self.lock.notify_all()
+        if sends:
+            wait(sends)
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
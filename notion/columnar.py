@@ -0,0 +1,423 @@
+import json
+from array import array
+from datetime import datetime, timezone
+from .config import NotionConfig
+from .extractors import PropertyValueExtractor
+
+PropertyType = NotionConfig.PropertyType
+TEXT_TYPES = (PropertyType.TITLE, PropertyType.RICH_TEXT, PropertyType.URL,
+              PropertyType.EMAIL, PropertyType.PHONE)
+
+
+def _pyarrow():
+    """延遲載入 pyarrow，只有轉換為 Arrow 時才需要（載入本身就要數十 MB 記憶體）"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("轉換為 Arrow 需要安裝 pyarrow：pip install pyarrow") from None
+    return pyarrow
+
+
+def date_to_epoch_ms(value: str) -> int:
+    """ISO 日期/時間字串轉為 UTC epoch 毫秒（只有日期時視為 UTC 午夜）"""
+    if len(value) == 10:
+        parsed = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    else:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+class Bitmap:
+    """Arrow 相容的有效位元圖（LSB 優先），記錄哪些值不是 null"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.length = 0
+        self.null_count = 0
+
+    def append(self, valid: bool) -> None:
+        if self.length % 8 == 0:
+            self.data.append(0)
+        if valid:
+            self.data[-1] |= 1 << (self.length % 8)
+        else:
+            self.null_count += 1
+        self.length += 1
+
+    def __getitem__(self, index: int) -> bool:
+        return bool(self.data[index >> 3] & (1 << (index & 7)))
+
+    def buffer(self):
+        """沒有 null 時 Arrow 可省略位元圖"""
+        return _pyarrow().py_buffer(self.data) if self.null_count else None
+
+
+class NumberColumn:
+    """float64 欄位（array('d')，null 以位元圖標記）"""
+    arrow_type = "float64"
+
+    def __init__(self):
+        self.values = array("d")
+        self.validity = Bitmap()
+
+    def append(self, value) -> None:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        self.values.append(value if valid else 0.0)
+        self.validity.append(valid)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.itemsize * len(self.values) + len(self.validity.data)
+
+    def to_pylist(self) -> list:
+        return [v if self.validity[i] else None for i, v in enumerate(self.values)]
+
+    def to_numpy(self):
+        """零複製的 NumPy 陣列（null 位置的值為 0）"""
+        import numpy
+        return numpy.frombuffer(self.values, dtype=numpy.float64)
+
+    def to_arrow(self):
+        pyarrow = _pyarrow()
+        return pyarrow.Array.from_buffers(
+            pyarrow.float64(), len(self),
+            [self.validity.buffer(), pyarrow.py_buffer(self.values)],
+            null_count=self.validity.null_count
+        )
+
+
+class BooleanColumn:
+    """布林欄位（直接以位元圖保存）"""
+
+    def __init__(self):
+        self.values = Bitmap()
+
+    def append(self, value) -> None:
+        self.values.append(bool(value))
+
+    def __len__(self):
+        return self.values.length
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.values.data)
+
+    def to_pylist(self) -> list:
+        return [self.values[i] for i in range(len(self))]
+
+    def to_arrow(self):
+        pyarrow = _pyarrow()
+        return pyarrow.Array.from_buffers(
+            pyarrow.bool_(), len(self), [None, pyarrow.py_buffer(self.values.data)]
+        )
+
+
+class DateColumn:
+    """日期欄位，起始與結束時間各存為 int64 epoch 毫秒"""
+
+    def __init__(self):
+        self.start = array("q")
+        self.end = array("q")
+        self.start_validity = Bitmap()
+        self.end_validity = Bitmap()
+
+    def append(self, value) -> None:
+        start = value.get("start") if value else None
+        end = value.get("end") if value else None
+        self.start.append(date_to_epoch_ms(start) if start else 0)
+        self.start_validity.append(bool(start))
+        self.end.append(date_to_epoch_ms(end) if end else 0)
+        self.end_validity.append(bool(end))
+
+    def __len__(self):
+        return len(self.start)
+
+    @property
+    def nbytes(self) -> int:
+        return 8 * (len(self.start) + len(self.end)) + len(self.start_validity.data) * 2
+
+    def to_pylist(self) -> list:
+        return [
+            (self.start[i], self.end[i] if self.end_validity[i] else None) if self.start_validity[i] else None
+            for i in range(len(self))
+        ]
+
+    def to_numpy(self):
+        import numpy
+        return numpy.frombuffer(self.start, dtype=numpy.int64)
+
+    def to_arrow(self):
+        pyarrow = _pyarrow()
+        timestamp = pyarrow.timestamp("ms", tz="UTC")
+        start = pyarrow.Array.from_buffers(
+            timestamp, len(self),
+            [self.start_validity.buffer(), pyarrow.py_buffer(self.start)],
+            null_count=self.start_validity.null_count
+        )
+        end = pyarrow.Array.from_buffers(
+            timestamp, len(self),
+            [self.end_validity.buffer(), pyarrow.py_buffer(self.end)],
+            null_count=self.end_validity.null_count
+        )
+        return pyarrow.StructArray.from_arrays([start, end], names=["start", "end"])
+
+
+class StringColumn:
+    """UTF-8 字串欄位（int32 位移 + 連續位元組，與 Arrow string 佈局相同）"""
+
+    def __init__(self):
+        self.offsets = array("i", [0])
+        self.data = bytearray()
+        self.validity = Bitmap()
+
+    def append(self, value) -> None:
+        if value is not None:
+            if not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False)
+            self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+        self.validity.append(value is not None)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return 4 * len(self.offsets) + len(self.data) + len(self.validity.data)
+
+    def to_pylist(self) -> list:
+        return [
+            bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8") if self.validity[i] else None
+            for i in range(len(self))
+        ]
+
+    def to_arrow(self):
+        pyarrow = _pyarrow()
+        return pyarrow.Array.from_buffers(
+            pyarrow.string(), len(self),
+            [self.validity.buffer(), pyarrow.py_buffer(self.offsets), pyarrow.py_buffer(self.data)],
+            null_count=self.validity.null_count
+        )
+
+
+class DictionaryColumn:
+    """字典編碼欄位：每個值存為 int32 代碼，字串只在 dictionary 中保存一次"""
+
+    def __init__(self, dictionary: list = None):
+        self.dictionary = list(dictionary or [])
+        self.index = {value: code for code, value in enumerate(self.dictionary)}
+        self.codes = array("i")
+        self.validity = Bitmap()
+
+    def encode(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.dictionary)
+            self.dictionary.append(value)
+            self.index[value] = code
+        return code
+
+    def append(self, value) -> None:
+        valid = value not in (None, "")
+        self.codes.append(self.encode(value) if valid else 0)
+        self.validity.append(valid)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return 4 * len(self.codes) + len(self.validity.data)
+
+    def to_pylist(self) -> list:
+        return [self.dictionary[c] if self.validity[i] else None for i, c in enumerate(self.codes)]
+
+    def _indices(self):
+        pyarrow = _pyarrow()
+        return pyarrow.Array.from_buffers(
+            pyarrow.int32(), len(self),
+            [self.validity.buffer(), pyarrow.py_buffer(self.codes)],
+            null_count=self.validity.null_count
+        )
+
+    def to_arrow(self):
+        pyarrow = _pyarrow()
+        return pyarrow.DictionaryArray.from_arrays(self._indices(), pyarrow.array(self.dictionary, pyarrow.string()))
+
+
+class ListColumn:
+    """多值欄位（multi_select / relation），int32 位移 + 字典編碼的值"""
+
+    def __init__(self, dictionary: list = None):
+        self.offsets = array("i", [0])
+        self.values = DictionaryColumn(dictionary)
+
+    def append(self, value) -> None:
+        for item in value or []:
+            self.values.append(item)
+        self.offsets.append(len(self.values))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return 4 * len(self.offsets) + self.values.nbytes
+
+    def to_pylist(self) -> list:
+        values = self.values.to_pylist()
+        return [values[self.offsets[i]:self.offsets[i + 1]] for i in range(len(self))]
+
+    def to_arrow(self):
+        pyarrow = _pyarrow()
+        offsets = pyarrow.Array.from_buffers(pyarrow.int32(), len(self.offsets), [None, pyarrow.py_buffer(self.offsets)])
+        return pyarrow.ListArray.from_arrays(offsets, self.values.to_arrow())
+
+
+class RollupColumn:
+    """rollup 欄位，依第一筆 rollup 的結果類型決定實際欄位
+
+    同一個 rollup 屬性的結果類型由彙總函數決定，每頁都相同：
+    number -> float64、date -> {start, end}、其他（array 等）-> JSON 字串。
+    其餘方法（to_numpy、to_arrow 等）轉交給實際欄位。
+    """
+
+    def __init__(self):
+        self.column = None
+        self.pending = 0
+
+    def append(self, rollup) -> None:
+        rollup_type = rollup.get("type") if rollup else None
+        if self.column is None:
+            if not rollup_type:
+                self.pending += 1
+                return
+            if rollup_type == "number":
+                self.column = NumberColumn()
+            elif rollup_type == "date":
+                self.column = DateColumn()
+            else:
+                self.column = StringColumn()
+            for _ in range(self.pending):
+                self.column.append(None)
+        if rollup_type in ("number", "date"):
+            # 直接取值，0 不會被當成空值
+            self.column.append(rollup.get(rollup_type))
+        else:
+            self.column.append(PropertyValueExtractor.extract_rollup_value(rollup) if rollup_type else None)
+
+    def _resolved(self):
+        if self.column is None:
+            # 沒有任何結果時以全為 null 的字串欄位表示
+            self.column = StringColumn()
+            for _ in range(self.pending):
+                self.column.append(None)
+        return self.column
+
+    def __len__(self):
+        return len(self.column) if self.column is not None else self.pending
+
+    def __getattr__(self, name):
+        if name in ("column", "pending"):
+            raise AttributeError(name)
+        return getattr(self._resolved(), name)
+
+
+class ColumnarTable:
+    """欄式查詢結果：columns 為欄位名稱到欄位物件的映射"""
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+
+    @property
+    def num_rows(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def nbytes(self) -> int:
+        """所有欄位緩衝區的總大小（不含字典）"""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def column(self, name: str):
+        return self.columns[name]
+
+    def to_pydict(self) -> dict:
+        return {name: column.to_pylist() for name, column in self.columns.items()}
+
+    def to_arrow(self):
+        """轉為 pyarrow.Table；數值、日期、字串的緩衝區直接共用，不複製"""
+        pyarrow = _pyarrow()
+        return pyarrow.table({name: column.to_arrow() for name, column in self.columns.items()})
+
+
+class ColumnarTableBuilder:
+    """逐頁將查詢結果解碼並直接寫入欄式緩衝區，不保留原始 JSON
+
+    各屬性類型的欄位：
+    number -> float64、checkbox -> bool、select -> 字典編碼、
+    multi_select / relation -> list<字典編碼>、date -> {start, end} int64 epoch 毫秒、
+    rollup -> 依結果類型（見 RollupColumn）、文字類型 -> UTF-8 字串，其他類型以 JSON 字串保存。
+    """
+
+    def __init__(self, schema: dict, property_list: list = None, select_options: dict = None):
+        """
+        Args:
+            schema: 屬性名稱到類型的映射（get_database_properties 的結果）
+            property_list: 只保留這些屬性（預設為全部）
+            select_options: get_database_select_options 的結果，用來預先建立字典（可選）
+        """
+        select_options = select_options or {}
+        names = [name for name in (property_list or schema) if name in schema]
+        self.columns = {"id": StringColumn()}
+        self.appenders = []
+
+        for name in names:
+            prop_type = schema[name]
+            dictionary = [option["name"] for option in select_options.get(name, {}).get("options", [])]
+            if prop_type == PropertyType.NUMBER:
+                column = NumberColumn()
+            elif prop_type == PropertyType.ROLLUP:
+                column = RollupColumn()
+            elif prop_type == PropertyType.CHECKBOX:
+                column = BooleanColumn()
+            elif prop_type == PropertyType.SELECT:
+                column = DictionaryColumn(dictionary)
+            elif prop_type in (PropertyType.MULTI_SELECT, PropertyType.RELATION):
+                column = ListColumn(dictionary)
+            elif prop_type == PropertyType.DATE:
+                column = DateColumn()
+            else:
+                column = StringColumn()
+            self.columns[name] = column
+            self.appenders.append((name, prop_type, column.append))
+
+    @staticmethod
+    def _value(prop_type: str, prop_data: dict):
+        if prop_data is None:
+            return None
+        if prop_type == PropertyType.DATE:
+            return prop_data.get("date")
+        if prop_type == PropertyType.ROLLUP:
+            return prop_data.get("rollup")
+        return PropertyValueExtractor.extract_value(prop_data)
+
+    def append(self, page: dict) -> None:
+        """寫入一頁"""
+        self.columns["id"].append(page.get("id"))
+        properties = page.get("properties", {})
+        for name, prop_type, append in self.appenders:
+            append(self._value(prop_type, properties.get(name)))
+
+    def extend(self, pages) -> "ColumnarTableBuilder":
+        """寫入多頁（可為 generator，例如 NotionAPI.iter_database）"""
+        for page in pages:
+            self.append(page)
+        return self
+
+    def build(self) -> ColumnarTable:
+        return ColumnarTable(self.columns)
@@ -1,3 +1,5 @@
+import os
+
 try:
     from .secrets import NOTION_TOKEN, IMGUR_CLIENT_ID
 except ImportError:
@@ -6,10 +8,70 @@ except ImportError:
 
 class NotionConfig:
     API_VERSION = "2022-06-28"
-    BASE_URL = "https://api.notion.com/v1"
+    # 可用環境變數 NOTION_BASE_URL 指向本地的替身伺服器（見 benchmarks/fake_notion.py）
+    BASE_URL = os.environ.get("NOTION_BASE_URL", "https://api.notion.com/v1")
     NOTION_TOKEN = NOTION_TOKEN
     IMGUR_CLIENT_ID = IMGUR_CLIENT_ID
 
+    # 連線池設定（同一個 session 重複使用 TCP/TLS 連線）
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+    REQUEST_TIMEOUT = 30
+
+    # 速率限制設定（Notion integration 平均約每秒 3 個請求）
+    RATE_LIMIT = 3.0
+    RATE_BURST = 3
+    MAX_IN_FLIGHT = 8
+    MAX_RETRIES = 5
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_MAX = 30.0
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+    # 可安全重送的方法；其他方法（POST/PATCH）只在 429 或連線建立階段失敗時重試
+    IDEMPOTENT_METHODS = ("GET",)
+
+    # 批次寫入的預設執行緒數
+    BULK_MAX_WORKERS = 4
+
+    # 單次添加區塊的上限（Notion 限制每次最多 100 個子區塊、請求內容約 500KB）
+    MAX_BLOCKS_PER_REQUEST = 100
+    MAX_REQUEST_BYTES = 450_000
+    # 單次請求中子區塊最多兩層巢狀、總區塊數最多 1000 個
+    MAX_NESTING_DEPTH = 2
+    MAX_NESTED_BLOCKS_PER_REQUEST = 1000
+
+    # 寫入合併（coalesce_updates）：待送出的頁面數上限與最長等待秒數
+    COALESCE_MAX_PAGES = 50
+    COALESCE_MAX_DELAY = 1.0
+
+    # 遞迴獲取區塊樹的預設執行緒數
+    BLOCK_TREE_WORKERS = 4
+
+    # 增量同步設定
+    SYNC_STATE_DIR = ".notion_sync"
+    SYNC_OVERLAP_SECONDS = 120
+
+    # 數據庫 schema 快取
+    SCHEMA_CACHE_SIZE = 128
+    SCHEMA_CACHE_TTL = 300
+
+    # 頁面快取（NotionAPI(page_cache=True) 時啟用），有效期內不再單獨 GET
+    PAGE_CACHE_SIZE = 10_000
+    PAGE_CACHE_TTL = 300
+
+    # 本地 SQLite 鏡像目錄
+    MIRROR_DIR = ".notion_mirror"
+
+    # 圖片上傳快取（以檔案內容雜湊記錄已上傳的 Imgur 連結）
+    UPLOAD_CACHE_PATH = ".notion_cache/imgur_uploads.json"
+    UPLOAD_MAX_WORKERS = 4
+    # 串流上傳時每次讀取的位元組數（上傳的記憶體用量上限）
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+
+    # 上傳前的圖片縮小與重新壓縮（需要 Pillow，NotionAPI 傳入 image_max_dimension 時啟用）
+    IMAGE_MAX_DIMENSION = 2000
+    IMAGE_JPEG_QUALITY = 85
+    IMAGE_OUTPUT_DIR = ".notion_cache/images"
+
     # 定義 property 類型枚舉
     class PropertyType:
         TITLE = "title"
@@ -0,0 +1,413 @@
+import json
+from .config import NotionConfig
+from .extractors import PropertyValueExtractor
+
+# 子區塊必須與區塊本身一起建立的類型
+INLINE_CHILDREN_TYPES = ("table", "column_list", "column")
+
+class NotionEndpoints:
+    """Notion API 請求的建構與回應解析
+
+    只負責組出 (method, path, data) 以及解析回應，不做任何 I/O，
+    讓同步的 NotionAPI 與非同步的 AsyncNotionAPI 共用同一套邏輯。
+    path 為相對於 base_url 的路徑，由 handler 補上完整網址。
+    """
+
+    @staticmethod
+    def query_database(database_id: str,
+                       filter_params: dict = None,
+                       sort_params: list = None,
+                       page_size: int = 100,
+                       start_cursor: str = None) -> tuple:
+        """數據庫查詢請求
+
+        Args:
+            database_id: 數據庫ID
+            filter_params: 格式應為 {"property": "屬性名", "屬性類型": {"條件": "值"}}
+            sort_params: 排序參數
+            page_size: 每頁數量
+            start_cursor: 分頁游標
+        """
+        query_data = {}
+
+        query_filter = NotionEndpoints.build_filter(filter_params)
+        if query_filter:
+            query_data["filter"] = query_filter
+
+        if sort_params:
+            query_data["sorts"] = sort_params
+        if page_size:
+            query_data["page_size"] = page_size
+        if start_cursor:
+            query_data["start_cursor"] = start_cursor
+
+        return "POST", f"/databases/{database_id}/query", query_data
+
+    @staticmethod
+    def build_filter(filter_params: dict) -> dict:
+        """驗證和格式化 filter_params
+
+        支援完整的 Notion 過濾格式（屬性、複合 and/or、timestamp），
+        以及簡寫 {"屬性名": "選項"}（視為 select equals）。
+        """
+        if not filter_params or not isinstance(filter_params, dict):
+            return None
+
+        if "property" in filter_params and len(filter_params) > 1:
+            return filter_params
+
+        # 複合過濾與時間戳過濾直接使用
+        if "and" in filter_params or "or" in filter_params or "timestamp" in filter_params:
+            return filter_params
+
+        query_filter = None
+        for prop_name, value in filter_params.items():
+            query_filter = {
+                "property": prop_name,
+                "select": {
+                    "equals": value
+                }
+            }
+        return query_filter
+
+    @staticmethod
+    def combine_filters(*filters) -> dict:
+        """以 and 合併多個過濾條件（攤平巢狀的 and，避免超過 Notion 的巢狀層數限制）"""
+        conditions = []
+        for query_filter in filters:
+            if not query_filter:
+                continue
+            if list(query_filter.keys()) == ["and"]:
+                conditions.extend(query_filter["and"])
+            else:
+                conditions.append(query_filter)
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"and": conditions}
+
+    @staticmethod
+    def get_page(page_id: str) -> tuple:
+        """獲取頁面請求"""
+        return "GET", f"/pages/{page_id}", None
+
+    @staticmethod
+    def update_page(page_id: str, data: dict) -> tuple:
+        """更新頁面請求，data 為完整的請求內容（例如 {"properties": {...}}）"""
+        return "PATCH", f"/pages/{page_id}", data
+
+    @staticmethod
+    def get_block_children(block_id: str,
+                           start_cursor: str = None,
+                           page_size: int = 100) -> tuple:
+        """獲取區塊子元素請求（分頁參數以 query string 傳送）"""
+        params = {"page_size": page_size}
+
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+
+        return "GET", f"/blocks/{block_id}/children", None, params
+
+    @staticmethod
+    def compact_block(block: dict) -> dict:
+        """只保留區塊的 id、類型與內容，去除 created_by / parent 等中繼資料"""
+        block_type = block.get("type")
+        return {
+            "id": block.get("id"),
+            "type": block_type,
+            block_type: block.get(block_type),
+        }
+
+    @staticmethod
+    def create_page(database_id: str, properties: dict, children: list = None) -> tuple:
+        """創建頁面請求"""
+        data = {
+            "parent": {"database_id": database_id},
+            "properties": properties
+        }
+
+        if children:
+            data["children"] = children
+
+        return "POST", "/pages", data
+
+    @staticmethod
+    def update_block(block_id: str, block_data: dict) -> tuple:
+        """更新區塊請求"""
+        return "PATCH", f"/blocks/{block_id}", block_data
+
+    @staticmethod
+    def append_blocks(block_id: str, blocks: list) -> tuple:
+        """添加子區塊請求"""
+        return "PATCH", f"/blocks/{block_id}/children", {"children": blocks}
+
+    @staticmethod
+    def block_children(block: dict) -> list:
+        """區塊的巢狀子區塊（放在 block[type]["children"] 或 block["children"]）"""
+        content = block.get(block.get("type"))
+        if isinstance(content, dict) and content.get("children"):
+            return content["children"]
+        return block.get("children") or []
+
+    @staticmethod
+    def with_children(block: dict, children: list) -> dict:
+        """回傳子區塊換成 children 的區塊副本（children 為空時移除子區塊）"""
+        block_type = block.get("type")
+        content = block.get(block_type)
+        block = dict(block)
+        if isinstance(content, dict) and content.get("children"):
+            content = {k: v for k, v in content.items() if k != "children"}
+            if children:
+                content["children"] = children
+            block[block_type] = content
+        else:
+            block.pop("children", None)
+            if children:
+                block["children"] = children
+        return block
+
+    @staticmethod
+    def split_children(block: dict, depth: int = NotionConfig.MAX_NESTING_DEPTH,
+                       max_count: int = NotionConfig.MAX_BLOCKS_PER_REQUEST) -> tuple:
+        """決定區塊的子區塊哪些隨區塊一起建立、哪些在建立後另外添加
+
+        Notion 單次請求最多兩層巢狀；table、column_list、column 的子區塊必須與區塊一起建立。
+        一般區塊的子樹放得下時整個隨區塊送出，否則子區塊全部延後添加。
+
+        Returns:
+            tuple: (要送出的區塊, [(路徑, 延後添加的子區塊)])，路徑為從這個區塊往下的子區塊索引，
+                   空路徑代表添加到這個區塊本身
+        """
+        children = NotionEndpoints.block_children(block)
+        if not children:
+            return block, []
+
+        required = block.get("type") in INLINE_CHILDREN_TYPES
+        if not required and (depth <= 0 or len(children) > max_count):
+            return NotionEndpoints.with_children(block, None), [((), children)]
+
+        inline = []
+        deferred = []
+        for index, child in enumerate(children[:max_count]):
+            child_block, child_deferred = NotionEndpoints.split_children(child, depth - 1, max_count)
+            if child_deferred and not required:
+                # 一般區塊不為了更深的層級去查詢子區塊 ID，直接整批延後
+                return NotionEndpoints.with_children(block, None), [((), children)]
+            inline.append(child_block)
+            deferred.extend(((index,) + path, nested) for path, nested in child_deferred)
+        if len(children) > max_count:
+            deferred.append(((), children[max_count:]))
+        return NotionEndpoints.with_children(block, inline), deferred
+
+    @staticmethod
+    def count_blocks(block: dict) -> int:
+        """區塊本身加上所有巢狀子區塊的數量"""
+        return 1 + sum(NotionEndpoints.count_blocks(child) for child in NotionEndpoints.block_children(block))
+
+    @staticmethod
+    def chunk_blocks(blocks,
+                     max_count: int = NotionConfig.MAX_BLOCKS_PER_REQUEST,
+                     max_bytes: int = NotionConfig.MAX_REQUEST_BYTES,
+                     max_total: int = NotionConfig.MAX_NESTED_BLOCKS_PER_REQUEST):
+        """將區塊依數量與 JSON 大小切成多批（逐一讀取輸入，可傳入 generator）
+
+        子區塊在巢狀限制內隨區塊一起送出（見 split_children），單一區塊太大時才把子區塊延後。
+
+        Yields:
+            list: [(要送出的區塊, [(路徑, 延後添加的子區塊)])]
+        """
+        chunk = []
+        chunk_bytes = 0
+        chunk_total = 0
+        for block in blocks:
+            block, deferred = NotionEndpoints.split_children(block, max_count=max_count)
+            size = len(json.dumps(block, ensure_ascii=False).encode("utf-8"))
+            total = NotionEndpoints.count_blocks(block)
+            if (size > max_bytes or total > max_total) and block.get("type") not in INLINE_CHILDREN_TYPES:
+                block, deferred = NotionEndpoints.split_children(block, depth=0)
+                size = len(json.dumps(block, ensure_ascii=False).encode("utf-8"))
+                total = 1
+            if chunk and (len(chunk) >= max_count or chunk_bytes + size > max_bytes
+                          or chunk_total + total > max_total):
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+                chunk_total = 0
+            chunk.append((block, deferred))
+            chunk_bytes += size
+            chunk_total += total
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def get_database(database_id: str) -> tuple:
+        """獲取數據庫請求"""
+        return "GET", f"/databases/{database_id}", None
+
+    @staticmethod
+    def create_database(parent_page_id: str, title: str, properties: dict) -> tuple:
+        """創建數據庫請求"""
+        data = {
+            "parent": {"page_id": parent_page_id},
+            "title": [{"type": "text", "text": {"content": title}}],
+            "properties": properties
+        }
+        return "POST", "/databases", data
+
+    @staticmethod
+    def update_database(database_id: str, properties: dict = None, title: str = None) -> tuple:
+        """更新數據庫請求"""
+        data = {}
+
+        if properties:
+            data["properties"] = properties
+        if title:
+            data["title"] = [{"type": "text", "text": {"content": title}}]
+
+        return "PATCH", f"/databases/{database_id}", data
+
+    @staticmethod
+    def select_properties(page_data: dict, property_list: list = None) -> dict:
+        """從頁面數據中取出指定的屬性"""
+        properties = page_data.get("properties", {}) if page_data else {}
+        if not property_list:
+            return properties
+
+        return {
+            prop: properties.get(prop)
+            for prop in property_list
+            if prop in properties
+        }
+
+    @staticmethod
+    def format_properties(raw_properties: dict) -> dict:
+        """將原始屬性轉為格式化後的值"""
+        formatted_properties = {}
+
+        for prop_name, prop_data in raw_properties.items():
+            value = PropertyValueExtractor.extract_value(prop_data)
+
+            # 特殊處理 relation 類型，只保留第一個關聯的 ID
+            if isinstance(value, list) and prop_data.get('type') == 'relation':
+                value = value[0] if value else None
+
+            formatted_properties[prop_name] = value
+
+        return formatted_properties
+
+    @staticmethod
+    def parse_database_properties(database: dict) -> dict:
+        """從數據庫回應中取出屬性名稱及其類型的映射"""
+        if not database or 'properties' not in database:
+            return {}
+
+        properties = {}
+        for prop_name, prop_info in database['properties'].items():
+            prop_type = prop_info.get('type')
+            properties[prop_name] = prop_type
+
+        return properties
+
+    @staticmethod
+    def parse_select_options(database: dict) -> dict:
+        """從數據庫回應中取出 select 和 multi_select 屬性的選項"""
+        if not database or 'properties' not in database:
+            return {}
+
+        select_options = {}
+        for prop_name, prop_info in database['properties'].items():
+            prop_type = prop_info.get('type')
+
+            if prop_type in ['select', 'multi_select']:
+                options = prop_info.get(prop_type, {}).get('options', [])
+                if options:
+                    select_options[prop_name] = {
+                        "type": prop_type,
+                        "options": [
+                            {
+                                "name": option['name'],
+                                "color": option['color'],
+                                "id": option['id']
+                            }
+                            for option in options
+                        ]
+                    }
+
+        return select_options
+
+    @staticmethod
+    def image_block(image_url: str, caption: str = None) -> dict:
+        """外部圖片區塊"""
+        image_block = {
+            "type": "image",
+            "image": {
+                "type": "external",
+                "external": {
+                    "url": image_url
+                }
+            }
+        }
+
+        if caption:
+            image_block["image"]["caption"] = [
+                {
+                    "type": "text",
+                    "text": {
+                        "content": caption
+                    }
+                }
+            ]
+
+        return image_block
+
+    @staticmethod
+    def create_file_property(file_name: str, file_url: str) -> dict:
+        """創建文件屬性的數據結構"""
+        return {
+            "files": [
+                {
+                    "name": file_name,
+                    "type": "external",
+                    "external": {
+                        "url": file_url
+                    }
+                }
+            ]
+        }
+
+    @staticmethod
+    def create_page_properties(properties: dict) -> dict:
+        """創建頁面屬性的數據結構（簡化格式 -> Notion 格式）"""
+        formatted_properties = {}
+
+        for prop_name, prop_value in properties.items():
+            if isinstance(prop_value, dict) and "url" in prop_value:
+                # 處理文件類型
+                formatted_properties[prop_name] = NotionEndpoints.create_file_property(
+                    prop_value["name"],
+                    prop_value["url"]
+                )
+            elif prop_name == "Name":
+                # 處理標題
+                formatted_properties[prop_name] = {
+                    "title": [{"text": {"content": prop_value}}]
+                }
+            else:
+                # 其他類型直接使用
+                formatted_properties[prop_name] = prop_value
+
+        return {"properties": formatted_properties}
+
+    @staticmethod
+    def print_page_update(page_id: str, properties: dict) -> None:
+        """打印 update_page 的更新結果"""
+        print(f"成功更新頁面 {page_id}")
+        for prop_name, prop_value in properties.items():
+            if isinstance(prop_value, dict) and "url" in prop_value:
+                print(f"- 更新屬性 '{prop_name}':")
+                print(f"  - 文件名稱: {prop_value['name']}")
+                print(f"  - 文件 URL: {prop_value['url']}")
+            else:
+                print(f"- 更新屬性 '{prop_name}': {prop_value}")
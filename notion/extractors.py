@@ -71,20 +71,86 @@ class PropertyValueExtractor:
         if not prop_type:
             return None
 
-        extractors = {
-            NotionConfig.PropertyType.TITLE: lambda x: x['title'][0]['text']['content'] if x['title'] else '',
-            NotionConfig.PropertyType.RICH_TEXT: lambda x: x['rich_text'][0]['text']['content'] if x['rich_text'] else '',
-            NotionConfig.PropertyType.NUMBER: lambda x: x['number'],
-            NotionConfig.PropertyType.SELECT: lambda x: x['select']['name'] if x['select'] else '',
-            NotionConfig.PropertyType.MULTI_SELECT: lambda x: [option['name'] for option in x['multi_select']],
-            NotionConfig.PropertyType.DATE: lambda x: PropertyValueExtractor.format_date_range(x['date']),
-            NotionConfig.PropertyType.CHECKBOX: lambda x: x['checkbox'],
-            NotionConfig.PropertyType.URL: lambda x: x['url'],
-            NotionConfig.PropertyType.EMAIL: lambda x: x['email'],
-            NotionConfig.PropertyType.PHONE: lambda x: x['phone_number'],
-            NotionConfig.PropertyType.RELATION: lambda x: [rel['id'] for rel in x['relation']],
-            NotionConfig.PropertyType.ROLLUP: lambda x: PropertyValueExtractor.extract_rollup_value(x['rollup'])
-        }
-
-        extractor = extractors.get(prop_type)
+        extractor = PropertyValueExtractor.EXTRACTORS.get(prop_type)
         return extractor(property_data) if extractor else property_data[prop_type]
+
+    @staticmethod
+    def compile_row_extractor(schema: dict, property_list: list = None,
+                              as_tuple: bool = False, relation_first: bool = True,
+                              options=None):
+        """依數據庫 schema 預先綁定每個屬性的提取函數，產生單次掃描的整列解碼函數
+
+        Args:
+            schema: 屬性名稱到類型的映射（get_database_properties 的結果）
+            property_list: 只解碼這些屬性（預設為全部）
+            as_tuple: True 時回傳依 columns 順序的 tuple，否則回傳 dict
+            relation_first: relation 只保留第一個 ID（與 get_formatted_page_properties 相同）
+            options: OptionDictionary（可選），提供時 select 輸出代碼、multi_select 輸出位元集合
+
+        Returns:
+            function: page -> dict 或 tuple，函數的 columns 屬性為欄位順序
+        """
+        names = [name for name in (property_list or schema) if name in schema]
+        fallback = PropertyValueExtractor.extract_value
+
+        def bind(name, prop_type):
+            if options is not None and name in options:
+                return lambda x: options.encode(name, x)
+            extractor = PropertyValueExtractor.EXTRACTORS.get(prop_type)
+            if prop_type == NotionConfig.PropertyType.RELATION and relation_first:
+                return lambda x: x['relation'][0]['id'] if x['relation'] else None
+            return extractor or (lambda x: x[prop_type])
+
+        bound = [(name, bind(name, schema[name])) for name in names]
+        types = {name: schema[name] for name in names}
+
+        def extract_slow(properties: dict) -> list:
+            # 屬性缺失或 schema 已變更時，逐一檢查類型並改用通用的提取方法
+            values = []
+            for name, extractor in bound:
+                prop_data = properties.get(name)
+                if prop_data is None:
+                    values.append(None)
+                elif prop_data.get('type') == types[name]:
+                    values.append(extractor(prop_data))
+                else:
+                    value = fallback(prop_data)
+                    if relation_first and prop_data.get('type') == NotionConfig.PropertyType.RELATION:
+                        value = value[0] if value else None
+                    values.append(value)
+            return values
+
+        if as_tuple:
+            def decode(page: dict) -> tuple:
+                properties = page['properties']
+                try:
+                    return tuple([extractor(properties[name]) for name, extractor in bound])
+                except (KeyError, TypeError, IndexError):
+                    return tuple(extract_slow(properties))
+        else:
+            def decode(page: dict) -> dict:
+                properties = page['properties']
+                try:
+                    return {name: extractor(properties[name]) for name, extractor in bound}
+                except (KeyError, TypeError, IndexError):
+                    return dict(zip(names, extract_slow(properties)))
+
+        decode.columns = tuple(names)
+        return decode
+
+
+# 各屬性類型的提取函數，只建立一次
+PropertyValueExtractor.EXTRACTORS = {
+    NotionConfig.PropertyType.TITLE: lambda x: x['title'][0]['text']['content'] if x['title'] else '',
+    NotionConfig.PropertyType.RICH_TEXT: lambda x: x['rich_text'][0]['text']['content'] if x['rich_text'] else '',
+    NotionConfig.PropertyType.NUMBER: lambda x: x['number'],
+    NotionConfig.PropertyType.SELECT: lambda x: x['select']['name'] if x['select'] else '',
+    NotionConfig.PropertyType.MULTI_SELECT: lambda x: [option['name'] for option in x['multi_select']],
+    NotionConfig.PropertyType.DATE: lambda x: PropertyValueExtractor.format_date_range(x['date']),
+    NotionConfig.PropertyType.CHECKBOX: lambda x: x['checkbox'],
+    NotionConfig.PropertyType.URL: lambda x: x['url'],
+    NotionConfig.PropertyType.EMAIL: lambda x: x['email'],
+    NotionConfig.PropertyType.PHONE: lambda x: x['phone_number'],
+    NotionConfig.PropertyType.RELATION: lambda x: [rel['id'] for rel in x['relation']],
+    NotionConfig.PropertyType.ROLLUP: lambda x: PropertyValueExtractor.extract_rollup_value(x['rollup'])
+}
@@ -1,43 +1,519 @@
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
 import json
+import random
+import threading
+import time
 from .config import NotionConfig
 
-class NotionRequestHandler:
-    def __init__(self, token: str):
+from urllib3.exceptions import NewConnectionError
+
+try:
+    import httpx
+    NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, httpx.TransportError)
+    # 請求尚未送出（連線建立或等待連線池）的錯誤
+    CONNECT_ERRORS = (requests.exceptions.ConnectTimeout, httpx.ConnectError,
+                      httpx.ConnectTimeout, httpx.PoolTimeout)
+except ImportError:
+    httpx = None
+    NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    CONNECT_ERRORS = (requests.exceptions.ConnectTimeout,)
+
+
+class NotionRequestError(Exception):
+    """Notion 請求失敗（重試用盡或不可重試的錯誤）"""
+
+    def __init__(self, message: str, status_code: int = None, detail=None,
+                 retriable: bool = False, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.detail = detail
+        self.retriable = retriable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """執行緒安全的 token bucket 速率限制器
+
+    同一個 token 的所有 handler 共用一個 bucket（見 for_token），
+    因此多個 NotionAPI 實例或多個執行緒加總起來也不會超過速率上限。
+    """
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: 每秒補充的 token 數（即平均每秒請求數）
+            capacity: bucket 容量（允許的突發請求數）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_token(cls, token: str, rate: float = None, capacity: int = None) -> "TokenBucket":
+        """取得（或建立）某個 token 專用的 bucket
+
+        rate / capacity 為 None 時：新建的 bucket 使用 NotionConfig 的預設值，
+        已存在的 bucket 維持原本的設定，因此使用預設參數的 handler 不會覆蓋其他 handler 明確指定的速率。
+        """
+        with cls._registry_lock:
+            bucket = cls._registry.get(token)
+            if bucket is None:
+                bucket = cls(NotionConfig.RATE_LIMIT if rate is None else rate,
+                             NotionConfig.RATE_BURST if capacity is None else capacity)
+                cls._registry[token] = bucket
+            elif rate is not None or capacity is not None:
+                bucket.configure(rate, capacity)
+            return bucket
+
+    def configure(self, rate: float = None, capacity: int = None) -> None:
+        """更新速率參數（None 表示維持原值）"""
+        with self.lock:
+            if rate is not None:
+                self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+                self.tokens = min(self.tokens, float(capacity))
+
+    def reserve(self, tokens: int = 1) -> float:
+        """預約 token，回傳需要等待的秒數（不會阻塞）"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.capacity), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """阻塞直到取得 token，回傳實際等待的秒數"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """暫停發放 token（例如收到 429 的 Retry-After 時）"""
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            # 暫停期間不累積突發額度
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, now)
+
+
+def create_session(pool_connections: int = NotionConfig.POOL_CONNECTIONS,
+                   pool_maxsize: int = NotionConfig.POOL_MAXSIZE,
+                   http2: bool = False):
+    """建立可重複使用連線（keep-alive）的 HTTP session
+
+    Args:
+        pool_connections: 要快取的連線池數量（每個主機一個）
+        pool_maxsize: 每個連線池保留的最大連線數
+        http2: 是否使用 HTTP/2（需要安裝 httpx[http2]）
+
+    Returns:
+        requests.Session 或 httpx.Client，兩者的 request/post/close 介面相容
+    """
+    if http2:
+        if httpx is None:
+            raise ImportError("啟用 HTTP/2 需要安裝 httpx：pip install 'httpx[http2]'")
+
+        limits = httpx.Limits(
+            max_connections=pool_maxsize,
+            max_keepalive_connections=pool_maxsize
+        )
+        return httpx.Client(http2=True, limits=limits)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_retry_after(value) -> float:
+    """解析 Retry-After 標頭（秒數），無法解析時回傳 None"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_response(response) -> dict:
+    """解析成功回應的 JSON 內容"""
+    try:
+        return response.json() if response.content else {}
+    except json.JSONDecodeError as e:
+        raise NotionRequestError(f"JSON Parsing Error: {str(e)}")
+
+
+def is_idempotent(method: str) -> bool:
+    """請求重送是否安全（不會重複建立或修改資料）"""
+    return method.upper() in NotionConfig.IDEMPOTENT_METHODS
+
+
+def is_connect_error(error: Exception) -> bool:
+    """錯誤是否發生在連線建立階段（請求尚未送達伺服器）"""
+    if isinstance(error, CONNECT_ERRORS):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        # requests 把連線失敗包成 ConnectionError(MaxRetryError(reason=NewConnectionError))
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def network_error(error: Exception, method: str) -> NotionRequestError:
+    """將網路錯誤轉為 NotionRequestError
+
+    非冪等的請求可能已送達伺服器（例如讀取逾時），只有在連線建立階段失敗時才可重試。
+    """
+    return NotionRequestError(
+        f"Network Error: {str(error)}",
+        retriable=is_idempotent(method) or is_connect_error(error)
+    )
+
+
+def response_error(response, method: str = "GET") -> NotionRequestError:
+    """將失敗回應轉為 NotionRequestError，並標記是否可重試
+
+    非冪等的請求遇到 5xx 時伺服器可能已經處理，只有 429 可重試。
+    """
+    try:
+        error_detail = response.json() if response.content else "No error details"
+    except json.JSONDecodeError:
+        error_detail = response.text
+    status_code = response.status_code
+    return NotionRequestError(
+        f"API Error: {status_code}",
+        status_code=status_code,
+        detail=error_detail,
+        retriable=status_code == 429 or (
+            is_idempotent(method) and status_code in NotionConfig.RETRY_STATUS_CODES
+        ),
+        retry_after=parse_retry_after(response.headers.get("Retry-After"))
+    )
+
+
+def backoff_delay(attempt: int,
+                  base: float = NotionConfig.RETRY_BACKOFF_BASE,
+                  cap: float = NotionConfig.RETRY_BACKOFF_MAX) -> float:
+    """帶 full jitter 的指數退避秒數"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class BaseRequestHandler:
+    """同步與非同步 handler 共用的設定、網址解析與重試策略"""
+
+    def __init__(self, token: str,
+                 timeout: float = NotionConfig.REQUEST_TIMEOUT,
+                 rate_limit: float = None,
+                 burst: int = None,
+                 max_retries: int = NotionConfig.MAX_RETRIES,
+                 instrumentation=None,
+                 base_url: str = None):
         self.token = token
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
             "Notion-Version": NotionConfig.API_VERSION,
         }
+        self.base_url = (base_url or NotionConfig.BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket.for_token(token, rate_limit, burst)
+        self.max_retries = max_retries
+        # RequestMetrics 等量測物件（可選），None 時不做任何量測
+        self.instrumentation = instrumentation
+        if instrumentation is not None and not instrumentation.base_url:
+            instrumentation.base_url = self.base_url
+
+    def _resolve_url(self, url: str) -> str:
+        """相對路徑（例如 "/pages/xxx"）補上 base_url"""
+        return f"{self.base_url}{url}" if url.startswith("/") else url
+
+    def _retry_delay(self, error: NotionRequestError, attempt: int) -> float:
+        """決定重試前要等待的秒數，不可重試或次數用盡時直接拋出錯誤"""
+        if not error.retriable or attempt >= self.max_retries:
+            raise error
+
+        delay = error.retry_after if error.retry_after is not None else backoff_delay(attempt)
+        print(f"{error}，{delay:.1f} 秒後重試（第 {attempt + 1}/{self.max_retries} 次）")
+        if error.status_code == 429:
+            # 429 代表整個 token 都被限速，暫停共用的 bucket，下次 acquire 時等待
+            self.rate_limiter.pause(delay)
+            return 0.0
+        return delay
+
+    @staticmethod
+    def _print_error(error: Exception, url: str, data: dict) -> None:
+        """詳細的錯誤信息輸出"""
+        if isinstance(error, NotionRequestError):
+            print(str(error))
+            if error.status_code is not None:
+                print(f"URL: {url}")
+                print(f"Request Data: {data}")
+                print(f"Error Details: {error.detail}")
+        else:
+            print(f"Unexpected Error: {str(error)}")
+
+
+class NotionRequestHandler(BaseRequestHandler):
+    def __init__(self, token: str,
+                 session=None,
+                 pool_connections: int = NotionConfig.POOL_CONNECTIONS,
+                 pool_maxsize: int = NotionConfig.POOL_MAXSIZE,
+                 http2: bool = False,
+                 timeout: float = NotionConfig.REQUEST_TIMEOUT,
+                 rate_limit: float = None,
+                 burst: int = None,
+                 max_in_flight: int = NotionConfig.MAX_IN_FLIGHT,
+                 max_retries: int = NotionConfig.MAX_RETRIES,
+                 instrumentation=None,
+                 base_url: str = None):
+        """
+        初始化請求處理器
+
+        Args:
+            token: Notion API token
+            session: 外部提供的 session（可選，提供時不會在 close() 時關閉）
+            pool_connections: 連線池數量
+            pool_maxsize: 每個連線池的最大連線數
+            http2: 是否使用 HTTP/2
+            timeout: 單一請求的逾時秒數
+            rate_limit: 每秒平均請求數（同一 token 共用，None 時沿用既有設定或 NotionConfig.RATE_LIMIT）
+            burst: 允許的突發請求數（None 時沿用既有設定或 NotionConfig.RATE_BURST）
+            max_in_flight: 同時進行中的請求上限
+            max_retries: 遇到 429/5xx 或網路錯誤時的最大重試次數（POST/PATCH 只重試 429 與連線失敗）
+            instrumentation: 請求量測物件（例如 RequestMetrics，可選）
+            base_url: API 網址（預設為 NotionConfig.BASE_URL，可指向本地的替身伺服器）
+        """
+        super().__init__(token, timeout=timeout, rate_limit=rate_limit,
+                         burst=burst, max_retries=max_retries, instrumentation=instrumentation,
+                         base_url=base_url)
+        self._owns_session = session is None
+        self.session = session if session is not None else create_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            http2=http2
+        )
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def close(self) -> None:
+        """關閉自行建立的 session，釋放連線池中的連線"""
+        if self._owns_session and self.session is not None:
+            self.session.close()
+        self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _send(self, method: str, url: str, data: dict = None, params: dict = None, record=None):
+        """取得速率額度與並行名額後送出單一請求（record 不為 None 時累計排隊時間）"""
+        queued = time.perf_counter() if record is not None else None
+        self.rate_limiter.acquire()
+        with self._in_flight:
+            if record is not None:
+                record.queue_wait += time.perf_counter() - queued
+            return self.session.request(
+                method=method,
+                url=url,
+                headers=self.headers,
+                json=data if data else None,
+                params=params,
+                timeout=self.timeout
+            )
 
-    def _make_request(self, method: str, url: str, data: dict = None) -> dict:
+    def _request(self, method: str, url: str, data: dict = None, params: dict = None) -> dict:
+        """送出請求並處理速率限制與重試
+
+        Raises:
+            NotionRequestError: 重試用盡或遇到不可重試的錯誤時
+        """
+        url = self._resolve_url(url)
+        record = self.instrumentation.start(method, url) if self.instrumentation is not None else None
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = self._send(method, url, data, params, record)
+                except NETWORK_ERRORS as e:
+                    error = network_error(e, method)
+                else:
+                    if record is not None:
+                        record.observe_response(response)
+                    if response.status_code < 400:
+                        return decode_response(response)
+                    error = response_error(response, method)
+
+                delay = self._retry_delay(error, attempt)
+                if delay > 0:
+                    time.sleep(delay)
+                attempt += 1
+                if record is not None:
+                    record.retries = attempt
+        except Exception as e:
+            if record is not None:
+                record.error = e
+            raise
+        finally:
+            if record is not None:
+                self.instrumentation.finish(record)
+
+    def _make_request(self, method: str, url: str, data: dict = None, params: dict = None) -> dict:
         """統一的請求處理方法，增強錯誤處理"""
         try:
-            response = requests.request(
+            return self._request(method, url, data, params)
+        except Exception as e:
+            self._print_error(e, self._resolve_url(url), data)
+            return None
+
+    def _run_plan(self, plan):
+        """執行請求流程 generator：送出它 yield 的每個請求並把回應傳回，回傳流程的結果"""
+        response = None
+        try:
+            while True:
+                response = self._make_request(*plan.send(response))
+        except StopIteration as done:
+            return done.value
+
+
+class AsyncNotionRequestHandler(BaseRequestHandler):
+    """NotionRequestHandler 的 asyncio 版本，使用 httpx.AsyncClient 連線池"""
+
+    def __init__(self, token: str,
+                 client=None,
+                 pool_maxsize: int = NotionConfig.POOL_MAXSIZE,
+                 http2: bool = False,
+                 timeout: float = NotionConfig.REQUEST_TIMEOUT,
+                 rate_limit: float = None,
+                 burst: int = None,
+                 max_in_flight: int = NotionConfig.MAX_IN_FLIGHT,
+                 max_retries: int = NotionConfig.MAX_RETRIES,
+                 instrumentation=None,
+                 base_url: str = None):
+        """
+        初始化非同步請求處理器
+
+        Args:
+            token: Notion API token
+            client: 外部提供的 httpx.AsyncClient（可選，提供時不會在 aclose() 時關閉）
+            pool_maxsize: 連線池最大連線數
+            http2: 是否使用 HTTP/2
+            timeout: 單一請求的逾時秒數
+            rate_limit: 每秒平均請求數（與同步 handler 共用同一個 token bucket，None 時沿用既有設定）
+            burst: 允許的突發請求數（None 時沿用既有設定）
+            max_in_flight: 同時進行中的請求上限
+            max_retries: 遇到 429/5xx 或網路錯誤時的最大重試次數（POST/PATCH 只重試 429 與連線失敗）
+            instrumentation: 請求量測物件（例如 RequestMetrics，可選）
+            base_url: API 網址（預設為 NotionConfig.BASE_URL，可指向本地的替身伺服器）
+        """
+        if client is None and httpx is None:
+            raise ImportError("AsyncNotionAPI 需要安裝 httpx：pip install httpx")
+
+        super().__init__(token, timeout=timeout, rate_limit=rate_limit,
+                         burst=burst, max_retries=max_retries, instrumentation=instrumentation,
+                         base_url=base_url)
+        self._owns_client = client is None
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize
+            )
+            client = httpx.AsyncClient(http2=http2, limits=limits)
+        self.client = client
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def aclose(self) -> None:
+        """關閉自行建立的 client"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+        self.client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def _send(self, method: str, url: str, data: dict = None, params: dict = None, record=None):
+        """取得速率額度與並行名額後送出單一請求（record 不為 None 時累計排隊時間）"""
+        queued = time.perf_counter() if record is not None else None
+        wait = self.rate_limiter.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        async with self._in_flight:
+            if record is not None:
+                record.queue_wait += time.perf_counter() - queued
+            return await self.client.request(
                 method=method,
                 url=url,
                 headers=self.headers,
-                json=data if data else None
+                json=data if data else None,
+                params=params,
+                timeout=self.timeout
             )
-            
-            # 詳細的錯誤信息輸出
-            if not response.ok:
-                error_detail = response.json() if response.content else "No error details"
-                print(f"API Error: {response.status_code}")
-                print(f"URL: {url}")
-                print(f"Request Data: {data}")
-                print(f"Error Details: {error_detail}")
-                return None
-                
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Network Error: {str(e)}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"JSON Parsing Error: {str(e)}")
-            return None
+
+    async def _request(self, method: str, url: str, data: dict = None, params: dict = None) -> dict:
+        """送出請求並處理速率限制與重試
+
+        Raises:
+            NotionRequestError: 重試用盡或遇到不可重試的錯誤時
+        """
+        url = self._resolve_url(url)
+        record = self.instrumentation.start(method, url) if self.instrumentation is not None else None
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = await self._send(method, url, data, params, record)
+                except NETWORK_ERRORS as e:
+                    error = network_error(e, method)
+                else:
+                    if record is not None:
+                        record.observe_response(response)
+                    if response.status_code < 400:
+                        return decode_response(response)
+                    error = response_error(response, method)
+
+                delay = self._retry_delay(error, attempt)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                attempt += 1
+                if record is not None:
+                    record.retries = attempt
         except Exception as e:
-            print(f"Unexpected Error: {str(e)}")
-            return None
\ No newline at end of file
+            if record is not None:
+                record.error = e
+            raise
+        finally:
+            if record is not None:
+                self.instrumentation.finish(record)
+
+    async def _make_request(self, method: str, url: str, data: dict = None, params: dict = None) -> dict:
+        """統一的請求處理方法，失敗時打印錯誤並回傳 None"""
+        try:
+            return await self._request(method, url, data, params)
+        except Exception as e:
+            self._print_error(e, self._resolve_url(url), data)
+            return None
+
+    async def _run_plan(self, plan):
+        """執行請求流程 generator（同 NotionRequestHandler._run_plan）"""
+        response = None
+        try:
+            while True:
+                response = await self._make_request(*plan.send(response))
+        except StopIteration as done:
+            return done.value
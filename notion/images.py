@@ -0,0 +1,119 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .config import NotionConfig
+from .upload_cache import UploadCache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+# 只重新編碼這些格式，其他格式（例如動態 GIF）原樣上傳
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+
+def resize_image(source: str, target: str, max_dimension: int, jpeg_quality: int) -> str:
+    """縮小並重新壓縮圖片（在子行程中執行），回傳要上傳的檔案路徑
+
+    結果沒有比原檔小時回傳原檔路徑。
+    """
+    with Image.open(source) as image:
+        image_format = image.format
+        if image_format not in FORMAT_EXTENSIONS:
+            return source
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        if image_format == "JPEG":
+            image.save(tmp_path, "JPEG", quality=jpeg_quality, optimize=True, progressive=True)
+        elif image_format == "PNG":
+            image.save(tmp_path, "PNG", optimize=True)
+        else:
+            image.save(tmp_path, image_format, quality=jpeg_quality)
+
+    if os.path.getsize(tmp_path) >= os.path.getsize(source):
+        os.remove(tmp_path)
+        return source
+    os.replace(tmp_path, target)
+    return target
+
+
+class ImagePreprocessor:
+    """上傳前縮小與重新壓縮圖片（需要安裝 Pillow）
+
+    影像處理在行程池中執行，不會阻塞上傳的執行緒。輸出檔以原檔內容雜湊與設定命名並保留在
+    output_dir，重複執行時直接沿用；輸出內容固定，因此上傳快取也能命中。
+    不需處理（格式不支援或無法變小）的圖片在 output_dir 留下空的 .original 標記檔，
+    重複執行時不會再解碼一次。
+    """
+
+    def __init__(self, max_dimension: int = NotionConfig.IMAGE_MAX_DIMENSION,
+                 jpeg_quality: int = NotionConfig.IMAGE_JPEG_QUALITY,
+                 output_dir: str = NotionConfig.IMAGE_OUTPUT_DIR,
+                 max_workers: int = None,
+                 upload_cache: UploadCache = None):
+        """
+        Args:
+            max_dimension: 最長邊的像素上限
+            jpeg_quality: JPEG / WebP 的壓縮品質
+            output_dir: 處理後圖片的存放目錄
+            max_workers: 行程池大小（預設為 CPU 數）
+            upload_cache: 共用的上傳快取（用來取得檔案雜湊，可選）
+        """
+        if Image is None:
+            raise ImportError("圖片預處理需要安裝 Pillow：pip install Pillow")
+        self.max_dimension = max_dimension
+        self.jpeg_quality = jpeg_quality
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.upload_cache = upload_cache if upload_cache is not None else UploadCache(None)
+        self.executor = None
+        self.lock = threading.Lock()
+        self.results = {}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.executor
+
+    def process(self, image_path: str) -> str:
+        """回傳要上傳的檔案路徑（處理後的圖片，或不需處理時的原檔）"""
+        image_path = str(image_path)
+        digest = self.upload_cache.digest(image_path)
+        key = f"{digest[:32]}_{self.max_dimension}_{self.jpeg_quality}"
+
+        with self.lock:
+            known = self.results.get(key)
+        if known and os.path.exists(known):
+            return known
+
+        extension = os.path.splitext(image_path)[1].lower()
+        target = os.path.join(self.output_dir, key + extension)
+        marker = os.path.join(self.output_dir, key + ".original")
+        if os.path.exists(target):
+            result = target
+        elif os.path.exists(marker):
+            result = image_path
+        else:
+            os.makedirs(self.output_dir, exist_ok=True)
+            result = self._executor().submit(
+                resize_image, image_path, target, self.max_dimension, self.jpeg_quality
+            ).result()
+            if result == image_path:
+                open(marker, "w").close()
+
+        with self.lock:
+            self.results[key] = result
+        return result
+
+    def close(self) -> None:
+        """關閉行程池"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
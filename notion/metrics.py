@@ -0,0 +1,236 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+
+
+# 延遲直方圖的預設區間（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Notion 的 ID（UUID，有無連字號皆可）
+ID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+# 這些路徑段之後接的是 ID
+ID_COLLECTIONS = ("pages", "databases", "blocks", "users", "comments", "properties")
+
+
+def endpoint_template(url: str, base_url: str = "") -> str:
+    """將網址轉為端點模板，去除 ID 與 query string，例如 /pages/{id}"""
+    if base_url and url.startswith(base_url):
+        url = url[len(base_url):]
+    path = url.split("?", 1)[0]
+    if "://" in path:
+        path = "/" + path.split("://", 1)[1].split("/", 1)[-1]
+
+    segments = path.split("/")
+    for i, segment in enumerate(segments):
+        if segment and (ID_PATTERN.match(segment) or (i > 0 and segments[i - 1] in ID_COLLECTIONS)):
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+def request_body_size(response) -> int:
+    """送出的請求內容大小（requests 的 PreparedRequest.body 或 httpx 的 Request.content）"""
+    request = getattr(response, "request", None)
+    body = getattr(request, "body", None)
+    if body is None:
+        try:
+            body = getattr(request, "content", None)
+        except Exception:
+            body = None
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
+
+class RequestRecord:
+    """單一邏輯請求（含所有重試）的量測結果"""
+
+    __slots__ = ("method", "endpoint", "status", "bytes_out", "bytes_in", "queue_wait",
+                 "retries", "latency", "error", "started", "span")
+
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.status = None
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.queue_wait = 0.0
+        self.retries = 0
+        self.latency = 0.0
+        self.error = None
+        self.started = time.perf_counter()
+        self.span = None
+
+    def observe_response(self, response) -> None:
+        """記錄一次回應（重試時會累加流量）"""
+        self.status = response.status_code
+        self.bytes_in += len(response.content or b"")
+        self.bytes_out += request_body_size(response)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ("started", "span")}
+
+
+class Histogram:
+    """累積型直方圖（與 Prometheus histogram 相同的語意）"""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """以區間上界估計分位數"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class RequestMetrics:
+    """請求層級的量測：計數器、延遲直方圖，以及可選的回呼與 tracing span
+
+    傳入 NotionAPI(instrumentation=RequestMetrics()) 即啟用；未啟用時 handler 不做任何量測。
+
+        metrics = RequestMetrics(callback=lambda record: log.info(record.as_dict()))
+        notion = NotionAPI(token, instrumentation=metrics)
+        ...
+        print(metrics.to_prometheus())
+
+    tracer 為 OpenTelemetry 風格的物件（提供 start_span(name, attributes=...)，
+    span 提供 set_attribute / record_exception / end），例如 opentelemetry.trace.get_tracer(...)。
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, callback=None, tracer=None,
+                 base_url: str = ""):
+        """
+        Args:
+            buckets: 延遲直方圖的區間（秒）
+            callback: 每個請求完成時呼叫 callback(record)（可選）
+            tracer: OpenTelemetry 風格的 tracer（可選）
+            base_url: 計算端點模板時要去除的網址前綴（handler 會自動設定）
+        """
+        self.buckets = tuple(buckets)
+        self.callback = callback
+        self.tracer = tracer
+        self.base_url = base_url
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests = {}        # (method, endpoint, status) -> 次數
+            self.retries = {}         # (method, endpoint) -> 重試次數
+            self.bytes_out = {}       # (method, endpoint) -> 位元組
+            self.bytes_in = {}
+            self.latency = {}         # (method, endpoint) -> Histogram
+            self.queue_wait = {}      # (method, endpoint) -> Histogram
+
+    def start(self, method: str, url: str) -> RequestRecord:
+        """請求開始（由 handler 呼叫）"""
+        record = RequestRecord(method, endpoint_template(url, self.base_url))
+        if self.tracer is not None:
+            record.span = self.tracer.start_span(
+                f"{method} {record.endpoint}",
+                attributes={"http.method": method, "notion.endpoint": record.endpoint}
+            )
+        return record
+
+    def finish(self, record: RequestRecord) -> None:
+        """請求結束（成功或最終失敗，由 handler 呼叫）"""
+        record.latency = time.perf_counter() - record.started
+        status = str(record.status) if record.error is None or record.status else "error"
+        key = (record.method, record.endpoint)
+
+        with self.lock:
+            count_key = key + (status,)
+            self.requests[count_key] = self.requests.get(count_key, 0) + 1
+            self.retries[key] = self.retries.get(key, 0) + record.retries
+            self.bytes_out[key] = self.bytes_out.get(key, 0) + record.bytes_out
+            self.bytes_in[key] = self.bytes_in.get(key, 0) + record.bytes_in
+            if key not in self.latency:
+                self.latency[key] = Histogram(self.buckets)
+                self.queue_wait[key] = Histogram(self.buckets)
+            self.latency[key].observe(record.latency)
+            self.queue_wait[key].observe(record.queue_wait)
+
+        span = record.span
+        if span is not None:
+            if record.status is not None:
+                span.set_attribute("http.status_code", record.status)
+            span.set_attribute("notion.retries", record.retries)
+            span.set_attribute("notion.queue_wait", record.queue_wait)
+            span.set_attribute("notion.bytes_in", record.bytes_in)
+            span.set_attribute("notion.bytes_out", record.bytes_out)
+            if record.error is not None:
+                span.record_exception(record.error)
+            span.end()
+
+        if self.callback is not None:
+            self.callback(record)
+
+    def snapshot(self) -> dict:
+        """目前的統計摘要，以 "METHOD /endpoint" 為鍵"""
+        with self.lock:
+            summary = {}
+            for (method, endpoint), histogram in self.latency.items():
+                key = (method, endpoint)
+                summary[f"{method} {endpoint}"] = {
+                    "requests": histogram.count,
+                    "status": {
+                        status: count for (m, e, status), count in self.requests.items()
+                        if (m, e) == key
+                    },
+                    "retries": self.retries[key],
+                    "bytes_out": self.bytes_out[key],
+                    "bytes_in": self.bytes_in[key],
+                    "latency_avg": histogram.sum / histogram.count,
+                    "latency_p50": histogram.quantile(0.5),
+                    "latency_p99": histogram.quantile(0.99),
+                    "queue_wait_avg": self.queue_wait[key].sum / histogram.count,
+                }
+            return summary
+
+    def to_prometheus(self, prefix: str = "notion") -> str:
+        """輸出 Prometheus text exposition 格式"""
+        def labels(method, endpoint, **extra):
+            items = [("method", method), ("endpoint", endpoint)] + list(extra.items())
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        def histogram_lines(name, histograms):
+            lines = [f"# TYPE {name} histogram"]
+            for (method, endpoint), histogram in sorted(histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{labels(method, endpoint, le=bound)} {cumulative}")
+                lines.append(f"{name}_bucket{labels(method, endpoint, le='+Inf')} {histogram.count}")
+                lines.append(f"{name}_sum{labels(method, endpoint)} {histogram.sum}")
+                lines.append(f"{name}_count{labels(method, endpoint)} {histogram.count}")
+            return lines
+
+        def counter_lines(name, values):
+            lines = [f"# TYPE {name} counter"]
+            for (method, endpoint), value in sorted(values.items()):
+                lines.append(f"{name}{labels(method, endpoint)} {value}")
+            return lines
+
+        with self.lock:
+            lines = [f"# TYPE {prefix}_requests_total counter"]
+            for (method, endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f"{prefix}_requests_total{labels(method, endpoint, status=status)} {count}")
+            lines += counter_lines(f"{prefix}_request_retries_total", self.retries)
+            lines += counter_lines(f"{prefix}_request_bytes_sent_total", self.bytes_out)
+            lines += counter_lines(f"{prefix}_request_bytes_received_total", self.bytes_in)
+            lines += histogram_lines(f"{prefix}_request_duration_seconds", self.latency)
+            lines += histogram_lines(f"{prefix}_request_queue_wait_seconds", self.queue_wait)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,401 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from .config import NotionConfig
+from .endpoints import NotionEndpoints
+from .extractors import PropertyValueExtractor
+from .query import parse_date, raw_value
+from .sync import parse_timestamp, format_timestamp
+
+
+# 資料表佈局版本，與 meta 中記錄的不同時完整重建
+LAYOUT_VERSION = "2"
+
+# 屬性類型對應的 SQLite 欄位類型；多值類型另存於 page_values 表
+COLUMN_TYPES = {
+    NotionConfig.PropertyType.NUMBER: "REAL",
+    NotionConfig.PropertyType.CHECKBOX: "INTEGER",
+    NotionConfig.PropertyType.DATE: "REAL",
+    NotionConfig.PropertyType.ROLLUP: "NUMERIC",
+}
+MULTI_VALUE_TYPES = (NotionConfig.PropertyType.MULTI_SELECT, NotionConfig.PropertyType.RELATION)
+# 日期以 UTC epoch 秒數保存（比較與排序），另存日期部分的欄位供 equals 使用
+DATE_TYPES = (NotionConfig.PropertyType.DATE, NotionConfig.PropertyType.ROLLUP)
+
+TEXT_OPERATORS = {
+    "equals": "{col} = ?",
+    "does_not_equal": "({col} IS NULL OR {col} != ?)",
+    "contains": "instr(lower({col}), lower(?)) > 0",
+    "does_not_contain": "({col} IS NULL OR instr(lower({col}), lower(?)) = 0)",
+    "starts_with": "lower({col}) LIKE lower(?) || '%'",
+    "ends_with": "lower({col}) LIKE '%' || lower(?)",
+}
+COMPARE_OPERATORS = {
+    "equals": "{col} = ?",
+    "does_not_equal": "({col} IS NULL OR {col} != ?)",
+    "greater_than": "{col} > ?",
+    "less_than": "{col} < ?",
+    "greater_than_or_equal_to": "{col} >= ?",
+    "less_than_or_equal_to": "{col} <= ?",
+}
+DATE_OPERATORS = {
+    "equals": "{day} = ?",
+    "before": "{col} < ?",
+    "after": "{col} > ?",
+    "on_or_before": "{col} <= ?",
+    "on_or_after": "{col} >= ?",
+}
+
+
+def quote(name: str) -> str:
+    """SQLite 識別字加上引號"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_name(prop_name: str) -> str:
+    """屬性對應的欄位名稱（加上前綴避免與內建欄位衝突）"""
+    return quote(f"p:{prop_name}")
+
+
+def day_column_name(prop_name: str) -> str:
+    """日期屬性的日期部分欄位名稱"""
+    return quote(f"d:{prop_name}")
+
+
+# 時間戳欄位與其日期部分欄位
+TIMESTAMP_COLUMNS = {
+    "created_time": quote("created_day"),
+    "last_edited_time": quote("last_edited_day"),
+}
+
+
+def date_epoch(value: str):
+    """ISO 8601 日期字串轉為 UTC epoch 秒數（只有日期時視為 UTC 午夜，與 LocalQuery 相同）"""
+    parsed = parse_date(value)
+    return parsed.timestamp() if parsed else None
+
+
+def date_day(value: str):
+    """日期字串的日期部分（依字串本身的時區，與 LocalQuery 的 equals 相同）"""
+    return value[:10] if value else None
+
+
+class DatabaseMirror:
+    """將 Notion 數據庫鏡像到本地 SQLite，重複的查詢直接在本地執行
+
+    每個頁面一列，欄位依 get_database_properties 的屬性類型建立並加上索引；
+    multi_select / relation 的值拆成 page_values 表以支援 contains 查詢。
+    query() 接受與 NotionAPI.query_database 相同的 filter_params / sort_params，
+    回傳相同格式的結果。資料只在呼叫 refresh() 時更新。
+    """
+
+    def __init__(self, notion, database_id: str, path: str = None):
+        """
+        Args:
+            notion: NotionAPI 實例
+            database_id: 數據庫ID
+            path: SQLite 檔案路徑（預設為 NotionConfig.MIRROR_DIR/<database_id>.sqlite）
+        """
+        self.notion = notion
+        self.database_id = database_id
+        self.path = path or os.path.join(NotionConfig.MIRROR_DIR, f"{database_id}.sqlite")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        self.schema = json.loads(self._get_meta("schema") or "{}")
+
+    def close(self) -> None:
+        """關閉 SQLite 連線"""
+        self.conn.close()
+
+    def _get_meta(self, key: str) -> str:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _create_tables(self, schema: dict) -> None:
+        """依數據庫屬性建立資料表與索引（schema 變更時重建）"""
+        self.conn.execute("DROP TABLE IF EXISTS pages")
+        self.conn.execute("DROP TABLE IF EXISTS page_values")
+
+        columns = ["id TEXT PRIMARY KEY", "created_time REAL", "last_edited_time REAL", "raw TEXT",
+                   f"{TIMESTAMP_COLUMNS['created_time']} TEXT", f"{TIMESTAMP_COLUMNS['last_edited_time']} TEXT"]
+        for prop_name, prop_type in schema.items():
+            if prop_type not in MULTI_VALUE_TYPES:
+                columns.append(f"{column_name(prop_name)} {COLUMN_TYPES.get(prop_type, 'TEXT')}")
+            if prop_type in DATE_TYPES:
+                columns.append(f"{day_column_name(prop_name)} TEXT")
+
+        self.conn.execute(f"CREATE TABLE pages ({', '.join(columns)})")
+        self.conn.execute("CREATE TABLE page_values (page_id TEXT, property TEXT, value TEXT)")
+        self.conn.execute("CREATE INDEX idx_page_values ON page_values (property, value, page_id)")
+        self.conn.execute("CREATE INDEX idx_page_values_page ON page_values (page_id)")
+        self.conn.execute("CREATE INDEX idx_created_time ON pages (created_time)")
+        self.conn.execute("CREATE INDEX idx_last_edited_time ON pages (last_edited_time)")
+        for i, (prop_name, prop_type) in enumerate(schema.items()):
+            if prop_type not in MULTI_VALUE_TYPES:
+                self.conn.execute(f"CREATE INDEX {quote(f'idx_p{i}')} ON pages ({column_name(prop_name)})")
+
+        self.schema = schema
+        self._set_meta("schema", json.dumps(schema, ensure_ascii=False))
+        self._set_meta("layout", LAYOUT_VERSION)
+        self._set_meta("watermark", "")
+
+    @staticmethod
+    def _column_value(prop_data: dict):
+        """屬性的欄位值：多數類型使用 extract_value，日期與 rollup 取可比較的原始值"""
+        prop_type = prop_data.get("type")
+        if prop_type == NotionConfig.PropertyType.CHECKBOX:
+            return int(bool(prop_data.get("checkbox")))
+
+        if prop_type in DATE_TYPES:
+            value = raw_value(prop_data)
+        else:
+            value = PropertyValueExtractor.extract_value(prop_data)
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    @staticmethod
+    def _date_values(prop_data: dict) -> tuple:
+        """日期（或日期 rollup）屬性的 (epoch 秒數, 日期部分)，其他值為 (原值, None)"""
+        value = DatabaseMirror._column_value(prop_data) if prop_data else None
+        is_date = prop_data and (
+            prop_data.get("type") == NotionConfig.PropertyType.DATE
+            or (prop_data.get("rollup") or {}).get("type") == "date"
+        )
+        if is_date and value:
+            return date_epoch(value), date_day(value)
+        return value, None
+
+    def _upsert(self, page: dict) -> None:
+        page_id = page["id"]
+        properties = page.get("properties", {})
+        columns = ["id", "raw"]
+        values = [page_id, json.dumps(page, ensure_ascii=False)]
+        for timestamp, day_column in TIMESTAMP_COLUMNS.items():
+            columns += [timestamp, day_column]
+            values += [date_epoch(page.get(timestamp)), date_day(page.get(timestamp))]
+        multi_values = []
+
+        for prop_name, prop_type in self.schema.items():
+            prop_data = properties.get(prop_name)
+            if prop_type in MULTI_VALUE_TYPES:
+                if prop_data:
+                    for value in PropertyValueExtractor.extract_value(prop_data) or []:
+                        multi_values.append((page_id, prop_name, value))
+                continue
+            if prop_type in DATE_TYPES:
+                value, day = self._date_values(prop_data)
+                columns += [column_name(prop_name), day_column_name(prop_name)]
+                values += [value, day]
+                continue
+            columns.append(column_name(prop_name))
+            values.append(self._column_value(prop_data) if prop_data else None)
+
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO pages ({', '.join(columns)}) VALUES ({', '.join('?' * len(values))})",
+            values
+        )
+        self.conn.execute("DELETE FROM page_values WHERE page_id = ?", (page_id,))
+        self.conn.executemany("INSERT INTO page_values VALUES (?, ?, ?)", multi_values)
+
+    def refresh(self, full: bool = False,
+                overlap_seconds: float = NotionConfig.SYNC_OVERLAP_SECONDS) -> int:
+        """從 Notion 更新本地鏡像
+
+        預設只抓取上次更新後（往前重疊 overlap_seconds）編輯過的頁面；
+        full=True 或數據庫 schema 改變時會完整重建，並移除已不存在的頁面。
+
+        Returns:
+            int: 寫入的頁面數
+        """
+        schema = NotionEndpoints.parse_database_properties(
+            self.notion.get_database_schema(self.database_id, refresh=True)
+        )
+        if not schema:
+            raise ValueError(f"無法取得數據庫 {self.database_id} 的屬性")
+
+        with self.lock:
+            rebuild = full or schema != self.schema or self._get_meta("layout") != LAYOUT_VERSION
+            watermark = None if rebuild else self._get_meta("watermark")
+            previous_schema = self.schema
+            # 重建（DROP / CREATE）與寫入在同一個交易中，失敗時整個還原，不會留下空的資料表
+            self.conn.execute("BEGIN")
+
+            query_filter = None
+            if watermark:
+                since = parse_timestamp(watermark) - timedelta(seconds=overlap_seconds)
+                query_filter = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": format_timestamp(since)}
+                }
+
+            count = 0
+            latest = watermark
+            try:
+                if rebuild:
+                    self._create_tables(schema)
+
+                for page in self.notion.iter_database(self.database_id, filter_params=query_filter,
+                                                      raise_errors=True):
+                    if page.get("archived") or page.get("in_trash"):
+                        self.conn.execute("DELETE FROM pages WHERE id = ?", (page["id"],))
+                        self.conn.execute("DELETE FROM page_values WHERE page_id = ?", (page["id"],))
+                        continue
+                    self._upsert(page)
+                    count += 1
+                    edited = page.get("last_edited_time")
+                    if edited and (not latest or parse_timestamp(edited) > parse_timestamp(latest)):
+                        latest = edited
+
+                self._set_meta("watermark", latest or "")
+                self._set_meta("refreshed_at", datetime.now(timezone.utc).isoformat())
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                self.schema = previous_schema
+                raise
+
+        print(f"鏡像更新完成：寫入 {count} 筆記錄")
+        return count
+
+    def _translate_filter(self, query_filter: dict, params: list) -> str:
+        """將 Notion 過濾 JSON 轉為 SQL 條件"""
+        if "and" in query_filter or "or" in query_filter:
+            joiner = "AND" if "and" in query_filter else "OR"
+            parts = [self._translate_filter(f, params) for f in query_filter.get(joiner.lower(), [])]
+            if not parts:
+                return "1 = 1"
+            return "(" + f" {joiner} ".join(parts) + ")"
+
+        if "timestamp" in query_filter:
+            timestamp = query_filter["timestamp"]
+            if timestamp not in ("created_time", "last_edited_time"):
+                raise ValueError(f"鏡像查詢不支援的時間戳: {timestamp}")
+            return self._translate_condition(quote(timestamp), "date", query_filter[timestamp], params,
+                                             day=TIMESTAMP_COLUMNS[timestamp])
+
+        prop_name = query_filter.get("property")
+        if prop_name not in self.schema:
+            raise ValueError(f"鏡像中沒有屬性 '{prop_name}'，請先 refresh()")
+
+        condition_types = [key for key in query_filter if key != "property"]
+        if len(condition_types) != 1:
+            raise ValueError(f"無法解析過濾條件: {query_filter}")
+        condition_type = condition_types[0]
+        condition = query_filter[condition_type]
+
+        if condition_type == NotionConfig.PropertyType.ROLLUP:
+            if "number" in condition:
+                condition_type, condition = "number", condition["number"]
+            elif "date" in condition:
+                condition_type, condition = "date", condition["date"]
+            else:
+                raise ValueError(f"鏡像查詢不支援的 rollup 過濾: {condition}")
+
+        if self.schema[prop_name] in MULTI_VALUE_TYPES:
+            return self._translate_multi(prop_name, condition, params)
+        return self._translate_condition(column_name(prop_name), condition_type, condition, params,
+                                         day=day_column_name(prop_name))
+
+    @staticmethod
+    def _translate_condition(col: str, condition_type: str, condition: dict, params: list,
+                             day: str = None) -> str:
+        """單一欄位的條件（day 為日期部分欄位，日期的 equals 使用）"""
+        if len(condition) != 1:
+            raise ValueError(f"無法解析過濾條件: {condition}")
+        operator, value = next(iter(condition.items()))
+
+        if operator == "is_empty":
+            return f"({col} IS NULL OR {col} = '')"
+        if operator == "is_not_empty":
+            return f"({col} IS NOT NULL AND {col} != '')"
+
+        if condition_type == "number":
+            operators = COMPARE_OPERATORS
+        elif condition_type in ("date", "created_time", "last_edited_time"):
+            operators = DATE_OPERATORS
+            # 以正規化後的值比較：equals 比日期部分，其餘比 UTC epoch 秒數
+            value = date_day(value) if operator == "equals" else date_epoch(value)
+        elif condition_type == "checkbox":
+            operators = COMPARE_OPERATORS
+            value = int(bool(value))
+        else:
+            operators = TEXT_OPERATORS
+
+        if operator not in operators:
+            raise ValueError(f"鏡像查詢不支援的條件: {condition_type}.{operator}")
+        params.append(value)
+        return operators[operator].format(col=col, day=day)
+
+    @staticmethod
+    def _translate_multi(prop_name: str, condition: dict, params: list) -> str:
+        """multi_select / relation 的條件（查詢 page_values 表）"""
+        if len(condition) != 1:
+            raise ValueError(f"無法解析過濾條件: {condition}")
+        operator, value = next(iter(condition.items()))
+        exists = "EXISTS (SELECT 1 FROM page_values v WHERE v.page_id = pages.id AND v.property = ?{extra})"
+
+        params.append(prop_name)
+        if operator == "is_empty":
+            return "NOT " + exists.format(extra="")
+        if operator == "is_not_empty":
+            return exists.format(extra="")
+        if operator in ("contains", "does_not_contain"):
+            params.append(value)
+            clause = exists.format(extra=" AND v.value = ?")
+            return clause if operator == "contains" else "NOT " + clause
+        raise ValueError(f"鏡像查詢不支援的條件: {operator}")
+
+    def _translate_sorts(self, sort_params: list) -> str:
+        """排序參數轉為 ORDER BY（空值排在最後，與 Notion 一致）"""
+        clauses = []
+        for sort in sort_params or []:
+            if "timestamp" in sort:
+                col = quote(sort["timestamp"])
+            elif sort.get("property") in self.schema:
+                col = column_name(sort["property"])
+            else:
+                raise ValueError(f"無法排序: {sort}")
+            direction = "DESC" if sort.get("direction") == "descending" else "ASC"
+            clauses.append(f"{col} IS NULL, {col} {direction}")
+        return " ORDER BY " + ", ".join(clauses) if clauses else ""
+
+    def query(self, filter_params: dict = None, sort_params: list = None, limit: int = None) -> dict:
+        """在本地鏡像上查詢（參數與 NotionAPI.query_database 相同）
+
+        Returns:
+            dict: {"results": [...], "has_more": False, "next_cursor": None}
+        """
+        params = []
+        sql = "SELECT raw FROM pages"
+        query_filter = NotionEndpoints.build_filter(filter_params)
+        if query_filter:
+            sql += " WHERE " + self._translate_filter(query_filter, params)
+        sql += self._translate_sorts(sort_params)
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return {
+            "results": [json.loads(row[0]) for row in rows],
+            "has_more": False,
+            "next_cursor": None
+        }
+
+    def count(self) -> int:
+        """鏡像中的頁面數"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
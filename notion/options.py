@@ -0,0 +1,103 @@
+from .config import NotionConfig
+
+
+class OptionDictionary:
+    """將 select / multi_select 的選項 ID 對應到小整數代碼
+
+    select 的值編碼為代碼（int），multi_select 編碼為位元集合（第 n 位代表代碼 n），
+    需要名稱時再以 decode() 轉回。代碼順序與 schema 中的選項順序相同，
+    schema 取得後才新增的選項會在遇到時自動配發新代碼。
+
+        options = notion.get_option_dictionary(database_id)
+        urgent = options.mask("Tags", ["Urgent"])
+        urgent_rows = [row for row in rows if row["Tags"] & urgent]
+    """
+
+    def __init__(self, select_options: dict):
+        """
+        Args:
+            select_options: get_database_select_options 的結果
+        """
+        self.types = {}
+        self.names = {}
+        self.codes_by_id = {}
+        self.codes_by_name = {}
+        for prop_name, info in select_options.items():
+            self.types[prop_name] = info["type"]
+            self.names[prop_name] = []
+            self.codes_by_id[prop_name] = {}
+            self.codes_by_name[prop_name] = {}
+            for option in info.get("options", []):
+                self._add(prop_name, option.get("id"), option["name"])
+
+    def _add(self, prop_name: str, option_id: str, name: str) -> int:
+        code = len(self.names[prop_name])
+        self.names[prop_name].append(name)
+        if option_id:
+            self.codes_by_id[prop_name][option_id] = code
+        self.codes_by_name[prop_name][name] = code
+        return code
+
+    def __contains__(self, prop_name: str) -> bool:
+        return prop_name in self.types
+
+    def code(self, prop_name: str, option: dict) -> int:
+        """選項物件（含 id / name）的代碼，未知選項會配發新代碼"""
+        code = self.codes_by_id[prop_name].get(option.get("id"))
+        if code is None:
+            code = self.codes_by_name[prop_name].get(option["name"])
+            if code is None:
+                code = self._add(prop_name, option.get("id"), option["name"])
+            elif option.get("id"):
+                self.codes_by_id[prop_name][option["id"]] = code
+        return code
+
+    def encode(self, prop_name: str, prop_data: dict):
+        """將原始屬性編碼：select -> 代碼或 None，multi_select -> 位元集合"""
+        prop_type = self.types[prop_name]
+        value = prop_data.get(prop_type) if prop_data else None
+        if prop_type == NotionConfig.PropertyType.SELECT:
+            return self.code(prop_name, value) if value else None
+
+        bits = 0
+        for option in value or []:
+            bits |= 1 << self.code(prop_name, option)
+        return bits
+
+    def decode(self, prop_name: str, value):
+        """將代碼（select）或位元集合（multi_select）轉回選項名稱"""
+        if value is None:
+            return None
+        names = self.names[prop_name]
+        if self.types[prop_name] == NotionConfig.PropertyType.SELECT:
+            return names[value]
+        return [names[code] for code in range(len(names)) if value >> code & 1]
+
+    def mask(self, prop_name: str, names: list) -> int:
+        """選項名稱集合對應的位元遮罩，用於 multi_select 的整數過濾"""
+        bits = 0
+        for name in names:
+            bits |= 1 << self.codes_by_name[prop_name][name]
+        return bits
+
+    def lookup(self, prop_name: str, name: str) -> int:
+        """選項名稱的代碼，用於 select 的整數比較"""
+        return self.codes_by_name[prop_name][name]
+
+    def counts(self, prop_name: str, values) -> dict:
+        """依選項統計次數（以整數運算完成，最後才轉為名稱）"""
+        names = self.names[prop_name]
+        totals = [0] * len(names)
+        if self.types[prop_name] == NotionConfig.PropertyType.SELECT:
+            for code in values:
+                if code is not None:
+                    totals[code] += 1
+        else:
+            for bits in values:
+                code = 0
+                while bits:
+                    if bits & 1:
+                        totals[code] += 1
+                    bits >>= 1
+                    code += 1
+        return {names[code]: total for code, total in enumerate(totals) if total}
@@ -0,0 +1,74 @@
+from .extractors import PropertyValueExtractor
+
+
+class Page:
+    """精簡的頁面記錄：id 與時間戳直接保存，屬性在第一次讀取時才解碼並快取
+
+    解碼結果與 get_formatted_page_properties 相同（relation 只保留第一個 ID）。
+
+        for page in notion.iter_pages(database_id):
+            print(page.id, page["Name"])
+    """
+
+    __slots__ = ("id", "created_time", "last_edited_time", "archived", "_properties", "_values")
+
+    def __init__(self, page_id: str, properties: dict,
+                 created_time: str = None, last_edited_time: str = None, archived: bool = False):
+        self.id = page_id
+        self.created_time = created_time
+        self.last_edited_time = last_edited_time
+        self.archived = archived
+        self._properties = properties
+        self._values = None
+
+    @classmethod
+    def from_json(cls, page_data: dict) -> "Page":
+        """由 API 回傳的頁面物件建立（只保留屬性，其餘欄位丟棄）"""
+        return cls(
+            page_data.get("id"),
+            page_data.get("properties", {}),
+            page_data.get("created_time"),
+            page_data.get("last_edited_time"),
+            page_data.get("archived", False)
+        )
+
+    def __getitem__(self, prop_name: str):
+        values = self._values
+        if values is None:
+            values = self._values = {}
+        elif prop_name in values:
+            return values[prop_name]
+
+        prop_data = self._properties[prop_name]
+        value = PropertyValueExtractor.extract_value(prop_data)
+        if prop_data.get("type") == "relation":
+            value = value[0] if value else None
+        values[prop_name] = value
+        return value
+
+    def get(self, prop_name: str, default=None):
+        return self[prop_name] if prop_name in self._properties else default
+
+    def raw(self, prop_name: str) -> dict:
+        """未解碼的原始屬性 JSON"""
+        return self._properties.get(prop_name)
+
+    def __contains__(self, prop_name: str) -> bool:
+        return prop_name in self._properties
+
+    def __iter__(self):
+        return iter(self._properties)
+
+    def __len__(self):
+        return len(self._properties)
+
+    def keys(self):
+        return self._properties.keys()
+
+    def to_dict(self, property_list: list = None) -> dict:
+        """解碼全部（或指定）屬性，格式同 get_formatted_page_properties"""
+        names = property_list or list(self._properties)
+        return {name: self[name] for name in names if name in self._properties}
+
+    def __repr__(self):
+        return f"Page(id={self.id!r}, last_edited_time={self.last_edited_time!r})"
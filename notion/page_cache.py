@@ -0,0 +1,106 @@
+import time
+from .cache import TTLCache
+from .endpoints import NotionEndpoints
+
+
+class PageEntry:
+    """快取中的單一頁面：原始 JSON、last_edited_time、最近一次由查詢確認的時間，以及格式化結果的備忘"""
+
+    __slots__ = ("page", "last_edited_time", "confirmed", "formatted")
+
+    def __init__(self, page: dict):
+        self.page = page
+        self.last_edited_time = page.get("last_edited_time")
+        self.confirmed = None
+        self.formatted = {}
+
+    def format(self, property_list: list = None) -> dict:
+        """格式化後的屬性（同一組屬性只解析一次）"""
+        key = tuple(property_list) if property_list else None
+        formatted = self.formatted.get(key)
+        if formatted is None:
+            formatted = NotionEndpoints.format_properties(
+                NotionEndpoints.select_properties(self.page, property_list)
+            )
+            self.formatted[key] = formatted
+        return dict(formatted)
+
+
+class PageCache(TTLCache):
+    """以頁面 ID 為鍵的頁面快取（NotionAPI(page_cache=True) 時啟用）
+
+    數據庫查詢、GET 與 PATCH 的回應都會以 observe() 寫入。last_edited_time 只精確到分鐘，
+    因此只有屬性內容完全相同時才保留原本的項目（含格式化備忘），否則換成新的內容。
+    lookup() 只回傳 ttl 秒內由數據庫查詢確認過的內容，免去單獨的 GET；
+    內容的新舊程度等同於該次查詢，期間其他人的修改不會反映出來。
+    """
+
+    def observe(self, page: dict, replace: bool = False) -> PageEntry:
+        """記錄一筆頁面，回傳快取中的項目
+
+        Args:
+            page: 查詢結果中的頁面，或 GET / PATCH 的回應
+            replace: GET / PATCH 的回應一定是最新內容，總是取代；查詢結果（可能是預先抓取的
+                     較舊資料）不覆蓋 last_edited_time 較新的項目，寫入時記錄確認時間
+        """
+        page_id = page.get("id")
+        if not page_id or "properties" not in page:
+            return None
+        if page.get("archived") or page.get("in_trash"):
+            self.invalidate(page_id)
+            return None
+
+        edited = page.get("last_edited_time")
+        with self.lock:
+            item = self.data.get(page_id)
+        entry = item[0] if item else None
+        if entry is not None and entry.page.get("properties") == page["properties"]:
+            # 內容相同，沿用既有項目的格式化備忘
+            if edited and (entry.last_edited_time is None or edited > entry.last_edited_time):
+                entry.last_edited_time = edited
+        elif entry is not None and not replace and edited and entry.last_edited_time \
+                and edited < entry.last_edited_time:
+            return entry
+        else:
+            entry = PageEntry(page)
+        if not replace:
+            entry.confirmed = time.monotonic()
+        self.set(page_id, entry)
+        return entry
+
+    def lookup(self, page_id: str) -> PageEntry:
+        """取得可以直接使用的頁面：只有 ttl 秒內由查詢確認過的項目才算命中
+
+        GET / PATCH 寫入（且之後沒有查詢再看到相同內容）的項目只用於格式化備忘，不會免去下一次的 GET。
+        """
+        with self.lock:
+            item = self.data.get(page_id)
+            now = time.monotonic()
+            if item is not None and item[1] > now:
+                entry = item[0]
+                if entry.confirmed is not None and now - entry.confirmed < self.ttl:
+                    self.data.move_to_end(page_id)
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def format(self, page: dict, property_list: list = None) -> dict:
+        """格式化呼叫端提供的頁面；快取中的項目內容相同時沿用備忘，否則直接解析"""
+        entry = self.get(page.get("id"))
+        if entry is not None and entry.page.get("properties") == page.get("properties"):
+            return entry.format(property_list)
+        return NotionEndpoints.format_properties(
+            NotionEndpoints.select_properties(page, property_list)
+        )
+
+    def observe_many(self, pages: list) -> None:
+        for page in pages:
+            self.observe(page)
+
+    def record_update(self, page_id: str, result) -> None:
+        """PATCH 回傳更新後的頁面時取代快取，否則移除該頁面"""
+        if isinstance(result, dict) and "properties" in result:
+            self.observe(result, replace=True)
+        else:
+            self.invalidate(page_id)
@@ -0,0 +1,281 @@
+from datetime import datetime, timedelta, timezone
+from .endpoints import NotionEndpoints
+
+
+TEXT_TYPES = ("title", "rich_text", "url", "email", "phone_number", "string")
+LIST_TYPES = ("multi_select", "relation", "people", "files")
+
+
+def parse_date(value):
+    """解析日期字串（只有日期時視為 UTC 午夜），None 原樣回傳"""
+    if not value:
+        return None
+    if len(value) == 10:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def raw_value(prop_data: dict):
+    """取出可比較的原始值（與 PropertyValueExtractor 不同，不做顯示用的格式化）"""
+    if not prop_data:
+        return None
+
+    prop_type = prop_data.get("type")
+    value = prop_data.get(prop_type)
+
+    if prop_type in ("title", "rich_text"):
+        return "".join(
+            item.get("plain_text") or item.get("text", {}).get("content", "")
+            for item in value or []
+        )
+    if prop_type in ("select", "status"):
+        return value["name"] if value else None
+    if prop_type == "multi_select":
+        return [option["name"] for option in value or []]
+    if prop_type in ("relation", "people", "files"):
+        return [item.get("id") or item.get("name") for item in value or []]
+    if prop_type == "date":
+        return value["start"] if value else None
+    if prop_type in ("rollup", "formula"):
+        if not value:
+            return None
+        inner_type = value.get("type")
+        inner = value.get(inner_type)
+        if inner_type == "date":
+            return inner["start"] if inner else None
+        if inner_type == "array":
+            return [raw_value(item) for item in inner or []]
+        return inner
+    return value
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == []
+
+
+def _text_condition(operator: str, target):
+    if operator == "equals":
+        return lambda v: v == target
+    if operator == "does_not_equal":
+        return lambda v: v != target
+    if operator in ("contains", "does_not_contain", "starts_with", "ends_with"):
+        # Notion 的文字比對不區分大小寫
+        target = target.lower()
+        if operator == "contains":
+            return lambda v: v is not None and target in v.lower()
+        if operator == "does_not_contain":
+            return lambda v: v is None or target not in v.lower()
+        if operator == "starts_with":
+            return lambda v: v is not None and v.lower().startswith(target)
+        return lambda v: v is not None and v.lower().endswith(target)
+    return None
+
+
+def _number_condition(operator: str, target):
+    compare = {
+        "equals": lambda v: v is not None and v == target,
+        "does_not_equal": lambda v: v != target,
+        "greater_than": lambda v: v is not None and v > target,
+        "less_than": lambda v: v is not None and v < target,
+        "greater_than_or_equal_to": lambda v: v is not None and v >= target,
+        "less_than_or_equal_to": lambda v: v is not None and v <= target,
+    }
+    return compare.get(operator)
+
+
+def _date_condition(operator: str, target):
+    now = datetime.now(timezone.utc)
+    relative = {
+        "past_week": (now - timedelta(days=7), now),
+        "past_month": (now - timedelta(days=30), now),
+        "past_year": (now - timedelta(days=365), now),
+        "next_week": (now, now + timedelta(days=7)),
+        "next_month": (now, now + timedelta(days=30)),
+        "next_year": (now, now + timedelta(days=365)),
+    }
+    if operator in relative:
+        low, high = relative[operator]
+        return lambda v: v is not None and low <= parse_date(v) <= high
+
+    if operator == "this_week":
+        start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=7)
+        return lambda v: v is not None and start <= parse_date(v) < end
+
+    if operator == "equals":
+        day = parse_date(target).date()
+        return lambda v: v is not None and parse_date(v).date() == day
+
+    bound = parse_date(target)
+    compare = {
+        "before": lambda v: v is not None and parse_date(v) < bound,
+        "after": lambda v: v is not None and parse_date(v) > bound,
+        "on_or_before": lambda v: v is not None and parse_date(v) <= bound,
+        "on_or_after": lambda v: v is not None and parse_date(v) >= bound,
+    }
+    return compare.get(operator)
+
+
+def _list_condition(operator: str, target):
+    if operator == "contains":
+        return lambda v: v is not None and target in v
+    if operator == "does_not_contain":
+        return lambda v: v is None or target not in v
+    return None
+
+
+def compile_condition(condition_type: str, condition: dict):
+    """將單一類型的條件（例如 {"greater_than": 80}）編譯成 value -> bool 的函數"""
+    if condition_type in ("rollup", "formula"):
+        return _compile_nested(condition_type, condition)
+
+    if len(condition) != 1:
+        raise ValueError(f"無法解析過濾條件: {condition}")
+    operator, target = next(iter(condition.items()))
+
+    if operator == "is_empty":
+        return _is_empty
+    if operator == "is_not_empty":
+        return lambda v: not _is_empty(v)
+
+    if condition_type in TEXT_TYPES:
+        check = _text_condition(operator, target)
+    elif condition_type == "number":
+        check = _number_condition(operator, target)
+    elif condition_type in ("checkbox", "boolean"):
+        check = {"equals": lambda v: bool(v) == target,
+                 "does_not_equal": lambda v: bool(v) != target}.get(operator)
+    elif condition_type in ("select", "status"):
+        check = {"equals": lambda v: v == target,
+                 "does_not_equal": lambda v: v != target}.get(operator)
+    elif condition_type in ("date", "created_time", "last_edited_time"):
+        check = _date_condition(operator, target)
+    elif condition_type in LIST_TYPES:
+        check = _list_condition(operator, target)
+    else:
+        check = None
+
+    if check is None:
+        raise ValueError(f"不支援的過濾條件: {condition_type}.{operator}")
+    return check
+
+
+def _compile_nested(condition_type: str, condition: dict):
+    """rollup / formula 的條件，例如 {"number": {"greater_than": 100}} 或 {"any": {...}}"""
+    if len(condition) != 1:
+        raise ValueError(f"無法解析過濾條件: {condition}")
+    key, inner = next(iter(condition.items()))
+
+    if condition_type == "rollup" and key in ("any", "every", "none"):
+        # 陣列 rollup：對每個元素套用條件
+        inner_type, inner_condition = next(iter(inner.items()))
+        check = compile_condition(inner_type, inner_condition)
+        if key == "any":
+            return lambda v: isinstance(v, list) and any(check(item) for item in v)
+        if key == "every":
+            return lambda v: isinstance(v, list) and all(check(item) for item in v)
+        return lambda v: not isinstance(v, list) or not any(check(item) for item in v)
+
+    return compile_condition(key, inner)
+
+
+def compile_filter(filter_params: dict):
+    """將 Notion 過濾 JSON 編譯成 page -> bool 的函數（只需編譯一次，可重複套用）
+
+    支援 and / or 複合條件、timestamp 條件，以及 title、rich_text、number、select、
+    multi_select、status、date、checkbox、url、email、phone_number、relation、
+    people、files、rollup、formula 等屬性條件。
+    """
+    query_filter = NotionEndpoints.build_filter(filter_params)
+    if not query_filter:
+        return lambda page: True
+
+    if "and" in query_filter:
+        predicates = [compile_filter(f) for f in query_filter["and"]]
+        return lambda page: all(predicate(page) for predicate in predicates)
+    if "or" in query_filter:
+        predicates = [compile_filter(f) for f in query_filter["or"]]
+        return lambda page: any(predicate(page) for predicate in predicates)
+
+    if "timestamp" in query_filter:
+        timestamp = query_filter["timestamp"]
+        check = compile_condition(timestamp, query_filter[timestamp])
+        return lambda page: check(page.get(timestamp))
+
+    prop_name = query_filter.get("property")
+    condition_types = [key for key in query_filter if key != "property"]
+    if not prop_name or len(condition_types) != 1:
+        raise ValueError(f"無法解析過濾條件: {query_filter}")
+
+    condition_type = condition_types[0]
+    check = compile_condition(condition_type, query_filter[condition_type])
+    return lambda page: check(raw_value(page.get("properties", {}).get(prop_name)))
+
+
+def _value_type(prop_data: dict) -> str:
+    """屬性值的實際類型（rollup / formula 取結果的類型）"""
+    prop_type = prop_data.get("type") if prop_data else None
+    if prop_type in ("rollup", "formula"):
+        return (prop_data.get(prop_type) or {}).get("type")
+    return prop_type
+
+
+def _sort_value(prop_data: dict):
+    value = raw_value(prop_data)
+    if _value_type(prop_data) == "date" and value:
+        # 不同時區的日期依實際時刻排序，不以字串比較
+        return parse_date(value)
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+def sort_pages(pages: list, sort_params: list) -> list:
+    """依 Notion 排序參數排序，空值一律排在最後（與 Notion 一致）"""
+    pages = list(pages)
+    # 由最後一個排序鍵開始做穩定排序，等同多鍵排序
+    for sort in reversed(sort_params or []):
+        if "timestamp" in sort:
+            timestamp = sort["timestamp"]
+            get_value = lambda page, t=timestamp: parse_date(page.get(t))
+        else:
+            prop_name = sort["property"]
+            get_value = lambda page, p=prop_name: _sort_value(page.get("properties", {}).get(p))
+
+        keyed = [(get_value(page), page) for page in pages]
+        present = [item for item in keyed if not _is_empty(item[0])]
+        missing = [page for value, page in keyed if _is_empty(value)]
+        present.sort(key=lambda item: item[0], reverse=sort.get("direction") == "descending")
+        pages = [page for _, page in present] + missing
+    return pages
+
+
+class LocalQuery:
+    """在已取得的頁面上套用 Notion 過濾與排序，不發送任何請求
+
+        query = LocalQuery({"property": "Score", "number": {"greater_than": 80}})
+        high_scores = query.apply(notion.query_database_all(database_id))
+    """
+
+    def __init__(self, filter_params: dict = None, sort_params: list = None):
+        self.predicate = compile_filter(filter_params)
+        self.sort_params = sort_params
+
+    def matches(self, page: dict) -> bool:
+        """單一頁面是否符合過濾條件"""
+        return self.predicate(page)
+
+    def apply(self, pages) -> list:
+        """過濾並排序頁面"""
+        results = [page for page in pages if self.predicate(page)]
+        if self.sort_params:
+            results = sort_pages(results, self.sort_params)
+        return results
+
+
+def filter_pages(pages, filter_params: dict = None, sort_params: list = None) -> list:
+    """LocalQuery 的簡寫：filter_pages(pages, filter_params, sort_params)"""
+    return LocalQuery(filter_params, sort_params).apply(pages)
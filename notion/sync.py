@@ -0,0 +1,81 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+
+def parse_timestamp(value: str) -> datetime:
+    """解析 Notion 的 ISO 8601 時間字串（例如 2024-01-01T00:00:00.000Z）"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def format_timestamp(value: datetime) -> str:
+    """將 datetime 轉為 Notion 過濾條件使用的 ISO 8601 字串"""
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class DatabaseSnapshot:
+    """數據庫的本地快照與同步水位線，以 JSON 檔案持久化
+
+    pages 以頁面 ID 為鍵保存原始頁面數據，watermark 為已同步到的最大 last_edited_time。
+    """
+
+    def __init__(self, path: str, watermark: str = None, pages: dict = None):
+        self.path = path
+        self.watermark = watermark
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "DatabaseSnapshot":
+        """讀取快照，檔案不存在時回傳空快照"""
+        if not os.path.exists(path):
+            return cls(path)
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(path, data.get("watermark"), data.get("pages", {}))
+
+    def save(self) -> None:
+        """寫入快照（先寫暫存檔再替換，避免中斷時留下損壞的檔案）"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"watermark": self.watermark, "pages": self.pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def since(self, overlap_seconds: float) -> str:
+        """增量查詢的起點：水位線往前推 overlap_seconds，容許時鐘誤差與分鐘精度"""
+        if not self.watermark:
+            return None
+        return format_timestamp(parse_timestamp(self.watermark) - timedelta(seconds=overlap_seconds))
+
+    def merge(self, page: dict, changes: dict) -> None:
+        """合併一筆查詢結果，並記錄到 changes 的 added / updated / archived"""
+        page_id = page["id"]
+        previous = self.pages.get(page_id)
+
+        if page.get("archived") or page.get("in_trash"):
+            if previous is not None:
+                changes["archived"].append(self.pages.pop(page_id))
+            return
+
+        if previous is None:
+            changes["added"].append(page)
+        elif previous.get("last_edited_time") != page.get("last_edited_time"):
+            changes["updated"].append(page)
+        else:
+            # 重疊區間內重複取得且未變更
+            return
+
+        self.pages[page_id] = page
+        edited = page.get("last_edited_time")
+        if edited and (not self.watermark or parse_timestamp(edited) > parse_timestamp(self.watermark)):
+            self.watermark = edited
+
+    def remove_missing(self, page_ids: set, changes: dict) -> None:
+        """完整比對時，將快照中已不存在於數據庫的頁面標記為 archived"""
+        for page_id in list(self.pages):
+            if page_id not in page_ids:
+                changes["archived"].append(self.pages.pop(page_id))
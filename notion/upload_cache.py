@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class UploadCache:
+    """以檔案內容雜湊（SHA-256）為鍵的圖片上傳快取，保存於本地 JSON 檔
+
+    同一張圖片（即使路徑不同）只會上傳一次；檔案的路徑、修改時間與大小沒有變化時
+    直接沿用上次的雜湊，不重新讀檔。可跨執行緒共用。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 快取檔路徑，None 時只保存在記憶體
+        """
+        self.path = path
+        self.links = {}   # sha256 -> 上傳後的連結
+        self.files = {}   # 絕對路徑 -> [mtime_ns, size, sha256]
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """讀取快取檔（不存在或損壞時從空白開始）"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.links = data.get("links", {})
+            self.files = data.get("files", {})
+        except (OSError, ValueError) as e:
+            print(f"讀取上傳快取失敗，將重新建立: {e}")
+
+    def save(self) -> None:
+        """寫入快取檔（先寫暫存檔再替換）"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self.lock:
+            data = json.dumps({"links": self.links, "files": self.files}, ensure_ascii=False)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def digest(self, image_path: str) -> str:
+        """檔案內容的 SHA-256；修改時間與大小未變時沿用記錄的值"""
+        abs_path = os.path.abspath(image_path)
+        stat = os.stat(abs_path)
+        with self.lock:
+            known = self.files.get(abs_path)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2]
+
+        sha256 = hashlib.sha256()
+        with open(abs_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+
+        with self.lock:
+            self.files[abs_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def get(self, image_path: str) -> str:
+        """已上傳過的連結，沒有時回傳 None"""
+        digest = self.digest(image_path)
+        with self.lock:
+            return self.links.get(digest)
+
+    def set(self, image_path: str, link: str) -> None:
+        """記錄上傳結果並寫入快取檔"""
+        digest = self.digest(image_path)
+        with self.lock:
+            self.links[digest] = link
+        self.save()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.links.clear()
+            self.files.clear()
+        self.save()
@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_notion import FakeNotionServer, notion_error
+from notion.api import NotionAPI
+from notion.handlers import NotionRequestError
+
+
+class FailingPartitionServer(FakeNotionServer):
+    """只有含下限條件的分區在翻到第二頁時失敗"""
+
+    def query_database(self, database_id: str, body: dict):
+        if body.get("start_cursor") and "on_or_after" in json.dumps(body.get("filter")):
+            return 400, notion_error(400, "validation_error", "partition failed")
+        return super().query_database(database_id, body)
+
+
+class ScanDatabaseParallelTest(unittest.TestCase):
+    def make_api(self, server):
+        return NotionAPI("test", base_url=server.base_url, rate_limit=100000, burst=1000, upload_cache_path=None)
+
+    def test_scans_every_partition(self):
+        with FakeNotionServer(rows=500) as server:
+            results = self.make_api(server).scan_database_parallel(server.database_id, partitions=4)
+        self.assertEqual(len(results), 500)
+
+    def test_failed_partition_raises_instead_of_returning_partial_results(self):
+        with FailingPartitionServer(rows=500) as server:
+            with self.assertRaises(NotionRequestError):
+                self.make_api(server).scan_database_parallel(server.database_id, partitions=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
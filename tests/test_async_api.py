@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_notion import FakeNotionServer
+from notion.async_api import AsyncNotionAPI
+from notion.builders import BlockBuilder
+from notion.config import NotionConfig
+
+
+class AsyncNotionAPICloseTest(unittest.TestCase):
+    def test_aclose_closes_upload_session(self):
+        async def run():
+            with mock.patch.object(NotionConfig, "IMGUR_CLIENT_ID", "client-id"):
+                notion = AsyncNotionAPI("test", upload_cache_path=None)
+            session = notion.block_builder.imgur_uploader.session
+            with mock.patch.object(session, "close", wraps=session.close) as close:
+                async with notion:
+                    pass
+            close.assert_called_once_with()
+
+        asyncio.run(run())
+
+    def test_shared_upload_session_is_not_closed(self):
+        session = requests.Session()
+        builder = BlockBuilder("client-id", session=session)
+        with mock.patch.object(session, "close") as close:
+            builder.close()
+        close.assert_not_called()
+        session.close()
+
+    def test_requests_still_work_before_close(self):
+        async def run():
+            with FakeNotionServer(rows=5) as server:
+                async with AsyncNotionAPI("test", base_url=server.base_url, rate_limit=100000,
+                                          burst=1000, upload_cache_path=None) as notion:
+                    return await notion.query_database_all(server.database_id)
+
+        self.assertEqual(len(asyncio.run(run())), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion.client import NotionClientMixin
+from notion.endpoints import NotionEndpoints
+
+
+def paragraph(text: str, children: list = None) -> dict:
+    block = {"object": "block", "type": "paragraph",
+             "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]}}
+    if children:
+        block["paragraph"]["children"] = children
+    return block
+
+
+def table(rows: int) -> dict:
+    return {"object": "block", "type": "table", "table": {
+        "table_width": 1, "has_column_header": False, "has_row_header": False,
+        "children": [{"type": "table_row", "table_row": {"cells": [[{"text": {"content": str(i)}}]]}}
+                     for i in range(rows)],
+    }}
+
+
+def column_list(*columns) -> dict:
+    return {"object": "block", "type": "column_list", "column_list": {
+        "children": [{"type": "column", "column": {"children": list(column)}} for column in columns]
+    }}
+
+
+class ChunkBlocksTest(unittest.TestCase):
+    def test_children_within_two_levels_stay_inline(self):
+        blocks = [paragraph(f"p{i}", [paragraph("child", [paragraph("grandchild")])]) for i in range(230)]
+        chunks = list(NotionEndpoints.chunk_blocks(blocks))
+        self.assertEqual(len(chunks), 3)
+        for chunk in chunks:
+            for block, deferred in chunk:
+                self.assertEqual(deferred, [])
+                self.assertEqual(NotionEndpoints.count_blocks(block), 3)
+
+    def test_deeper_children_are_deferred(self):
+        deep = paragraph("a", [paragraph("b", [paragraph("c", [paragraph("d")])])])
+        [[(block, deferred)]] = list(NotionEndpoints.chunk_blocks([deep]))
+        self.assertEqual(NotionEndpoints.block_children(block), [])
+        self.assertEqual(deferred, [((), deep["paragraph"]["children"])])
+        # 原本的區塊不會被修改
+        self.assertEqual(len(deep["paragraph"]["children"]), 1)
+
+    def test_table_rows_stay_inline(self):
+        [[(block, deferred)]] = list(NotionEndpoints.chunk_blocks([table(5)]))
+        self.assertEqual(len(block["table"]["children"]), 5)
+        self.assertEqual(deferred, [])
+
+    def test_table_rows_over_limit_are_appended_to_the_table(self):
+        [[(block, deferred)]] = list(NotionEndpoints.chunk_blocks([table(130)]))
+        self.assertEqual(len(block["table"]["children"]), 100)
+        self.assertEqual(len(deferred), 1)
+        self.assertEqual(deferred[0][0], ())
+        self.assertEqual(len(deferred[0][1]), 30)
+
+    def test_columns_stay_inline_and_deep_content_is_deferred_by_path(self):
+        nested = paragraph("toggle", [paragraph("inside")])
+        block_in = column_list([paragraph("left")], [paragraph("right"), nested])
+        [[(block, deferred)]] = list(NotionEndpoints.chunk_blocks([block_in]))
+
+        columns = block["column_list"]["children"]
+        self.assertEqual(len(columns), 2)
+        self.assertEqual([len(column["column"]["children"]) for column in columns], [1, 2])
+        self.assertEqual(NotionEndpoints.block_children(columns[1]["column"]["children"][1]), [])
+        self.assertEqual(deferred, [((1, 1), [paragraph("inside")])])
+
+    def test_oversized_block_defers_its_children(self):
+        big = paragraph("big", [paragraph("x" * 2000) for _ in range(10)])
+        [[(block, deferred)]] = list(NotionEndpoints.chunk_blocks([big], max_bytes=5000))
+        self.assertEqual(NotionEndpoints.block_children(block), [])
+        self.assertEqual(len(deferred[0][1]), 10)
+
+    def test_chunks_respect_count_and_total_limits(self):
+        blocks = [paragraph(f"p{i}", [paragraph("c") for _ in range(9)]) for i in range(150)]
+        chunks = list(NotionEndpoints.chunk_blocks(blocks))
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 100)
+            self.assertLessEqual(sum(NotionEndpoints.count_blocks(block) for block, _ in chunk), 1000)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 150)
+
+
+class FakeBlockServer:
+    """記錄請求並建立區塊 ID，模擬 append / list children 的回應"""
+
+    def __init__(self):
+        self.requests = []
+        self.children = {}
+        self.next_id = 0
+
+    def _create(self, parent_id: str, blocks: list) -> list:
+        created = []
+        for block in blocks:
+            self.next_id += 1
+            block_id = f"b{self.next_id}"
+            self.children.setdefault(parent_id, []).append(block_id)
+            self._create(block_id, NotionEndpoints.block_children(block))
+            created.append({"id": block_id})
+        return created
+
+    def handle(self, method: str, path: str, data: dict = None, params: dict = None) -> dict:
+        self.requests.append((method, path))
+        block_id = path.split("/")[2]
+        if method == "PATCH":
+            return {"results": self._create(block_id, data["children"])}
+        ids = self.children.get(block_id, [])[:params["page_size"]]
+        return {"results": [{"id": child} for child in ids]}
+
+
+class AppendBlocksPlanTest(unittest.TestCase):
+    def run_plan(self, blocks):
+        server = FakeBlockServer()
+        plan = NotionClientMixin()._append_blocks_plan("page", blocks)
+        response = None
+        try:
+            while True:
+                response = server.handle(*plan.send(response))
+        except StopIteration as done:
+            return done.value, server
+
+    def test_shallow_blocks_need_one_request_per_chunk(self):
+        blocks = [paragraph(f"p{i}", [paragraph("child")]) for i in range(230)]
+        created, server = self.run_plan(blocks)
+        self.assertEqual(len(created), 230)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_deferred_column_content_is_appended_to_the_right_block(self):
+        block = column_list([paragraph("left")], [paragraph("right"), paragraph("toggle", [paragraph("inside")])])
+        created, server = self.run_plan([block])
+        columns = server.children[created[0]]
+        toggle = server.children[columns[1]][1]
+        self.assertEqual(len(server.children[toggle]), 1)
+        self.assertEqual([method for method, _ in server.requests], ["PATCH", "GET", "GET", "PATCH"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion.coalesce import UpdateCoalescer
+
+
+class FakeNotion:
+    """記錄送出的 PATCH，可指定要失敗的頁面"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.failing = set()
+        self.lock = threading.Lock()
+
+    def _request(self, method: str, url: str, data: dict = None, params: dict = None) -> dict:
+        time.sleep(self.delay)
+        page_id = url.rsplit("/", 1)[-1]
+        with self.lock:
+            self.requests.append((page_id, data["properties"]))
+        if page_id in self.failing:
+            raise RuntimeError("update failed")
+        return {"id": page_id, "properties": data["properties"]}
+
+    def _record_page_update(self, page_id: str, result) -> None:
+        pass
+
+
+class UpdateCoalescerTest(unittest.TestCase):
+    def test_updates_to_one_page_are_merged(self):
+        notion = FakeNotion()
+        with UpdateCoalescer(notion, max_delay=60) as writer:
+            first = writer.update("a", {"Score": {"number": 1}, "Done": {"checkbox": False}})
+            second = writer.update("a", {"Score": {"number": 2}})
+        self.assertEqual(notion.requests, [("a", {"Score": {"number": 2}, "Done": {"checkbox": False}})])
+        self.assertIs(first.result(), second.result())
+        self.assertEqual(writer.stats(), {"requested": 2, "sent": 1, "pending": 0})
+
+    def test_max_pages_sends_immediately(self):
+        notion = FakeNotion()
+        writer = UpdateCoalescer(notion, max_pages=2, max_delay=60)
+        futures = [writer.update(page_id, {"Score": {"number": 1}}) for page_id in ("a", "b")]
+        self.assertEqual(len(wait(futures, timeout=5).done), 2)
+        writer.close()
+
+    def test_max_delay_sends_without_flush(self):
+        notion = FakeNotion()
+        writer = UpdateCoalescer(notion, max_delay=0.05)
+        future = writer.update("a", {"Score": {"number": 1}})
+        self.assertEqual(future.result(timeout=5)["id"], "a")
+        writer.close()
+
+    def test_failure_is_set_on_every_merged_future(self):
+        notion = FakeNotion()
+        notion.failing.add("a")
+        with UpdateCoalescer(notion, max_delay=60) as writer:
+            futures = [writer.update("a", {"Score": {"number": i}}) for i in range(3)]
+        for future in futures:
+            self.assertIsInstance(future.exception(), RuntimeError)
+
+    def test_same_page_updates_are_sent_in_order(self):
+        notion = FakeNotion(delay=0.01)
+        with UpdateCoalescer(notion, max_delay=60) as writer:
+            for i in range(5):
+                writer.update("a", {"Score": {"number": i}})
+                writer.flush(wait_for_results=False)
+        self.assertEqual([properties["Score"]["number"] for _, properties in notion.requests], list(range(5)))
+
+    def test_update_after_close_raises(self):
+        writer = UpdateCoalescer(FakeNotion())
+        writer.close()
+        writer.close()
+        with self.assertRaises(RuntimeError):
+            writer.update("a", {"Score": {"number": 1}})
+
+    def test_updates_racing_close_are_sent_or_rejected(self):
+        # 送出需要時間，close() 等待送出結果的期間仍有其他執行緒在 update()
+        for _ in range(5):
+            notion = FakeNotion(delay=0.005)
+            writer = UpdateCoalescer(notion, max_pages=10, max_delay=60)
+            accepted = []
+            start = threading.Barrier(5)
+
+            def produce(worker):
+                start.wait()
+                for i in range(1000):
+                    try:
+                        accepted.append(writer.update(f"{worker}-{i}", {"Score": {"number": i}}))
+                    except RuntimeError:
+                        return
+                    time.sleep(0.001)
+
+            threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(4)]
+            for thread in threads:
+                thread.start()
+            start.wait()
+            time.sleep(0.02)
+            writer.close()
+            for thread in threads:
+                thread.join()
+
+            # close() 回傳後，每個被接受的更新都已送出完成
+            self.assertTrue(all(future.done() for future in accepted))
+            self.assertEqual(len(notion.requests), len(accepted))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from notion.columnar import ColumnarTableBuilder
+
+
+class ColumnarImportTest(unittest.TestCase):
+    def test_importing_api_does_not_load_pyarrow(self):
+        code = "import sys; import notion.api; print('pyarrow' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "False")
+
+    def test_to_arrow_loads_pyarrow_on_demand(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("未安裝 pyarrow")
+
+        schema = {"Score": "number", "Done": "checkbox"}
+        builder = ColumnarTableBuilder(schema)
+        builder.extend([
+            {"id": "a", "properties": {"Score": {"type": "number", "number": 1}, "Done": {"type": "checkbox", "checkbox": True}}},
+            {"id": "b", "properties": {"Score": {"type": "number", "number": None}, "Done": {"type": "checkbox", "checkbox": False}}},
+        ])
+        table = builder.build().to_arrow()
+        self.assertEqual(table.column("Score").to_pylist(), [1.0, None])
+        self.assertEqual(table.column("Done").to_pylist(), [True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion.config import NotionConfig
+from notion.handlers import (NotionRequestError, NotionRequestHandler, TokenBucket,
+                             network_error, response_error)
+
+
+def make_response(status_code: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({"object": "error", "status": status_code}).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.token = f"token-{self.id()}"
+
+    def tearDown(self):
+        TokenBucket._registry.pop(self.token, None)
+
+    def test_defaults_do_not_override_explicit_settings(self):
+        fast = NotionRequestHandler(self.token, rate_limit=50, burst=50)
+        default = NotionRequestHandler(self.token)
+        self.assertIs(fast.rate_limiter, default.rate_limiter)
+        self.assertEqual((default.rate_limiter.rate, default.rate_limiter.capacity), (50, 50))
+        fast.close()
+        default.close()
+
+    def test_new_bucket_uses_config_defaults(self):
+        bucket = TokenBucket.for_token(self.token)
+        self.assertEqual((bucket.rate, bucket.capacity), (NotionConfig.RATE_LIMIT, NotionConfig.RATE_BURST))
+
+    def test_explicit_settings_reconfigure_shared_bucket(self):
+        TokenBucket.for_token(self.token, 50, 50)
+        bucket = TokenBucket.for_token(self.token, rate=10)
+        self.assertEqual((bucket.rate, bucket.capacity), (10, 50))
+
+    def test_reserve_waits_after_burst(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+
+    def test_pause_blocks_and_drops_burst(self):
+        bucket = TokenBucket(rate=1000, capacity=100)
+        bucket.pause(0.5)
+        self.assertGreater(bucket.reserve(), 0.4)
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_server_errors_are_retried_only_for_idempotent_requests(self):
+        self.assertTrue(response_error(make_response(503), "GET").retriable)
+        self.assertFalse(response_error(make_response(503), "POST").retriable)
+        self.assertFalse(response_error(make_response(502), "PATCH").retriable)
+
+    def test_rate_limit_is_always_retried_with_retry_after(self):
+        error = response_error(make_response(429, {"Retry-After": "2"}), "POST")
+        self.assertTrue(error.retriable)
+        self.assertEqual(error.retry_after, 2.0)
+
+    def test_client_errors_are_not_retried(self):
+        self.assertFalse(response_error(make_response(400), "GET").retriable)
+
+    def test_read_timeout_is_retried_only_for_idempotent_requests(self):
+        timeout = requests.exceptions.ReadTimeout("read timed out")
+        self.assertTrue(network_error(timeout, "GET").retriable)
+        self.assertFalse(network_error(timeout, "POST").retriable)
+
+    def test_connect_failures_are_retried_for_any_method(self):
+        refused = requests.exceptions.ConnectionError(
+            MaxRetryError(None, "/", NewConnectionError(None, "connection refused"))
+        )
+        self.assertTrue(network_error(refused, "POST").retriable)
+        self.assertTrue(network_error(requests.exceptions.ConnectTimeout(), "PATCH").retriable)
+        self.assertFalse(network_error(requests.exceptions.ConnectionError("reset"), "POST").retriable)
+
+
+class FailingHandler(BaseHTTPRequestHandler):
+    """永遠回傳 503，並記錄收到的請求方法"""
+
+    def reply(self):
+        self.server.methods.append(self.command)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        body = b'{"object": "error"}'
+        self.send_response(503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = reply
+
+    def log_message(self, *args):
+        pass
+
+
+class RequestRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FailingHandler)
+        self.server.methods = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.token = f"token-{self.id()}"
+        self.handler = NotionRequestHandler(
+            self.token, rate_limit=1000, burst=100, max_retries=2,
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}"
+        )
+
+    def tearDown(self):
+        self.handler.close()
+        self.server.shutdown()
+        self.server.server_close()
+        TokenBucket._registry.pop(self.token, None)
+
+    def test_get_is_retried(self):
+        with mock.patch("notion.handlers.backoff_delay", return_value=0.0):
+            with self.assertRaises(NotionRequestError):
+                self.handler._request("GET", "/pages/x")
+        self.assertEqual(self.server.methods, ["GET"] * 3)
+
+    def test_post_is_sent_once(self):
+        with self.assertRaises(NotionRequestError):
+            self.handler._request("POST", "/pages", {"parent": {}})
+        self.assertEqual(self.server.methods, ["POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
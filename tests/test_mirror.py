@@ -0,0 +1,173 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion.mirror import DatabaseMirror
+from notion.query import LocalQuery
+
+DATABASE_ID = "db"
+
+
+def make_page(index: int, edited: str = "2024-01-01T00:00:00.000Z") -> dict:
+    return {
+        "id": f"page-{index}",
+        "created_time": f"2024-01-01T{index % 24:02d}:00:00.000Z",
+        "last_edited_time": edited,
+        "properties": {
+            "Name": {"type": "title", "title": [{"text": {"content": f"Task {index}"}, "plain_text": f"Task {index}"}]},
+            "Score": {"type": "number", "number": index},
+        },
+    }
+
+
+class FakeNotion:
+    """只提供 DatabaseMirror 會用到的方法，fail_after 筆之後拋出錯誤"""
+
+    def __init__(self, pages: list, schema: dict):
+        self.pages = pages
+        self.schema = schema
+        self.fail_after = None
+        self.schema_refreshes = 0
+
+    def get_database_schema(self, database_id: str, refresh: bool = False) -> dict:
+        if refresh:
+            self.schema_refreshes += 1
+        return {"id": database_id, "properties": {name: {"type": kind} for name, kind in self.schema.items()}}
+
+    def iter_database(self, database_id: str, filter_params: dict = None, raise_errors: bool = False):
+        for index, page in enumerate(self.pages):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise RuntimeError("network down")
+            yield page
+
+
+class DatabaseMirrorRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "mirror.sqlite")
+        self.notion = FakeNotion([make_page(i) for i in range(300)], {"Name": "title", "Score": "number"})
+        self.mirror = DatabaseMirror(self.notion, DATABASE_ID, self.path)
+
+    def tearDown(self):
+        self.mirror.close()
+        self.directory.cleanup()
+
+    def test_refresh_reads_schema_without_cache(self):
+        self.mirror.refresh()
+        self.assertEqual(self.notion.schema_refreshes, 1)
+
+    def test_failed_full_rebuild_keeps_previous_mirror(self):
+        self.assertEqual(self.mirror.refresh(), 300)
+
+        self.notion.fail_after = 10
+        with self.assertRaises(RuntimeError):
+            self.mirror.refresh(full=True)
+        self.assertEqual(self.mirror.count(), 300)
+
+        # 下一次增量更新仍然以原本的資料為基礎
+        self.notion.fail_after = None
+        self.notion.pages = [make_page(i, "2024-01-02T00:00:00.000Z") for i in range(3)]
+        self.mirror.refresh()
+        self.assertEqual(self.mirror.count(), 300)
+
+    def test_failed_schema_change_restores_schema(self):
+        self.mirror.refresh()
+        old_schema = dict(self.mirror.schema)
+
+        self.notion.schema = {"Name": "title", "Score": "number", "Done": "checkbox"}
+        self.notion.fail_after = 0
+        with self.assertRaises(RuntimeError):
+            self.mirror.refresh()
+        self.assertEqual(self.mirror.schema, old_schema)
+        self.assertEqual(self.mirror.count(), 300)
+
+        # schema 仍視為已變更，下一次會完整重建而不是增量寫入
+        self.notion.fail_after = None
+        self.assertEqual(self.mirror.refresh(), 300)
+        self.assertEqual(self.mirror.schema, self.notion.schema)
+
+    def test_failed_rebuild_survives_reopen(self):
+        self.mirror.refresh()
+        self.notion.fail_after = 5
+        with self.assertRaises(RuntimeError):
+            self.mirror.refresh(full=True)
+        self.mirror.close()
+
+        self.mirror = DatabaseMirror(self.notion, DATABASE_ID, self.path)
+        self.assertEqual(self.mirror.count(), 300)
+        self.assertEqual(self.mirror.schema, {"Name": "title", "Score": "number"})
+
+
+DUE_VALUES = [
+    "2024-01-01",
+    "2024-01-01T01:30:00.000+08:00",
+    "2024-01-01T02:00:00.000Z",
+    "2023-12-31T20:00:00.000-05:00",
+    "2024-01-02T00:00:00.000+00:00",
+    None,
+]
+
+
+def make_dated_page(index: int) -> dict:
+    page = make_page(index)
+    page["created_time"] = f"2024-01-01T{index // 60:02d}:{index % 60:02d}:00.000Z"
+    due = DUE_VALUES[index % len(DUE_VALUES)]
+    page["properties"]["Due"] = {"type": "date", "date": {"start": due, "end": None} if due else None}
+    page["properties"]["Latest"] = {
+        "type": "rollup",
+        "rollup": {"type": "date", "date": {"start": due, "end": None} if due else None, "function": "latest_date"},
+    }
+    return page
+
+
+class DatabaseMirrorDateFilterTest(unittest.TestCase):
+    """鏡像的日期過濾結果必須與 LocalQuery 相同"""
+
+    FILTERS = [
+        {"timestamp": "created_time", "created_time": {"before": "2024-01-01T02:00:00Z"}},
+        {"timestamp": "created_time", "created_time": {"on_or_after": "2024-01-01T03:00:00.000+01:00"}},
+        {"timestamp": "created_time", "created_time": {"after": "2024-01-01"}},
+        {"timestamp": "created_time", "created_time": {"equals": "2024-01-01"}},
+        {"property": "Due", "date": {"before": "2024-01-01T00:00:00Z"}},
+        {"property": "Due", "date": {"on_or_before": "2024-01-01"}},
+        {"property": "Due", "date": {"after": "2024-01-01T01:00:00+00:00"}},
+        {"property": "Due", "date": {"equals": "2024-01-01"}},
+        {"property": "Due", "date": {"is_empty": True}},
+        {"property": "Latest", "rollup": {"date": {"on_or_after": "2023-12-31T18:00:00Z"}}},
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.pages = [make_dated_page(i) for i in range(240)]
+        notion = FakeNotion(self.pages, {"Name": "title", "Score": "number", "Due": "date", "Latest": "rollup"})
+        self.mirror = DatabaseMirror(notion, DATABASE_ID, os.path.join(self.directory.name, "mirror.sqlite"))
+        self.mirror.refresh()
+
+    def tearDown(self):
+        self.mirror.close()
+        self.directory.cleanup()
+
+    def test_filters_match_local_query(self):
+        for query_filter in self.FILTERS:
+            with self.subTest(query_filter=query_filter):
+                expected = [page["id"] for page in LocalQuery(query_filter).apply(self.pages)]
+                actual = [page["id"] for page in self.mirror.query(query_filter)["results"]]
+                self.assertTrue(expected)
+                self.assertEqual(sorted(actual), sorted(expected))
+
+    def test_sorts_match_local_query(self):
+        # 不同時區的日期依實際時刻排序，空值排在最後
+        for sorts in ([{"property": "Due", "direction": "ascending"}, {"property": "Score", "direction": "ascending"}],
+                      [{"property": "Latest", "direction": "descending"}, {"property": "Score", "direction": "ascending"}],
+                      [{"timestamp": "created_time", "direction": "descending"}]):
+            with self.subTest(sorts=sorts):
+                expected = [page["id"] for page in LocalQuery(sort_params=sorts).apply(self.pages)]
+                actual = [page["id"] for page in self.mirror.query(sort_params=sorts)["results"]]
+                self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion.builders import ImgurUploader
+from notion.multipart import MultipartFileStream
+
+FILE_SIZE = 8 * 1024 * 1024
+PEAK_LIMIT = 1024 * 1024
+
+
+class ChunkedUploadHandler(BaseHTTPRequestHandler):
+    """以固定大小分段讀取請求內容，只記錄收到的位元組數"""
+
+    def do_POST(self):
+        remaining = int(self.headers['Content-Length'])
+        received = 0
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            received += len(chunk)
+            remaining -= len(chunk)
+        self.server.received.append(received)
+
+        body = json.dumps({'data': {'link': 'https://i.imgur.com/test.png'}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MultipartFileStreamTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'large.png')
+        with open(cls.path, 'wb') as f:
+            for _ in range(FILE_SIZE // (1024 * 1024)):
+                f.write(os.urandom(1024 * 1024))
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ChunkedUploadHandler)
+        cls.server.received = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.directory.cleanup()
+
+    def test_body_matches_content_length(self):
+        with MultipartFileStream(self.path, 'image', {'type': 'file'}) as body:
+            data = b''.join(body)
+            self.assertEqual(len(data), len(body))
+            self.assertTrue(data.endswith(body.epilogue))
+            self.assertIn(b'name="type"', data[:len(body.preamble)])
+
+    def test_read_is_capped_at_chunk_size(self):
+        with MultipartFileStream(self.path, 'image', chunk_size=4096) as body:
+            self.assertLessEqual(len(body.read()), 4096)
+            self.assertLessEqual(len(body.read(10 * 1024 * 1024)), 4096)
+
+    def test_upload_peak_memory_is_independent_of_file_size(self):
+        uploader = ImgurUploader('test')
+        uploader.API_URL = f'http://127.0.0.1:{self.server.server_address[1]}/3/image'
+
+        tracemalloc.start()
+        try:
+            link = uploader.upload(self.path)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            uploader.close()
+
+        self.assertEqual(link, 'https://i.imgur.com/test.png')
+        self.assertGreater(self.server.received[-1], FILE_SIZE)
+        self.assertLess(peak, PEAK_LIMIT)
+
+
+if __name__ == '__main__':
+    unittest.main()
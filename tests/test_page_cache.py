@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_notion import FakeNotionServer
+from notion.api import NotionAPI
+from notion.page_cache import PageCache
+
+
+def make_page(score: int, edited: str = "2024-01-01T00:00:00.000Z", page_id: str = "p1") -> dict:
+    return {"id": page_id, "last_edited_time": edited,
+            "properties": {"Score": {"type": "number", "number": score}}}
+
+
+class PageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = PageCache(maxsize=10, ttl=60)
+
+    def test_only_query_confirmed_entries_are_served(self):
+        self.cache.observe(make_page(1), replace=True)
+        self.assertIsNone(self.cache.lookup("p1"))
+
+        self.cache.observe(make_page(1))
+        self.assertEqual(self.cache.lookup("p1").page["properties"]["Score"]["number"], 1)
+
+    def test_changed_content_from_get_drops_confirmation(self):
+        self.cache.observe(make_page(1))
+        self.cache.observe(make_page(2), replace=True)
+        self.assertIsNone(self.cache.lookup("p1"))
+
+    def test_same_content_keeps_entry_and_confirmation(self):
+        entry = self.cache.observe(make_page(1))
+        self.assertIs(self.cache.observe(make_page(1), replace=True), entry)
+        self.assertIs(self.cache.lookup("p1"), entry)
+
+    def test_confirmation_expires_after_ttl(self):
+        with mock.patch("notion.page_cache.time.monotonic", return_value=1000.0):
+            self.cache.observe(make_page(1))
+        with mock.patch("notion.page_cache.time.monotonic", return_value=1061.0):
+            self.assertIsNone(self.cache.lookup("p1"))
+
+    def test_older_query_result_does_not_replace_newer_entry(self):
+        self.cache.observe(make_page(2, "2024-01-02T00:00:00.000Z"), replace=True)
+        entry = self.cache.observe(make_page(1, "2024-01-01T00:00:00.000Z"))
+        self.assertEqual(entry.page["properties"]["Score"]["number"], 2)
+        self.assertIsNone(self.cache.lookup("p1"))
+
+    def test_same_minute_edit_replaces_entry(self):
+        self.cache.observe(make_page(1))
+        entry = self.cache.observe(make_page(2))
+        self.assertEqual(entry.format(["Score"]), {"Score": 2})
+
+    def test_archived_page_is_removed(self):
+        self.cache.observe(make_page(1))
+        page = make_page(1)
+        page["archived"] = True
+        self.assertIsNone(self.cache.observe(page))
+        self.assertIsNone(self.cache.lookup("p1"))
+
+    def test_failed_update_invalidates_entry(self):
+        self.cache.observe(make_page(1))
+        self.cache.record_update("p1", None)
+        self.assertIsNone(self.cache.lookup("p1"))
+
+    def test_format_ignores_memo_for_different_content(self):
+        self.cache.observe(make_page(1))
+        self.assertEqual(self.cache.format(make_page(5), ["Score"]), {"Score": 5})
+
+
+class NotionPageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeNotionServer(rows=20)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def make_api(self, page_cache: bool = True) -> NotionAPI:
+        return NotionAPI("test", base_url=self.server.base_url, rate_limit=100000, burst=1000,
+                         upload_cache_path=None, page_cache=page_cache)
+
+    def page_gets(self) -> int:
+        return sum(count for key, count in self.server.counts.items() if key.startswith("GET /pages"))
+
+    def test_queried_pages_are_not_fetched_again(self):
+        with self.make_api() as notion:
+            pages = notion.query_database_all(self.server.database_id)
+            for page in pages:
+                notion.get_formatted_page_properties(page["id"])
+        self.assertEqual(self.page_gets(), 0)
+
+    def test_fetched_pages_are_fetched_again(self):
+        with self.make_api() as notion:
+            page_id = notion.query_database_all(self.server.database_id)[0]["id"]
+            notion.update_page(page_id, {"Score": {"number": 1}})
+            notion.get_page_properties(page_id)
+            notion.get_page_properties(page_id)
+        self.assertEqual(self.page_gets(), 2)
+
+    def test_disabled_cache_always_fetches(self):
+        with self.make_api(page_cache=False) as notion:
+            page_id = notion.query_database_all(self.server.database_id)[0]["id"]
+            notion.get_page_properties(page_id)
+        self.assertEqual(self.page_gets(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion.query import LocalQuery, filter_pages
+
+
+def make_page(page_id: str, name: str = None, score=None, status: str = None, tags: list = None,
+              due: str = None, done: bool = False, total=None) -> dict:
+    return {
+        "id": page_id,
+        "created_time": "2024-01-01T00:00:00.000Z",
+        "last_edited_time": "2024-01-02T00:00:00.000Z",
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": name}] if name is not None else []},
+            "Score": {"type": "number", "number": score},
+            "Status": {"type": "select", "select": {"name": status} if status else None},
+            "Tags": {"type": "multi_select", "multi_select": [{"name": tag} for tag in tags or []]},
+            "Due": {"type": "date", "date": {"start": due, "end": None} if due else None},
+            "Done": {"type": "checkbox", "checkbox": done},
+            "Total": {"type": "rollup", "rollup": {"type": "number", "number": total, "function": "sum"}},
+        },
+    }
+
+
+PAGES = [
+    make_page("a", "Alpha task", 90, "Done", ["Work", "Urgent"], "2024-01-01T23:30:00.000-05:00", True, 0),
+    make_page("b", "beta", 75, "Todo", ["Home"], "2024-01-02", False, 12),
+    make_page("c", "Gamma Task", None, None, [], "2024-01-02T03:00:00.000Z", False, None),
+    make_page("d", "", 80, "Todo", ["Work"], None, True, 5),
+]
+
+
+def ids(filter_params: dict = None, sort_params: list = None) -> list:
+    return [page["id"] for page in LocalQuery(filter_params, sort_params).apply(PAGES)]
+
+
+class LocalQueryFilterTest(unittest.TestCase):
+    def test_text_conditions_ignore_case(self):
+        self.assertEqual(ids({"property": "Name", "title": {"contains": "TASK"}}), ["a", "c"])
+        self.assertEqual(ids({"property": "Name", "title": {"starts_with": "b"}}), ["b"])
+        self.assertEqual(ids({"property": "Name", "title": {"is_empty": True}}), ["d"])
+
+    def test_number_conditions_skip_empty_values(self):
+        self.assertEqual(ids({"property": "Score", "number": {"greater_than_or_equal_to": 80}}), ["a", "d"])
+        self.assertEqual(ids({"property": "Score", "number": {"less_than": 100}}), ["a", "b", "d"])
+        self.assertEqual(ids({"property": "Score", "number": {"is_empty": True}}), ["c"])
+
+    def test_select_multi_select_and_checkbox(self):
+        self.assertEqual(ids({"property": "Status", "select": {"equals": "Todo"}}), ["b", "d"])
+        self.assertEqual(ids({"property": "Tags", "multi_select": {"contains": "Work"}}), ["a", "d"])
+        self.assertEqual(ids({"property": "Tags", "multi_select": {"does_not_contain": "Work"}}), ["b", "c"])
+        self.assertEqual(ids({"property": "Done", "checkbox": {"equals": True}}), ["a", "d"])
+
+    def test_date_conditions_compare_instants(self):
+        # a 為 UTC 2024-01-02 04:30，晚於 c 的 03:00
+        self.assertEqual(ids({"property": "Due", "date": {"after": "2024-01-02T03:00:00Z"}}), ["a"])
+        self.assertEqual(ids({"property": "Due", "date": {"on_or_before": "2024-01-02"}}), ["b"])
+        # equals 比較日期本身寫的那一天（a 在其時區仍是 01-01）
+        self.assertEqual(ids({"property": "Due", "date": {"equals": "2024-01-02"}}), ["b", "c"])
+
+    def test_timestamp_and_rollup_conditions(self):
+        self.assertEqual(ids({"timestamp": "created_time", "created_time": {"before": "2024-01-01T00:00:01Z"}}),
+                         ["a", "b", "c", "d"])
+        self.assertEqual(ids({"property": "Total", "rollup": {"number": {"greater_than_or_equal_to": 0}}}),
+                         ["a", "b", "d"])
+
+    def test_compound_filters(self):
+        self.assertEqual(ids({"and": [
+            {"property": "Done", "checkbox": {"equals": True}},
+            {"or": [{"property": "Score", "number": {"greater_than": 85}},
+                    {"property": "Tags", "multi_select": {"contains": "Home"}}]},
+        ]}), ["a"])
+
+    def test_simple_filter_format(self):
+        self.assertEqual(ids({"Status": "Done"}), ["a"])
+
+    def test_unsupported_condition_raises(self):
+        with self.assertRaises(ValueError):
+            LocalQuery({"property": "Score", "number": {"contains": 1}})
+
+
+class LocalQuerySortTest(unittest.TestCase):
+    def test_empty_values_sort_last_in_both_directions(self):
+        self.assertEqual(ids(sort_params=[{"property": "Score", "direction": "ascending"}]), ["b", "d", "a", "c"])
+        self.assertEqual(ids(sort_params=[{"property": "Score", "direction": "descending"}]), ["a", "d", "b", "c"])
+
+    def test_dates_sort_by_instant(self):
+        self.assertEqual(ids(sort_params=[{"property": "Due", "direction": "ascending"}]), ["b", "c", "a", "d"])
+
+    def test_multiple_sort_keys(self):
+        sorts = [{"property": "Status", "direction": "descending"}, {"property": "Score", "direction": "ascending"}]
+        self.assertEqual(ids(sort_params=sorts), ["b", "d", "a", "c"])
+
+    def test_filter_pages_shortcut(self):
+        pages = filter_pages(PAGES, {"property": "Done", "checkbox": {"equals": False}},
+                             [{"property": "Name", "direction": "ascending"}])
+        self.assertEqual([page["id"] for page in pages], ["b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()